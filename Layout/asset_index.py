@@ -0,0 +1,125 @@
+import os
+import json
+
+INDEX_SUFFIX = "_index.json"
+INDEX_VERSION = 1
+
+
+class AssetIndex:
+    """
+    One-pass index of a logo tree: filename -> folders containing it, with size and mtime.
+    The index is saved beside the tree (logos/ -> .logos_index.json, outside it so
+    saving does not touch the root folder's mtime) and refreshed incrementally: a folder whose
+    mtime is unchanged keeps its cached listing (files and subfolders), so only
+    folders where files were added, removed or renamed are rescanned. Lookups are
+    dict hits instead of an os.walk or os.path.exists per CSV row.
+    """
+
+    def __init__(self, root, index_path=None):
+        self.root = os.path.abspath(root)
+        self.index_path = index_path or os.path.join(os.path.dirname(self.root),
+                                                     "." + os.path.basename(self.root) + INDEX_SUFFIX)
+        self.dirs = {}
+        self.rescanned = 0
+        self._load()
+        self.refresh()
+
+    # === Persistence ===
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.dirs = data["dirs"]
+
+    def save(self):
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "dirs": self.dirs}, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"⚠️ Could not save asset index: {e}")
+
+    # === Scanning ===
+
+    def refresh(self):
+        """Bring the index up to date, rescanning only folders whose mtime changed."""
+        dirs = {}
+        self.rescanned = 0
+        pending = [""]
+        while pending:
+            rel = pending.pop()
+            path = os.path.join(self.root, rel)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            cached = self.dirs.get(rel)
+            if cached is None or cached["mtime"] != mtime:
+                cached = self._scan_dir(path, mtime)
+                self.rescanned += 1
+            dirs[rel] = cached
+            pending.extend(os.path.join(rel, sub).replace("\\", "/") if rel else sub for sub in cached["subdirs"])
+        changed = self.rescanned or dirs.keys() != self.dirs.keys()
+        self.dirs = dirs
+        self._build_lookup()
+        if changed:
+            self.save()
+
+    def _scan_dir(self, path, mtime):
+        files = {}
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    subdirs.append(entry.name)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files[entry.name] = [stat.st_size, stat.st_mtime_ns]
+        return {"mtime": mtime, "files": files, "subdirs": sorted(subdirs)}
+
+    def _build_lookup(self):
+        self.by_name = {}
+        for rel in sorted(self.dirs):
+            for name in self.dirs[rel]["files"]:
+                self.by_name.setdefault(name, []).append(rel)
+
+    # === Lookups ===
+
+    def subfolders(self):
+        """Names of the top-level subfolders of the tree."""
+        return list(self.dirs[""]["subdirs"]) if "" in self.dirs else []
+
+    def _path(self, rel, filename):
+        return os.path.join(self.root, rel, filename) if rel else os.path.join(self.root, filename)
+
+    def find(self, filename, under=""):
+        """Path of filename anywhere below the `under` subfolder (recursive), or None."""
+        for rel in self.by_name.get(filename, ()):
+            if not under or rel == under or rel.startswith(under + "/"):
+                return self._path(rel, filename)
+        return None
+
+    def find_in(self, folders, filename):
+        """Path of filename directly inside the first of `folders` (relative to the root) that has it."""
+        rels = self.by_name.get(filename, ())
+        for folder in folders:
+            folder = folder.replace("\\", "/").strip("/")
+            if folder in rels:
+                return self._path(folder, filename)
+        return None
+
+    def stat(self, path):
+        """(size, mtime_ns) recorded for an indexed path, or None."""
+        rel = os.path.relpath(os.path.abspath(path), self.root).replace("\\", "/")
+        folder, _, name = rel.rpartition("/")
+        entry = self.dirs.get(folder)
+        return tuple(entry["files"][name]) if entry and name in entry["files"] else None
+
+    def missing(self, filenames, under=""):
+        """Every filename that has no match below `under`, in input order without duplicates."""
+        return [name for name in dict.fromkeys(filenames) if self.find(name, under) is None]
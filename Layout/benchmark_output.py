@@ -0,0 +1,82 @@
+"""
+Compare sheet output formats: encode time and file size per format for the
+sheets of one CSV, against the original full RGBA PNG output.
+
+    python benchmark_output.py sock:sock/data.csv --pages 4
+"""
+import os
+import time
+import zlib
+import shutil
+import argparse
+import tempfile
+from PIL import Image
+
+from layout_engine import DPI, PRODUCT_RULES, LayoutEngine
+from sheet_output import IMAGE_FORMATS, save_sheet, StreamingPdfWriter, PlacementPdfWriter
+from sheet_renderer import compose_page
+from tile_cache import TileCache
+
+
+def _raster_pdf(path, canvases, rule):
+    writer = StreamingPdfWriter(path, rule['page_px'], DPI)
+    for canvas in canvases:
+        page = Image.new("RGB", canvas.size, (255, 255, 255))
+        page.paste(canvas, (0, 0), canvas)
+        writer.add_page(zlib.compress(page.tobytes(), 6))
+    writer.close()
+
+
+def _embed_pdf(path, pages, rule):
+    writer = PlacementPdfWriter(path, rule['page_px'], DPI)
+    for placements in pages:
+        writer.add_page(placements)
+    writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sheet output formats.")
+    parser.add_argument("job", metavar="PRODUCT:CSV", help="e.g. sock:sock/data.csv")
+    parser.add_argument("--logos", help="logo folder (default: logos/ next to the CSV)")
+    parser.add_argument("--pages", type=int, default=4, help="number of sheets to encode (default: 4)")
+    args = parser.parse_args(argv)
+
+    product, _, csv_path = args.job.partition(":")
+    rule = PRODUCT_RULES[product]
+    logo_root = args.logos or os.path.join(os.path.dirname(os.path.abspath(csv_path)), 'logos')
+
+    engine = LayoutEngine()
+    blocks, _, _ = engine.collect_blocks(rule, csv_path, logo_root)
+    pages = engine.build_pages(rule, blocks)[:args.pages]
+    tiles = TileCache()
+    canvases = [compose_page(page, rule['page_px'], tiles) for page in pages]
+    print(f"📄 {len(canvases)} sheet(s) of {rule['page_px'][0]}×{rule['page_px'][1]} px")
+
+    out_dir = tempfile.mkdtemp(prefix="sheet_output_bench_")
+    results = []
+    try:
+        for fmt in IMAGE_FORMATS:
+            start = time.perf_counter()
+            size = 0
+            for n, canvas in enumerate(canvases):
+                path = save_sheet(canvas, os.path.join(out_dir, f"{fmt}_{n}.png"), fmt, DPI)
+                size += os.path.getsize(path)
+            results.append((fmt, time.perf_counter() - start, size))
+
+        for name, write in (("pdf raster", lambda p: _raster_pdf(p, canvases, rule)),
+                            ("pdf embed", lambda p: _embed_pdf(p, pages, rule))):
+            path = os.path.join(out_dir, name.replace(" ", "_") + ".pdf")
+            start = time.perf_counter()
+            write(path)
+            results.append((name, time.perf_counter() - start, os.path.getsize(path)))
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    base_time, base_size = results[0][1], results[0][2]
+    print(f"{'format':<12}{'seconds':>10}{'MB':>10}{'time':>8}{'size':>8}")
+    for fmt, seconds, size in results:
+        print(f"{fmt:<12}{seconds:>10.2f}{size / 1048576:>10.2f}{seconds / base_time:>8.2f}{size / base_size:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
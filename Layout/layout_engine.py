@@ -0,0 +1,312 @@
+"""
+Headless layout engine shared by the hat and sock sheet layouts.
+
+Product layouts are data (PRODUCT_RULES); one LayoutEngine keeps its logo indexes
+and render pool warm across jobs, so a batch of CSVs runs in a single process:
+
+    python layout_engine.py sock:sock/data.csv hat:hat/data.csv --subfolder All
+"""
+import os
+import argparse
+from datetime import datetime
+
+import pandas as pd
+
+from asset_index import AssetIndex
+from sheet_renderer import placement, render_pages, make_render_pool
+from sheet_packer import pack_layout, utilization
+from sheet_output import IMAGE_FORMATS
+
+DPI = 300
+TILE_CACHE_FOLDER = '.tile_cache'
+
+# Product layout rules.
+#   page_px / bottom_margin_cm: sheet size at DPI and the unprinted strip at the bottom
+#   grid: (columns, rows) of equal slots in the printable area
+#   blocks: SKU prefix -> block of (columns, rows) slots taken by one ordered item ("" matches any SKU)
+#   pattern: "qr" = one QR logo per block; "qr_first" = QR in the first cell, then up to
+#            plain_copies plain logos in the remaining cells
+#   mirror_block: fill block columns right-to-left (the print is transferred mirrored)
+#   fit / center / mirror: how each logo is sized into its slot (see TileCache.get)
+#   qr_name / plain_name: logo file names; {sku} is the SKU, {base} the SKU without extension
+#   search: "recursive" searches below the chosen subfolder, "folders" only directly in it
+#           (and in the top-level folders for "All")
+PRODUCT_RULES = {
+    'hat': {
+        'page_px': (2480, 3507),  # int(21 / 2.54 * DPI) × int(29.7 / 2.54 * DPI)
+        'bottom_margin_cm': 5,
+        'grid': (2, 3),
+        'blocks': {'': {'name': 'hats', 'block': (1, 1)}},
+        'pattern': 'qr',
+        'mirror_block': False,
+        'fit': 'contain',
+        'center': True,
+        'mirror': True,
+        'qr_name': 'QR{sku}.png',
+        'search': 'recursive',
+        'output_folder': 'a4_output',
+        'page_name': 'A4_Page_{n}.png',
+        'pdf_name': 'A4_Pages.pdf',
+    },
+    'sock': {
+        'page_px': (2480, 3508),
+        'bottom_margin_cm': 5,
+        'grid': (3, 4),
+        'blocks': {
+            'SCKPO3_': {'name': 'socks', 'block': (3, 2)},
+            'SND_': {'name': 'hats', 'block': (3, 2)},
+        },
+        'pattern': 'qr_first',
+        'plain_copies': 5,
+        'mirror_block': True,
+        'fit': 'stretch',
+        'center': False,
+        'mirror': True,
+        'qr_name': 'QR{base}.png',
+        'plain_name': '{base}.png',
+        'search': 'folders',
+        'output_folder': 'output',
+        'page_name': 'A4_sheet_{n}_MIRRORED_5cmMargin.png',
+        'pdf_name': 'A4_sheets_MIRRORED_5cmMargin.pdf',
+    },
+}
+
+
+def slot_size(rule):
+    page_w, page_h = rule['page_px']
+    draw_h = page_h - int((rule['bottom_margin_cm'] / 2.54) * DPI)
+    cols, rows = rule['grid']
+    return page_w // cols, draw_h // rows
+
+
+def block_rule(rule, sku):
+    for prefix, block in rule['blocks'].items():
+        if sku.startswith(prefix):
+            return block
+    return None
+
+
+def block_cells(rule, block_w, block_h, qr_path, plain_path):
+    """(col, row, path) for every filled cell of one block, in block-relative slots."""
+    cells = []
+    placed = 0
+    for row in range(block_h):
+        for col in range(block_w):
+            x = block_w - col - 1 if rule['mirror_block'] else col
+            if row == 0 and col == 0:
+                cells.append((x, row, qr_path))
+            elif rule['pattern'] == 'qr_first' and placed < rule.get('plain_copies', block_w * block_h - 1):
+                cells.append((x, row, plain_path))
+                placed += 1
+    return cells
+
+
+def shelf_layout(rule, blocks):
+    """
+    Place blocks left-to-right, top-to-bottom on the grid, starting a new sheet
+    when the next block does not fit. Returns a list of sheets, each a list of
+    (grid_col, grid_row, block).
+    """
+    cols, rows = rule['grid']
+    sheets = []
+    sheet = []
+    x = y = shelf_h = 0
+    for block in blocks:
+        if x + block['w'] > cols:
+            x, y, shelf_h = 0, y + shelf_h, 0
+        if y + block['h'] > rows:
+            sheets.append(sheet)
+            sheet = []
+            x = y = shelf_h = 0
+        sheet.append((x, y, block))
+        x += block['w']
+        shelf_h = max(shelf_h, block['h'])
+    if sheet:
+        sheets.append(sheet)
+    return sheets
+
+
+class LayoutEngine:
+    """
+    Turns order CSVs into A4 transfer sheets according to PRODUCT_RULES.
+    Blocks are packed onto sheets with first-fit decreasing (sheet_packer) unless
+    another layout, e.g. shelf_layout, is given. Logo indexes are kept per logo
+    folder and the render pool (with its tile caches) is shared by every job until close().
+    """
+
+    def __init__(self, workers=None, layout=pack_layout):
+        self.workers = workers
+        self.layout = layout
+        self.indexes = {}
+        self.pool = None
+
+    def assets(self, logo_root):
+        root = os.path.abspath(logo_root)
+        index = self.indexes.get(root)
+        if index is None:
+            index = self.indexes[root] = AssetIndex(root)
+        else:
+            index.refresh()
+        return index
+
+    def collect_blocks(self, rule, csv_path, logo_root, subfolder="All"):
+        """
+        Blocks for every ordered item, in CSV order, plus the missing logo files and
+        the CSV lines that have no SKU at all (those are skipped, not looked up).
+        """
+        assets = self.assets(logo_root)
+        if rule['search'] == 'recursive':
+            under = "" if subfolder == "All" else subfolder
+            find = lambda name: assets.find(name, under)
+        else:
+            folders = [""] + assets.subfolders() if subfolder == "All" else [subfolder]
+            find = lambda name: assets.find_in(folders, name)
+
+        df = pd.read_csv(csv_path, usecols=['Lineitem SKU', 'Lineitem quantity'])
+        cells_by_sku = {}
+        missing = []
+        no_sku = []
+        blocks = []
+        for row, (sku, qty) in enumerate(zip(df['Lineitem SKU'], df['Lineitem quantity'])):
+            sku = "" if pd.isna(sku) else str(sku).strip()
+            if not sku:
+                no_sku.append(f"line {row + 2}: quantity {qty}")
+                continue
+            if sku not in cells_by_sku:
+                cells_by_sku[sku] = self._sku_block(rule, sku, find, missing)
+            block = cells_by_sku[sku]
+            if block is not None:
+                blocks.extend([block] * int(qty))
+        return blocks, missing, no_sku
+
+    def _sku_block(self, rule, sku, find, missing):
+        shape = block_rule(rule, sku)
+        if shape is None:
+            print(f"⚠️ Unknown SKU prefix: {sku}")
+            return None
+        names = {'sku': sku, 'base': os.path.splitext(sku)[0]}
+        qr_name = rule['qr_name'].format(**names)
+        qr_path = find(qr_name)
+        if not qr_path:
+            missing.append(qr_name)
+        plain_path = None
+        if rule['pattern'] == 'qr_first':
+            plain_name = rule['plain_name'].format(**names)
+            plain_path = find(plain_name)
+            if not plain_path:
+                missing.append(plain_name)
+        if not qr_path or (rule['pattern'] == 'qr_first' and not plain_path):
+            return None
+        block_w, block_h = shape['block']
+        return {'sku': sku, 'w': block_w, 'h': block_h,
+                'cells': block_cells(rule, block_w, block_h, qr_path, plain_path)}
+
+    def build_pages(self, rule, blocks, sheets=None):
+        """Placements for every sheet of the given blocks."""
+        slot_w, slot_h = slot_size(rule)
+        pages = []
+        for sheet in sheets if sheets is not None else self.layout(rule, blocks):
+            page = []
+            for grid_x, grid_y, block in sheet:
+                for col, row, path in block['cells']:
+                    xy = ((grid_x + col) * slot_w, (grid_y + row) * slot_h)
+                    page.append(placement(path, (slot_w, slot_h), xy, mirror=rule['mirror'],
+                                          fit=rule['fit'], center=rule['center']))
+            pages.append(page)
+        return pages
+
+    def run(self, product, csv_path, logo_root=None, output_folder=None, subfolder="All", pdf=True,
+            image_format="png", pdf_mode="raster"):
+        """Lay out one CSV. Returns the output folder. See render_pages for image_format and pdf_mode."""
+        rule = PRODUCT_RULES[product]
+        base_dir = os.path.dirname(os.path.abspath(csv_path))
+        logo_root = logo_root or os.path.join(base_dir, 'logos')
+        if output_folder is None:
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            output_folder = os.path.join(base_dir, rule['output_folder'], timestamp)
+        os.makedirs(output_folder, exist_ok=True)
+
+        blocks, missing, no_sku = self.collect_blocks(rule, csv_path, logo_root, subfolder)
+        # Report every missing logo and SKU-less line up front, before any rendering
+        for name in missing:
+            print(f"⚠️ File not found: {name}")
+        if missing:
+            with open(os.path.join(output_folder, "missing_logos.txt"), "w") as f:
+                f.write("\n".join(missing))
+        if no_sku:
+            with open(os.path.join(output_folder, "missing_skus.txt"), "w") as f:
+                f.write("\n".join(no_sku))
+
+        sheets = self.layout(rule, blocks)
+        self._report_utilization(rule, sheets, output_folder)
+        pages = self.build_pages(rule, blocks, sheets)
+        png_paths = [os.path.join(output_folder, rule['page_name'].format(n=n + 1)) for n in range(len(pages))]
+        pdf_path = os.path.join(output_folder, rule['pdf_name']) if pdf and pages else None
+        if self.pool is None:
+            self.pool = make_render_pool(self.workers)
+        render_pages(pages, rule['page_px'], DPI, png_paths=png_paths, pdf_path=pdf_path,
+                     workers=self.workers, pool=self.pool, image_format=image_format, pdf_mode=pdf_mode,
+                     tile_cache_dir=os.path.join(base_dir, TILE_CACHE_FOLDER))
+
+        print(f"✅ Done. Created {len(pages)} A4 page(s) in '{output_folder}' folder.")
+        if missing:
+            print(f"⚠️ Missing {len(missing)} logo(s). See 'missing_logos.txt' for details.")
+        if no_sku:
+            print(f"⚠️ Skipped {len(no_sku)} line(s) without a SKU. See 'missing_skus.txt' for details.")
+        return output_folder
+
+    def _report_utilization(self, rule, sheets, output_folder):
+        used = utilization(sheets, rule['grid'])
+        if not used:
+            return
+        with open(os.path.join(output_folder, "sheet_utilization.txt"), "w") as f:
+            for n, fraction in enumerate(used):
+                f.write(f"{rule['page_name'].format(n=n + 1)}\t{fraction:.1%}\n")
+        print(f"📐 {len(sheets)} sheet(s), {sum(used) / len(used):.0%} average slot utilization, "
+              f"lowest {min(used):.0%} (see 'sheet_utilization.txt')")
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lay out A4 transfer sheets for one or more order CSVs.")
+    parser.add_argument("jobs", nargs="+", metavar="PRODUCT:CSV",
+                        help=f"product ({', '.join(PRODUCT_RULES)}) and orders CSV, e.g. sock:sock/data.csv")
+    parser.add_argument("--logos", help="logo folder (default: logos/ next to each CSV)")
+    parser.add_argument("--subfolder", default="All", help="logo subfolder to search (default: All)")
+    parser.add_argument("--out", help="output folder base (default: the product's folder next to each CSV)")
+    parser.add_argument("--workers", type=int, help="render processes (default: one per CPU)")
+    parser.add_argument("--no-pdf", action="store_true", help="write per-page PNGs only")
+    parser.add_argument("--image-format", choices=IMAGE_FORMATS, default="png",
+                        help="per-page image encoding; palette/auto are lossless (default: png)")
+    parser.add_argument("--pdf-mode", choices=("raster", "embed"), default="raster",
+                        help="raster: one image per sheet; embed: original logos placed by coordinates")
+    args = parser.parse_args(argv)
+
+    jobs = []
+    for job in args.jobs:
+        product, sep, csv_path = job.partition(":")
+        if not sep or product not in PRODUCT_RULES:
+            parser.error(f"bad job '{job}': expected PRODUCT:CSV with PRODUCT one of {', '.join(PRODUCT_RULES)}")
+        jobs.append((product, csv_path))
+
+    engine = LayoutEngine(workers=args.workers)
+    try:
+        for n, (product, csv_path) in enumerate(jobs):
+            output_folder = None
+            if args.out:
+                timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+                output_folder = os.path.join(args.out, f"{timestamp}_{n + 1}_{product}")
+            print(f"📄 {product}: {csv_path}")
+            engine.run(product, csv_path, logo_root=args.logos, output_folder=output_folder,
+                       subfolder=args.subfolder, pdf=not args.no_pdf,
+                       image_format=args.image_format, pdf_mode=args.pdf_mode)
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import os
+import zlib
+import numpy as np
+from PIL import Image
+
+# Sheet image formats:
+#   png     - full RGBA PNG (the original output)
+#   palette - 8-bit palette PNG with transparency, used only when the sheet has <= 256 colours,
+#             or 1-bit PNG when the sheet flattened onto white is pure black and white
+#   quantized - 8-bit palette PNG reduced to 256 colours (lossy at anti-aliased edges only,
+#             for few-colour artwork)
+#   tiff    - RGBA TIFF with lossless deflate compression
+#   auto    - palette when it is lossless, otherwise png
+IMAGE_FORMATS = ("png", "palette", "quantized", "tiff", "auto")
+PNG_COMPRESS_LEVEL = 6
+
+
+def _palette(canvas):
+    """
+    Lossless compact version of an RGBA sheet: mode "1" if it is pure black and
+    white once flattened onto white, else mode "P" with per-entry transparency.
+    None if the sheet has more than 256 colours.
+    """
+    colors = canvas.getcolors(256)
+    if colors is None:
+        return None
+    if all(rgba[3] == 0 or rgba[:3] in ((0, 0, 0), (255, 255, 255)) and rgba[3] == 255 for _, rgba in colors):
+        flat = Image.new("RGB", canvas.size, (255, 255, 255))
+        flat.paste(canvas, (0, 0), canvas)
+        return flat.convert("L").convert("1", dither=Image.NONE)
+
+    # Index every pixel by its packed RGBA value against the sorted palette in one numpy pass
+    packed = np.asarray(canvas).view(np.uint32).reshape(canvas.size[1], canvas.size[0])
+    palette = np.unique(np.array([rgba for _, rgba in colors], dtype=np.uint8).view(np.uint32).ravel())
+    index = Image.fromarray(np.searchsorted(palette, packed).astype(np.uint8), mode="L").convert("P")
+    rgba = palette.view(np.uint8).reshape(-1, 4)
+    index.putpalette(rgba[:, :3].tobytes())
+    index.info["transparency"] = rgba[:, 3].tobytes()
+    return index
+
+
+def save_sheet(canvas, path, fmt="png", dpi=300):
+    """
+    Save an RGBA sheet in `fmt` (see IMAGE_FORMATS). `path` is the .png path; TIFF
+    output replaces the extension. Returns the path written.
+    """
+    if fmt in ("palette", "auto"):
+        compact = _palette(canvas)
+        if compact is not None:
+            kwargs = {"transparency": compact.info["transparency"]} if compact.mode == "P" else {}
+            compact.save(path, format="PNG", dpi=(dpi, dpi), compress_level=PNG_COMPRESS_LEVEL, **kwargs)
+            return path
+        if fmt == "palette":
+            print(f"⚠️ {os.path.basename(path)} has more than 256 colours, saving full RGBA PNG")
+    if fmt == "quantized":
+        # Fast octree is the quantizer Pillow supports for RGBA; alpha is kept in the palette
+        compact = canvas.quantize(colors=256, method=Image.FASTOCTREE, dither=Image.NONE)
+        compact.save(path, format="PNG", dpi=(dpi, dpi), compress_level=PNG_COMPRESS_LEVEL)
+        return path
+    if fmt == "tiff":
+        path = os.path.splitext(path)[0] + ".tif"
+        canvas.save(path, format="TIFF", dpi=(dpi, dpi), compression="tiff_adobe_deflate")
+        return path
+    canvas.save(path, format="PNG", dpi=(dpi, dpi), compress_level=PNG_COMPRESS_LEVEL)
+    return path
+
+
+class _PdfStream:
+    """
+    Minimal PDF file written front to back as pages arrive. Only object offsets
+    are kept in memory; the page tree, catalog and xref table are written on
+    close. Object 1 is the catalog and object 2 the page tree.
+    """
+
+    def __init__(self, path, page_size_px, dpi):
+        self.path = path
+        self.size_px = page_size_px
+        self.scale = 72.0 / dpi
+        self.size_pt = (page_size_px[0] * self.scale, page_size_px[1] * self.scale)
+        self.f = open(path, "wb")
+        self.offsets = {}
+        self.pages = []
+        self.next_obj = 3
+        self.f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _alloc(self):
+        self.next_obj += 1
+        return self.next_obj - 1
+
+    def _write_obj(self, num, body, stream=None):
+        self.offsets[num] = self.f.tell()
+        self.f.write(b"%d 0 obj\n" % num + body)
+        if stream is not None:
+            self.f.write(b"\nstream\n" + stream + b"\nendstream")
+        self.f.write(b"\nendobj\n")
+
+    def _write_page(self, content, xobjects):
+        """Write a page with a (deflated) content stream and {name: object number} XObjects."""
+        content_obj, page_obj = self._alloc(), self._alloc()
+        self._write_obj(content_obj, b"<< /Length %d /Filter /FlateDecode >>" % len(content), content)
+        resources = b" ".join(b"/%s %d 0 R" % (name, obj) for name, obj in xobjects.items())
+        self._write_obj(page_obj, (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] "
+            b"/Resources << /XObject << %s >> >> /Contents %d 0 R >>"
+            % (self.size_pt[0], self.size_pt[1], resources, content_obj)
+        ))
+        self.pages.append(page_obj)
+
+    def _write_image(self, width, height, color_space, data, smask_obj=None):
+        """Write a deflated 8-bit image XObject; returns its object number."""
+        num = self._alloc()
+        smask = b" /SMask %d 0 R" % smask_obj if smask_obj else b""
+        self._write_obj(num, (
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /%s "
+            b"/BitsPerComponent 8 /Filter /FlateDecode%s /Length %d >>"
+            % (width, height, color_space, smask, len(data))
+        ), data)
+        return num
+
+    def close(self):
+        kids = b" ".join(b"%d 0 R" % num for num in self.pages)
+        self._write_obj(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.pages)))
+        self._write_obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        xref_offset = self.f.tell()
+        self.f.write(b"xref\n0 %d\n0000000000 65535 f \n" % self.next_obj)
+        for num in range(1, self.next_obj):
+            self.f.write(b"%010d 00000 n \n" % self.offsets[num])
+        self.f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self.next_obj, xref_offset))
+        self.f.close()
+
+
+class StreamingPdfWriter(_PdfStream):
+    """PDF of rasterized sheets: one full-page image per page."""
+
+    def add_page(self, rgb_deflated):
+        """Append a page from deflated 8-bit RGB pixel data of the writer's page size."""
+        image_obj = self._write_image(self.size_px[0], self.size_px[1], b"DeviceRGB", rgb_deflated)
+        content = zlib.compress(b"q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q" % self.size_pt)
+        self._write_page(content, {b"Im0": image_obj})
+
+
+class PlacementPdfWriter(_PdfStream):
+    """
+    PDF that embeds each distinct logo once, at its original resolution, and draws
+    it at every placement with a transform (scale, mirror, position) instead of
+    rasterizing whole sheets.
+    """
+
+    def __init__(self, path, page_size_px, dpi):
+        super().__init__(path, page_size_px, dpi)
+        self.images = {}
+
+    def _image(self, path):
+        """(object number, width, height) of the embedded logo, writing it on first use."""
+        entry = self.images.get(path)
+        if entry is not None:
+            return entry
+        logo = Image.open(path).convert("RGBA")
+        width, height = logo.size
+        alpha = logo.getchannel("A")
+        mask_obj = None
+        if alpha.getextrema() != (255, 255):
+            mask_obj = self._write_image(width, height, b"DeviceGray", zlib.compress(alpha.tobytes(), 6))
+        image_obj = self._write_image(width, height, b"DeviceRGB",
+                                      zlib.compress(logo.convert("RGB").tobytes(), 6), mask_obj)
+        entry = self.images[path] = (image_obj, width, height)
+        return entry
+
+    def add_page(self, placements):
+        """Append a page drawing the given sheet_renderer Placements."""
+        ops = []
+        xobjects = {}
+        for p in placements:
+            image_obj, width, height = self._image(p.path)
+            name = b"Im%d" % image_obj
+            xobjects[name] = image_obj
+            w, h = p.slot_w, p.slot_h
+            if p.fit == "contain":
+                ratio = width / height
+                if ratio > p.slot_w / p.slot_h:
+                    w, h = p.slot_w, int(p.slot_w / ratio)
+                else:
+                    w, h = int(p.slot_h * ratio), p.slot_h
+            x, y = p.x, p.y
+            if p.center:
+                x += (p.slot_w - w) // 2
+                y += (p.slot_h - h) // 2
+            # Pixel box from the top-left -> PDF points from the bottom-left; mirror with a negative x scale
+            sx, sy = w * self.scale, h * self.scale
+            tx, ty = x * self.scale, self.size_pt[1] - (y + h) * self.scale
+            if p.mirror:
+                sx, tx = -sx, tx + sx
+            ops.append(b"q %.3f 0 0 %.3f %.3f %.3f cm /%s Do Q" % (sx, sy, tx, ty, name))
+        self._write_page(zlib.compress(b"\n".join(ops), 6), xobjects)
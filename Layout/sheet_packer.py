@@ -0,0 +1,81 @@
+class _Sheet:
+    """Occupancy of one sheet's slot grid: one int bitmask per grid row."""
+
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = [0] * rows
+        self.free = cols * rows
+        self.placed = []
+
+    def find(self, w, h):
+        """Top-most, then left-most (x, y) where a w×h block fits, or None."""
+        mask = (1 << w) - 1
+        rows = self.rows
+        for y in range(len(rows) - h + 1):
+            for x in range(self.cols - w + 1):
+                shifted = mask << x
+                if all(not (rows[y + dy] & shifted) for dy in range(h)):
+                    return x, y
+        return None
+
+    def place(self, x, y, block):
+        shifted = ((1 << block['w']) - 1) << x
+        for dy in range(block['h']):
+            self.rows[y + dy] |= shifted
+        self.free -= block['w'] * block['h']
+        self.placed.append((x, y, block))
+
+
+def pack_blocks(blocks, grid):
+    """
+    First-fit decreasing 2-D packing of w×h blocks onto as few sheets of a
+    (cols, rows) slot grid as possible. Blocks are sorted by area, then height
+    (stable, so same-shaped blocks keep their order); each goes to the first
+    sheet where it fits at the top-most, left-most free position. Blocks never
+    rotate, since the artwork orientation is fixed.
+
+    Returns (sheets, skipped): each sheet is a list of (grid_col, grid_row, block),
+    and skipped holds blocks larger than the grid.
+    """
+    cols, rows = grid
+    order = sorted(blocks, key=lambda b: (b['w'] * b['h'], b['h']), reverse=True)
+    sheets = []
+    skipped = []
+    # Cells only ever fill up, so a sheet that had no room for a shape never will:
+    # each shape resumes its search at the first sheet that might still fit it.
+    first_open = {}
+    for block in order:
+        w, h = block['w'], block['h']
+        if w > cols or h > rows:
+            skipped.append(block)
+            continue
+        area = w * h
+        start = first_open.get((w, h), 0)
+        for idx in range(start, len(sheets)):
+            sheet = sheets[idx]
+            spot = sheet.find(w, h) if sheet.free >= area else None
+            if spot is not None:
+                sheet.place(spot[0], spot[1], block)
+                break
+            start = idx + 1
+        else:
+            sheet = _Sheet(cols, rows)
+            sheet.place(0, 0, block)
+            sheets.append(sheet)
+            start = len(sheets) - 1
+        first_open[(w, h)] = start
+    return [sheet.placed for sheet in sheets], skipped
+
+
+def utilization(sheets, grid):
+    """Fraction of slots used on each sheet."""
+    cells = grid[0] * grid[1]
+    return [sum(block['w'] * block['h'] for _, _, block in sheet) / cells for sheet in sheets]
+
+
+def pack_layout(rule, blocks):
+    """LayoutEngine layout hook: pack a rule's blocks with pack_blocks."""
+    sheets, skipped = pack_blocks(blocks, rule['grid'])
+    for block in skipped:
+        print(f"⚠️ Block {block['w']}×{block['h']} for {block['sku']} is larger than the {rule['grid']} grid")
+    return sheets
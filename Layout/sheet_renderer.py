@@ -0,0 +1,125 @@
+import os
+import zlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from PIL import Image
+
+from tile_cache import TileCache
+from sheet_output import StreamingPdfWriter, PlacementPdfWriter, save_sheet
+
+# One logo on a sheet: the tile for `path` sized to (slot_w, slot_h) goes at (x, y),
+# optionally centered inside the slot (for fit="contain" tiles smaller than the slot).
+Placement = namedtuple("Placement", "path slot_w slot_h mirror fit x y center")
+
+
+def placement(path, slot, xy, mirror=True, fit="stretch", center=False):
+    return Placement(path, slot[0], slot[1], mirror, fit, xy[0], xy[1], center)
+
+
+# === Page composition (runs in worker processes) ===
+
+_tile_caches = {}
+_tile_budget_mb = 256
+
+
+def _init_worker(budget_mb):
+    global _tile_budget_mb
+    _tile_budget_mb = budget_mb
+
+
+def _worker_tiles(tile_cache_dir):
+    # One cache per tile folder, kept for the life of the worker so later jobs reuse decoded logos
+    tiles = _tile_caches.get(tile_cache_dir)
+    if tiles is None:
+        tiles = _tile_caches[tile_cache_dir] = TileCache(budget_mb=_tile_budget_mb, disk_dir=tile_cache_dir)
+    return tiles
+
+
+def compose_page(placements, canvas_size, tiles):
+    canvas = Image.new("RGBA", canvas_size, (255, 255, 255, 0))
+    for p in placements:
+        tile = tiles.get(p.path, (p.slot_w, p.slot_h), mirror=p.mirror, fit=p.fit)
+        x, y = p.x, p.y
+        if p.center:
+            x += (p.slot_w - tile.width) // 2
+            y += (p.slot_h - tile.height) // 2
+        canvas.paste(tile, (x, y), tile)
+    return canvas
+
+
+def _render_page(page_num, placements, canvas_size, dpi, png_path, want_pdf, tile_cache_dir, image_format):
+    if not png_path and not want_pdf:
+        return page_num, None, None
+    canvas = compose_page(placements, canvas_size, _worker_tiles(tile_cache_dir))
+    if png_path:
+        png_path = save_sheet(canvas, png_path, image_format, dpi)
+    pdf_data = None
+    if want_pdf:
+        # Print-ready page: flatten onto white and deflate here, so the parent only writes bytes.
+        page = Image.new("RGB", canvas_size, (255, 255, 255))
+        page.paste(canvas, (0, 0), canvas)
+        pdf_data = zlib.compress(page.tobytes(), 6)
+    return page_num, png_path, pdf_data
+
+
+# === Driver ===
+
+def make_render_pool(workers=None, tile_budget_mb=256):
+    """Process pool for render_pages; pass it to several calls to reuse warm workers and tile caches."""
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_worker,
+                               initargs=(tile_budget_mb,))
+
+
+def render_pages(pages, canvas_size, dpi, png_paths=None, pdf_path=None, workers=None, max_in_flight=None,
+                 tile_cache_dir=None, tile_budget_mb=256, pool=None, image_format="png", pdf_mode="raster"):
+    """
+    Render sheets (lists of Placements) on a process pool.
+    At most `max_in_flight` pages are rendering or waiting to be written at once, so
+    memory stays bounded however long the run is. Pages are saved as PNGs by the
+    workers (`png_paths[i]`, or None to skip) and streamed into one multi-page PDF
+    at `pdf_path` in page order. An existing `pool` (see make_render_pool) is used
+    as is; otherwise one is created for this call.
+
+    image_format picks the per-page image encoding (see sheet_output.IMAGE_FORMATS).
+    pdf_mode "raster" puts each rendered sheet in the PDF as one image; "embed"
+    embeds each logo once and places it by coordinates, without rasterizing.
+    """
+    own_pool = pool is None
+    if own_pool:
+        pool = make_render_pool(workers, tile_budget_mb)
+    max_in_flight = max_in_flight or 2 * (workers or os.cpu_count() or 1)
+    png_paths = png_paths or [None] * len(pages)
+    total = len(pages)
+    writer = None
+    if pdf_path:
+        writer_class = PlacementPdfWriter if pdf_mode == "embed" else StreamingPdfWriter
+        writer = writer_class(pdf_path, canvas_size, dpi)
+    raster_pdf = writer is not None and pdf_mode != "embed"
+
+    done = {}
+    next_to_write = 0
+    submitted = 0
+    pending = set()
+    try:
+        while next_to_write < total:
+            # Keep the window full; finished-but-unwritten pages count against it.
+            while submitted < total and len(pending) + len(done) < max_in_flight:
+                pending.add(pool.submit(_render_page, submitted, pages[submitted], canvas_size, dpi,
+                                        png_paths[submitted], raster_pdf, tile_cache_dir, image_format))
+                submitted += 1
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                page_num, _, pdf_data = future.result()
+                done[page_num] = pdf_data
+            while next_to_write in done:
+                pdf_data = done.pop(next_to_write)
+                if writer:
+                    writer.add_page(pdf_data if raster_pdf else pages[next_to_write])
+                next_to_write += 1
+                print(f"🖨️ Rendered page {next_to_write}/{total}")
+    finally:
+        if own_pool:
+            pool.shutdown()
+        if writer:
+            writer.close()
+    return total
@@ -0,0 +1,125 @@
+import os
+import hashlib
+from collections import OrderedDict
+from PIL import Image
+
+# Pillow version compatibility
+try:
+    LANCZOS = Image.Resampling.LANCZOS
+except AttributeError:
+    LANCZOS = Image.ANTIALIAS
+
+DEFAULT_BUDGET_MB = 512
+
+
+class TileCache:
+    """
+    Decoded, resized logo tiles keyed by (path, mtime, size, slot size, mirror, fit).
+    Each logo is opened, converted to RGBA, resized and mirrored once per run; the
+    tiles stay in memory under an LRU byte budget. With `disk_dir` set, tiles are
+    also written there as raw RGBA so later runs over the same SKUs skip decoding
+    and resampling; a changed source file gets a new key and is rendered again.
+    """
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB, disk_dir=None):
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.disk_dir = disk_dir
+        self.tiles = OrderedDict()
+        self.used = 0
+        self.stats = {}
+        self.hits = self.disk_hits = self.renders = self.evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _key(self, path, slot, mirror, fit):
+        path = os.path.abspath(path)
+        stat = self.stats.get(path)
+        if stat is None:
+            st = os.stat(path)
+            stat = self.stats[path] = (st.st_mtime_ns, st.st_size)
+        return (path, stat[0], stat[1], tuple(slot), bool(mirror), fit)
+
+    def get(self, path, slot, mirror=False, fit="stretch"):
+        """
+        RGBA tile for the logo at `path` sized for a (width, height) slot.
+        fit="stretch" fills the slot exactly; fit="contain" keeps the aspect ratio
+        and fits inside the slot. The returned image is shared: do not modify it.
+        """
+        key = self._key(path, slot, mirror, fit)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+
+        tile = self._read_disk(key)
+        if tile is None:
+            tile = self._render(path, slot, mirror, fit)
+            self.renders += 1
+            self._write_disk(key, tile)
+        else:
+            self.disk_hits += 1
+        self._store(key, tile)
+        return tile
+
+    def _render(self, path, slot, mirror, fit):
+        logo = Image.open(path).convert("RGBA")
+        slot_w, slot_h = slot
+        if fit == "contain":
+            logo_ratio = logo.width / logo.height
+            if logo_ratio > slot_w / slot_h:
+                size = (slot_w, int(slot_w / logo_ratio))
+            else:
+                size = (int(slot_h * logo_ratio), slot_h)
+        else:
+            size = (slot_w, slot_h)
+        logo = logo.resize(size, LANCZOS)
+        # Mirroring after the resize is equivalent and touches fewer pixels
+        return logo.transpose(Image.FLIP_LEFT_RIGHT) if mirror else logo
+
+    def _store(self, key, tile):
+        nbytes = tile.width * tile.height * 4
+        self.tiles[key] = tile
+        self.used += nbytes
+        while self.used > self.budget and len(self.tiles) > 1:
+            _, old = self.tiles.popitem(last=False)
+            self.used -= old.width * old.height * 4
+            self.evictions += 1
+
+    # === Disk persistence ===
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, digest + ".rgba")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "rb") as f:
+                width = int.from_bytes(f.read(4), "little")
+                height = int.from_bytes(f.read(4), "little")
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) != width * height * 4:
+            return None
+        return Image.frombytes("RGBA", (width, height), data)
+
+    def _write_disk(self, key, tile):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(tile.width.to_bytes(4, "little"))
+                f.write(tile.height.to_bytes(4, "little"))
+                f.write(tile.tobytes())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write tile cache: {e}")
+
+    def summary(self):
+        return (f"{self.renders} rendered, {self.disk_hits} from disk, {self.hits} from memory, "
+                f"{self.evictions} evicted, {self.used / 1048576:.0f} MB in memory")
@@ -0,0 +1,372 @@
+"""
+Station benchmark suite: generates synthetic inputs at a chosen scale, times each
+hot path, writes the results as JSON and compares them with a saved baseline.
+
+    python -m benchmarks.run --scale medium                 # run and compare with benchmarks/baseline.json
+    python -m benchmarks.run --scale medium --save-baseline # record a new baseline
+    python -m benchmarks.run --only orders,scan --threshold 0.1
+
+Every case reports a primary `seconds` (best of --repeat runs); the run exits
+with status 1 if any case is more than --threshold slower than the baseline for
+the same scale. Run from the repository root.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+
+from benchmarks import synthetic
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+LAYOUT_DIR = os.path.join(os.path.dirname(BENCH_DIR), "Layout")
+MIN_DELTA = 0.002
+
+# Input sizes per scale: order lines, QR frames, label pages, Layout sheet lines
+SCALES = {
+    "small": {"order_lines": 100, "qr_frames": 30, "label_pages": 200, "layout_lines": 8},
+    "medium": {"order_lines": 10000, "qr_frames": 100, "label_pages": 2000, "layout_lines": 40},
+    "large": {"order_lines": 100000, "qr_frames": 300, "label_pages": 5000, "layout_lines": 160},
+}
+
+
+def best_of(fn, repeat):
+    """(best seconds, last return value) over `repeat` calls of fn."""
+    best, value = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+# === Cases: each takes (work dir, scale settings, repeat) and returns {name: result} ===
+
+def bench_orders(work, scale, repeat):
+    """extract_all_customer_orders: a cold parse, and a warm start from the on-disk cache."""
+    from src.extract_customer_info import extract_all_customer_orders, _cache_path
+
+    csv_path = os.path.join(work, f"bench_orders_{scale['order_lines']}.csv")
+    synthetic.write_orders_csv(csv_path, scale["order_lines"])
+    try:
+        parse, orders = best_of(lambda: extract_all_customer_orders(csv_path, use_cache=False), repeat)
+        extract_all_customer_orders(csv_path)
+        cached, _ = best_of(lambda: extract_all_customer_orders(csv_path), repeat)
+    finally:
+        try:
+            os.remove(_cache_path(csv_path))
+        except OSError:
+            pass
+    lines = scale["order_lines"]
+    return {
+        "orders.parse": {"seconds": parse, "ops": lines, "per_op_us": parse / lines * 1e6, "orders": len(orders)},
+        "orders.cached": {"seconds": cached, "ops": lines, "per_op_us": cached / lines * 1e6},
+    }
+
+
+def bench_qr(work, scale, repeat):
+    """QR decode of noisy, blurred, rotated camera-like frames through the decoder cascade."""
+    from utils.qr_decoder import QRDecoder
+
+    frames = synthetic.qr_frames(synthetic.make_skus(50), scale["qr_frames"])
+    decoder = QRDecoder()
+    decoder.decode(frames[0][1])  # load the models outside the timing
+
+    def run():
+        return sum(1 for sku, frame in frames if sku in decoder.decode(frame)[0])
+
+    seconds, hits = best_of(run, repeat)
+    count = len(frames)
+    return {"qr.decode": {"seconds": seconds, "ops": count, "per_op_us": seconds / count * 1e6,
+                          "hit_rate": hits / count, "backends": decoder.stats()}}
+
+
+def _scan_sequence(manager, seed=0):
+    """Every scan needed to complete all orders, shuffled like a picker working a wave."""
+    skus = []
+    for order in manager.orders:
+        for item in order["items"]:
+            if item["sku"] not in ("", "nan"):
+                skus.extend([item["sku"]] * item["quantity"])
+    random.Random(seed).shuffle(skus)
+    return skus
+
+
+def bench_scan(work, scale, repeat):
+    """
+    The scan path of process_order without Tk: OrderManager.apply_scan alone, and
+    apply_scan plus the journal write the GUI does for every scan.
+    """
+    from src.extract_customer_info import extract_all_customer_orders
+    from src.order_manager import OrderManager
+    from src.scan_journal import ScanJournal
+
+    csv_path = os.path.join(work, "scan_orders.csv")
+    synthetic.write_orders_csv(csv_path, scale["order_lines"], seed=1)
+    orders = extract_all_customer_orders(csv_path, use_cache=False)
+    skus = _scan_sequence(OrderManager(orders))
+
+    def apply_all():
+        manager = OrderManager(orders)
+        start = time.perf_counter()
+        for sku in skus:
+            manager.apply_scan(sku)
+        return time.perf_counter() - start, manager
+
+    def journaled():
+        journal_dir = tempfile.mkdtemp(dir=work)
+        manager = OrderManager(orders)
+        journal = ScanJournal(manager, journal_dir=journal_dir, scan_log_path=os.path.join(journal_dir, "log.csv"))
+        journal.start()
+        start = time.perf_counter()
+        for sku in skus:
+            manager.apply_scan(sku)
+            journal.record_scan(sku)
+        # What the Tk thread pays; the group-commit writer flushes in the background
+        elapsed = time.perf_counter() - start
+        journal.close()
+        shutil.rmtree(journal_dir, ignore_errors=True)
+        return elapsed, manager
+
+    results = {}
+    for name, run in (("scan.apply", apply_all), ("scan.process_order", journaled)):
+        timings = [run() for _ in range(repeat)]
+        seconds = min(t for t, _ in timings)
+        manager = timings[-1][1]
+        results[name] = {"seconds": seconds, "ops": len(skus), "per_op_us": seconds / max(len(skus), 1) * 1e6,
+                         "complete_orders": manager.fully_scanned_orders}
+    return results
+
+
+def bench_render(work, scale, repeat):
+    """Order list rendering: building the virtualized view, then refreshing rows after each scan."""
+    import tkinter as tk
+    from src.extract_customer_info import extract_all_customer_orders
+    from src.order_manager import OrderManager
+    from src.order_list_view import OrderListView
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return {"render.orders": {"skipped": f"no display ({e})"}}
+    try:
+        root.geometry("1000x800")
+        csv_path = os.path.join(work, "render_orders.csv")
+        synthetic.write_orders_csv(csv_path, scale["order_lines"], seed=2)
+        orders = extract_all_customer_orders(csv_path, use_cache=False)
+        skus = _scan_sequence(OrderManager(orders))[:2000]
+
+        def build():
+            frame = tk.Frame(root)
+            frame.pack(fill="both", expand=True)
+            view = OrderListView(frame, OrderManager(orders), lambda name: None, lambda order_idx: None)
+            root.update()
+            return frame, view
+
+        build_seconds, (frame, view) = best_of(build, 1)
+
+        start = time.perf_counter()
+        for sku in skus:
+            touched, _ = view.manager.apply_scan(sku)
+            if touched:
+                view.scroll_to(touched[0])
+            view.refresh_rows(touched)
+            root.update_idletasks()
+        scan_seconds = time.perf_counter() - start
+        frame.destroy()
+    finally:
+        root.destroy()
+    return {
+        "render.build": {"seconds": build_seconds, "ops": len(orders)},
+        "render.scan": {"seconds": scan_seconds, "ops": len(skus), "per_op_us": scan_seconds / max(len(skus), 1) * 1e6},
+    }
+
+
+def bench_labels(work, scale, repeat):
+    """
+    Shipping labels: indexing a multi-thousand-page label PDF, then the lookups
+    fetch_shipping_label does (order ID, exact name, and a substring miss).
+    """
+    from src.label_store import LabelStore
+
+    orders = synthetic.write_orders_csv(os.path.join(work, "label_orders.csv"), scale["label_pages"] * 2, seed=3)
+    orders = orders[:scale["label_pages"]]
+    pdf_path = synthetic.write_label_pdf(os.path.join(work, "labels.pdf"), orders)
+
+    index_seconds, store = best_of(lambda: LabelStore(pdf_path, cache_dir=tempfile.mkdtemp(dir=work)), 1)
+    reopen_seconds, store = best_of(lambda: LabelStore(pdf_path, cache_dir=store.cache_dir), repeat)
+
+    lookups = [(None, order_id) for order_id, *_ in orders] + [(f"{first} {last}", None) for _, first, last, _ in orders]
+    random.Random(0).shuffle(lookups)
+    lookup_seconds, found = best_of(lambda: sum(1 for name, order_id in lookups
+                                                if store.find_page(customer_name=name, order_id=order_id)), repeat)
+    misses = ["Nobody Atall"] * 50
+    miss_seconds, _ = best_of(lambda: [store.find_page(customer_name=name) for name in misses], repeat)
+    pages = store.page_count()
+    return {
+        "labels.index": {"seconds": index_seconds, "ops": pages, "per_op_us": index_seconds / pages * 1e6},
+        "labels.reopen": {"seconds": reopen_seconds, "ops": pages},
+        "labels.lookup": {"seconds": lookup_seconds, "ops": len(lookups),
+                          "per_op_us": lookup_seconds / len(lookups) * 1e6, "found": found},
+        "labels.lookup_miss": {"seconds": miss_seconds, "ops": len(misses),
+                               "per_op_us": miss_seconds / len(misses) * 1e6},
+    }
+
+
+def bench_layout(work, scale, repeat):
+    """Layout sheets: packing and rendering sock sheets (PNG pages plus the raster PDF) with a cold and warm engine."""
+    if LAYOUT_DIR not in sys.path:
+        sys.path.insert(0, LAYOUT_DIR)
+    from layout_engine import PRODUCT_RULES, LayoutEngine
+
+    job_dir = os.path.join(work, "layout")
+    skus = synthetic.make_skus(12, seed=4, prefix="SCKPO3_")
+    synthetic.write_logo_folder(os.path.join(job_dir, "logos"), skus)
+    csv_path = os.path.join(job_dir, "data.csv")
+    synthetic.write_orders_csv(csv_path, scale["layout_lines"], seed=4, skus=skus, missing_sku_rate=0)
+
+    rule = PRODUCT_RULES["sock"]
+    engine = LayoutEngine()
+    try:
+        def pack():
+            blocks, _, _ = engine.collect_blocks(rule, csv_path, os.path.join(job_dir, "logos"))
+            return engine.build_pages(rule, blocks)
+
+        pack_seconds, pages = best_of(pack, repeat)
+        runs = []
+        for n in range(max(repeat, 2)):
+            out = os.path.join(job_dir, f"out_{n}")
+            start = time.perf_counter()
+            engine.run("sock", csv_path, output_folder=out)
+            runs.append(time.perf_counter() - start)
+            shutil.rmtree(out, ignore_errors=True)
+    finally:
+        engine.close()
+    return {
+        "layout.pack": {"seconds": pack_seconds, "ops": len(pages)},
+        "layout.render_cold": {"seconds": runs[0], "ops": len(pages), "per_op_us": runs[0] / max(len(pages), 1) * 1e6},
+        "layout.render_warm": {"seconds": min(runs[1:]), "ops": len(pages),
+                               "per_op_us": min(runs[1:]) / max(len(pages), 1) * 1e6},
+    }
+
+
+CASES = {
+    "orders": bench_orders,
+    "qr": bench_qr,
+    "scan": bench_scan,
+    "render": bench_render,
+    "labels": bench_labels,
+    "layout": bench_layout,
+}
+
+
+# === Results ===
+
+def compare(results, baseline, threshold, min_delta=MIN_DELTA):
+    """
+    (name, ratio) for cases more than `threshold` slower than the baseline. Cases
+    slower by less than `min_delta` seconds are timer noise and never count.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or "seconds" not in result or "seconds" not in base or base["seconds"] <= 0:
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        result["baseline_ratio"] = ratio
+        if ratio > 1 + threshold and result["seconds"] - base["seconds"] > min_delta:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def print_table(results):
+    print(f"{'case':<22}{'seconds':>10}{'ops':>9}{'µs/op':>11}{'vs base':>9}")
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name:<22}{'skipped: ' + result['skipped']}")
+            continue
+        per_op = f"{result['per_op_us']:.1f}" if "per_op_us" in result else ""
+        ratio = f"{result['baseline_ratio']:.2f}" if "baseline_ratio" in result else ""
+        print(f"{name:<22}{result['seconds']:>10.3f}{result.get('ops', ''):>9}{per_op:>11}{ratio:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the station's hot paths on synthetic inputs.")
+    parser.add_argument("--scale", choices=SCALES, default="small", help="input size (default: small)")
+    parser.add_argument("--only", help=f"comma-separated cases to run ({', '.join(CASES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the best is kept (default: 3)")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="fail when a case is this fraction slower than the baseline (default: 0.2)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--out", help="results JSON path (default: benchmarks/results/<time>_<scale>.json)")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+
+    scale = SCALES[args.scale]
+    work = tempfile.mkdtemp(prefix="station_bench_")
+    results = {}
+    try:
+        for name in names:
+            print(f"⏱️ {name} ...")
+            results.update(CASES[name](work, scale, args.repeat))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    regressions = []
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("scale") == args.scale:
+            regressions = compare(results, baseline["results"], args.threshold)
+        else:
+            print(f"⚠️ Baseline is for scale '{baseline.get('scale')}', not comparing")
+            baseline = None
+
+    report = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "scale": args.scale,
+        "sizes": scale,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    out_path = args.out
+    if out_path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out_path = os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{args.scale}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+
+    print_table(results)
+    print(f"📄 Results written to {out_path}")
+    if args.save_baseline:
+        print(f"✅ Baseline saved to {args.baseline}")
+    elif baseline is None:
+        print("ℹ️ No baseline to compare with; record one with --save-baseline")
+    if regressions:
+        for name, ratio in regressions:
+            print(f"❌ {name} is {ratio:.2f}× the baseline (threshold {1 + args.threshold:.2f}×)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
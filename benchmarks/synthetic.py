@@ -0,0 +1,203 @@
+"""
+Synthetic but realistic station inputs for the benchmarks: order exports in the
+data/orders.csv schema, camera-like QR images of SKUs, shipping-label PDFs with
+one label per order, and a logo folder for the Layout sheets.
+Everything is generated from a seed, so a given scale always produces the same inputs.
+"""
+import os
+import csv
+import zlib
+import random
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+ORDERS_HEADER = [
+    "Order ID", "Status", "Date", "Channel", "First name", "Last name", "Telephone", "Email", "Currency",
+    "Order total", "Order Weight (grams)", "Lineitem name", "Lineitem SKU", "Lineitem price",
+    "Lineitem quantity", "Lineitem total", "Flags", "Shipping service", "Shipping address company",
+    "Shipping address line1", "Shipping address line2", "Shipping address line3", "Shipping address region",
+    "Shipping address city", "Shipping address post code", "Shipping address country",
+    "Shipping address country code", "Shipping address telephone", "Shipped date", "Assigned team member",
+    "Shipment 1 Method", "Shipment 1 Tracking", "Shipment 2 Method", "Shipment 2 Tracking",
+    "Shipment 3 Method", "Shipment 3 Tracking", "Shipment 4 Method", "Shipment 4 Tracking",
+]
+
+FIRST_NAMES = ["Jenna", "Nick", "Adelle", "Rachel", "Tom", "Priya", "Liam", "Sofia", "Owen", "Grace",
+               "Harry", "Amelia", "Jack", "Isla", "Noah", "Ava", "Leo", "Mia", "Oscar", "Freya"]
+LAST_NAMES = ["Saines", "Cansfield", "French", "Faulkner", "Smith", "Patel", "Jones", "Taylor", "Brown",
+              "Wilson", "Evans", "Thomas", "Roberts", "Walker", "Wright", "Hughes", "Clarke", "Hall"]
+STREETS = ["Baker Street", "Mill Lane", "Hawkswood Drive", "Charnock Crescent", "High Street", "Station Road",
+           "Church Lane", "Park Avenue", "Victoria Road", "Green Lane"]
+CITIES = [("London", "Greater London", "W1U 8EW"), ("Midhurst", "West Sussex", "GU29 0PR"),
+          ("Hailsham", "East Sussex", "BN27 1UR"), ("Sheffield", "South Yorkshire", "S12 3HB"),
+          ("Leeds", "West Yorkshire", "LS1 4AP"), ("Bristol", "Avon", "BS1 5TR"),
+          ("Manchester", "Greater Manchester", "M1 2WD"), ("Norwich", "Norfolk", "NR2 1TF")]
+PRODUCTS = ["Beanie Hat Football Match Day Fan Gift", "Pack Of 2 Trunks Underwear Birthday Gift",
+            "pack of 3 socks black new", "Scarf Winter Supporter Knit", "Baseball Cap Embroidered Crest"]
+TEAMS = ["Woking", "Aldershot Town", "Albania", "Marocco", "Leeds", "Bristol City", "Norwich", "Hull"]
+
+
+def make_skus(count, seed=0, prefix="IF_"):
+    rng = random.Random(seed)
+    return [f"{prefix}{rng.getrandbits(32):08X}" for _ in range(count)]
+
+
+def _customer(rng):
+    street = f"{rng.randint(1, 200)} {rng.choice(STREETS)}"
+    city, region, post_code = rng.choice(CITIES)
+    return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), street, city, region, post_code
+
+
+def write_orders_csv(path, lines, seed=0, skus=None, sku_count=500, missing_sku_rate=0.05):
+    """
+    Write an orders export with `lines` line items in the data/orders.csv schema.
+    Orders have 1-4 lines, mostly quantity 1; a few lines have no SKU, as in real exports.
+    Returns the list of orders written as (order id, first name, last name, address lines).
+    """
+    rng = random.Random(seed)
+    skus = skus or make_skus(sku_count, seed)
+    orders = []
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(ORDERS_HEADER)
+        while written < lines:
+            order_id = f"{rng.randint(10, 99)}-{rng.randint(10000, 99999)}-{rng.randint(10000, 99999)}"
+            first, last, street, city, region, post_code = _customer(rng)
+            orders.append((order_id, first, last, [street, city, region, post_code]))
+            for _ in range(min(rng.choice((1, 1, 1, 2, 2, 3, 4)), lines - written)):
+                sku = "" if rng.random() < missing_sku_rate else rng.choice(skus)
+                quantity = rng.choice((1, 1, 1, 1, 2, 2, 3))
+                name = f"{rng.choice(TEAMS)} {rng.choice(PRODUCTS)}"
+                row = dict.fromkeys(ORDERS_HEADER, "")
+                row.update({
+                    "Order ID": order_id, "Status": "In Progress", "Date": "2025-03-27 10:28:59+00:00",
+                    "Channel": "Ebay: station-bench", "First name": first, "Last name": last,
+                    "Currency": "GBP", "Lineitem name": name, "Lineitem SKU": sku, "Lineitem price": "9.99",
+                    "Lineitem quantity": quantity, "Lineitem total": f"{9.99 * quantity:.2f}",
+                    "Shipping service": "Royal Mail 1st Class", "Shipping address line1": street,
+                    "Shipping address region": region, "Shipping address city": city,
+                    "Shipping address post code": post_code, "Shipping address country": "United Kingdom",
+                    "Shipping address country code": "GB",
+                })
+                writer.writerow([row[column] for column in ORDERS_HEADER])
+                written += 1
+    return orders
+
+
+# === QR images ===
+
+def qr_tile(text, module_px=6):
+    """Black-on-white QR code for `text` with a quiet zone, as a grayscale array."""
+    code = cv2.QRCodeEncoder.create().encode(text)
+    code = cv2.resize(code, None, fx=module_px, fy=module_px, interpolation=cv2.INTER_NEAREST)
+    return cv2.copyMakeBorder(code, 4 * module_px, 4 * module_px, 4 * module_px, 4 * module_px,
+                              cv2.BORDER_CONSTANT, value=255)
+
+
+def qr_frame(text, rng, size=(640, 480), max_angle=25, max_blur=1.6, noise=8.0):
+    """
+    A camera-like BGR frame with the QR code for `text` somewhere in it: random
+    scale, rotation, position, background, blur and sensor noise.
+    """
+    width, height = size
+    tile = qr_tile(text, module_px=rng.randint(4, 7))
+    angle = rng.uniform(-max_angle, max_angle)
+    frame = np.full((height, width), rng.randint(90, 200), dtype=np.uint8)
+
+    # Rotate the tile on a white square large enough for any angle, then paste it at a random spot
+    side = int(max(tile.shape) * 1.45)
+    square = np.full((side, side), 255, dtype=np.uint8)
+    offset = (side - tile.shape[0]) // 2
+    square[offset:offset + tile.shape[0], offset:offset + tile.shape[1]] = tile
+    matrix = cv2.getRotationMatrix2D((side / 2, side / 2), angle, 1.0)
+    square = cv2.warpAffine(square, matrix, (side, side), borderValue=255)
+    side = min(side, width, height)
+    square = square[:side, :side]
+    x, y = rng.randint(0, width - side), rng.randint(0, height - side)
+    frame[y:y + side, x:x + side] = square
+
+    sigma = rng.uniform(0, max_blur)
+    if sigma > 0.3:
+        frame = cv2.GaussianBlur(frame, (0, 0), sigma)
+    noisy = frame.astype(np.float32) + np.random.default_rng(rng.getrandbits(32)).normal(0, noise, frame.shape)
+    return cv2.cvtColor(np.clip(noisy, 0, 255).astype(np.uint8), cv2.COLOR_GRAY2BGR)
+
+
+def qr_frames(skus, count, seed=0, **kwargs):
+    """`count` (sku, frame) pairs cycling through `skus`."""
+    rng = random.Random(seed)
+    return [(skus[i % len(skus)], qr_frame(skus[i % len(skus)], rng, **kwargs)) for i in range(count)]
+
+
+# === Shipping-label PDFs ===
+
+def _pdf_text(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace")
+
+
+def write_label_pdf(path, orders):
+    """
+    Write a shipping-label PDF with one A6 page per order, laid out like the
+    carrier labels: recipient name on the first line, then the address and a
+    "Customer reference:" line with the order ID. `orders` as returned by
+    write_orders_csv. Pages are written one at a time, so any count fits in memory.
+    """
+    offsets = {}
+    page_objs = []
+    with open(path, "wb") as f:
+        def write_obj(num, body, stream=None):
+            offsets[num] = f.tell()
+            f.write(b"%d 0 obj\n" % num + body)
+            if stream is not None:
+                f.write(b"\nstream\n" + stream + b"\nendstream")
+            f.write(b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        write_obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        next_obj = 4
+        for order_id, first, last, address in orders:
+            lines = [f"{first} {last}"] + address + ["United Kingdom", "Royal Mail 1st Class",
+                                                     f"Customer reference: {order_id}"]
+            ops = [b"BT /F1 11 Tf 20 270 Td 14 TL"]
+            ops += [b"(%s) Tj T*" % _pdf_text(line) for line in lines]
+            ops.append(b"ET")
+            content = zlib.compress(b"\n".join(ops))
+            write_obj(next_obj, b"<< /Length %d /Filter /FlateDecode >>" % len(content), content)
+            write_obj(next_obj + 1, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 298 420] "
+                                    b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % next_obj)
+            page_objs.append(next_obj + 1)
+            next_obj += 2
+
+        kids = b" ".join(b"%d 0 R" % num for num in page_objs)
+        write_obj(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_objs)))
+        write_obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        xref_offset = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % next_obj)
+        for num in range(1, next_obj):
+            f.write(b"%010d 00000 n \n" % offsets[num])
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (next_obj, xref_offset))
+    return path
+
+
+# === Layout logos ===
+
+def write_logo_folder(root, skus, size=600, seed=0):
+    """QR{sku}.png and {sku}.png logos for each SKU, as the sock layout expects."""
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+    for sku in skus:
+        tile = qr_tile(sku, module_px=12)
+        qr = Image.fromarray(tile).convert("RGBA").resize((size, size), Image.NEAREST)
+        qr.save(os.path.join(root, f"QR{sku}.png"))
+
+        # A few flat colours on transparency, like the team crests
+        logo = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(logo)
+        colors = [tuple(rng.randint(0, 255) for _ in range(3)) + (255,) for _ in range(3)]
+        draw.ellipse((20, 20, size - 20, size - 20), fill=colors[0])
+        draw.rectangle((size // 4, size // 3, 3 * size // 4, 2 * size // 3), fill=colors[1])
+        draw.text((size // 3, size // 2 - 10), sku[-8:], fill=colors[2])
+        logo.save(os.path.join(root, f"{sku}.png"))
+    return root
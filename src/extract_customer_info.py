@@ -1,6 +1,8 @@
 import pandas as pd
+import numpy as np
 import os
 import sys
+import zipfile
 from typing import List, Dict
 
 def resource_path(relative_path):
@@ -10,42 +12,139 @@ def resource_path(relative_path):
     return os.path.abspath(relative_path)
 
 CSV_ORDERS_PATH = resource_path("data/orders.csv")
+ORDERS_CACHE_DIR = resource_path("data/.orders_cache")
+CACHE_VERSION = 2
 
-def extract_all_customer_orders() -> List[Dict]:
+ADDRESS_COLUMNS = [
+    "Shipping address line1",
+    "Shipping address line2",
+    "Shipping address line3",
+    "Shipping address city",
+    "Shipping address region",
+    "Shipping address post code",
+    "Shipping address country",
+]
+ORDER_ARRAYS = ["order_ids", "names", "addresses", "starts", "products", "skus", "quantities"]
+ORDER_COLUMNS = ["Order ID", "First name", "Last name", "Lineitem name", "Lineitem SKU", "Lineitem quantity"] + ADDRESS_COLUMNS
+
+
+def _cache_path(csv_path):
+    name = os.path.basename(csv_path)
+    return os.path.join(ORDERS_CACHE_DIR, f"{name}.npz")
+
+
+def _cache_key(csv_path):
+    stat = os.stat(csv_path)
+    return np.array([CACHE_VERSION, os.path.abspath(csv_path), stat.st_mtime_ns, stat.st_size], dtype=str)
+
+
+def _load_cached(csv_path, key):
+    try:
+        with np.load(_cache_path(csv_path), allow_pickle=False) as cached:
+            if not np.array_equal(cached["key"], key):
+                return None
+            columns = {name: cached[name] for name in ORDER_ARRAYS}
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+    return orders_from_columns(columns)
+
+
+def _store_cached(csv_path, key, columns):
+    try:
+        os.makedirs(ORDERS_CACHE_DIR, exist_ok=True)
+        tmp_path = _cache_path(csv_path) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, key=key, **columns)
+        os.replace(tmp_path, _cache_path(csv_path))
+    except OSError as e:
+        print(f"⚠️ Could not write orders cache: {e}")
+
+
+def read_orders_frame(csv_path) -> pd.DataFrame:
+    """Read only the columns the order list needs, with the C parser."""
+    return pd.read_csv(csv_path, quoting=1, on_bad_lines='skip', engine='c',
+                       usecols=lambda column: column in ORDER_COLUMNS)
+
+
+def _as_str_list(series):
+    # str() per value keeps the historical "nan" text for empty cells on every pandas version
+    return [str(value) for value in series.tolist()]
+
+
+def order_columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
     """
-    Extract all customer orders from a CSV file with SKU-based product lines.
-    Returns a list of dictionaries with customer details and item list.
+    The order list as flat numpy columns: one entry per order for ids, names and
+    addresses, one per line item for the rest, and each order's first item in "starts".
     """
-    customer_orders = []
+    df = df[df["Order ID"].notna()]
+    df = df.sort_values("Order ID", kind="stable")
 
-    df = pd.read_csv(CSV_ORDERS_PATH, quoting=1, on_bad_lines='skip', engine='python')
-
-    grouped = df.groupby("Order ID")
-    for order_id, group in grouped:
-        first_row = group.iloc[0]
-        name = f"{first_row['First name']} {first_row['Last name']}"
-        address_parts = [
-            str(first_row.get("Shipping address line1", "")),
-            str(first_row.get("Shipping address line2", "")),
-            str(first_row.get("Shipping address line3", "")),
-            str(first_row.get("Shipping address city", "")),
-            str(first_row.get("Shipping address region", "")),
-            str(first_row.get("Shipping address post code", "")),
-            str(first_row.get("Shipping address country", ""))
-        ]
-        address = "\n".join([part for part in address_parts if part and part.strip()])
+    order_ids = df["Order ID"].to_numpy()
+    codes, _ = pd.factorize(order_ids)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(df) else np.array([], dtype=np.int64)
+
+    first = df.iloc[starts]
+    names = [f"{first_name} {last_name}" for first_name, last_name in
+             zip(_as_str_list(first["First name"]), _as_str_list(first["Last name"]))]
+    address_columns = [
+        _as_str_list(first[column]) if column in first else [""] * len(first)
+        for column in ADDRESS_COLUMNS
+    ]
+    addresses = ["\n".join(part for part in parts if part and part.strip()) for parts in zip(*address_columns)]
+
+    return {
+        "order_ids": np.array([str(order_id) for order_id in order_ids[starts]], dtype=str),
+        "names": np.array(names, dtype=str),
+        "addresses": np.array(addresses, dtype=str),
+        "starts": starts.astype(np.int64),
+        "products": np.array([value.strip() for value in _as_str_list(df["Lineitem name"])], dtype=str),
+        "skus": np.array([value.strip() for value in _as_str_list(df["Lineitem SKU"])], dtype=str),
+        "quantities": df["Lineitem quantity"].to_numpy().astype(np.int64),
+    }
 
-        items = []
-        for _, row in group.iterrows():
-            product = str(row["Lineitem name"]).strip()
-            sku = str(row["Lineitem SKU"]).strip()
-            qty = int(row["Lineitem quantity"])
-            items.append({"product": product, "sku": sku, "quantity": qty})
 
-        customer_orders.append({"name": name, "address": address, "items": items})
+def orders_from_columns(columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """Expand order_columns() back into the order/item dictionaries the rest of the app uses."""
+    products = columns["products"].tolist()
+    skus = columns["skus"].tolist()
+    quantities = columns["quantities"].tolist()
+    starts = columns["starts"].tolist()
+    ends = starts[1:] + [len(products)]
 
+    customer_orders = []
+    for order_id, name, address, start, end in zip(columns["order_ids"].tolist(), columns["names"].tolist(),
+                                                   columns["addresses"].tolist(), starts, ends):
+        items = [
+            {"product": products[j], "sku": skus[j], "quantity": quantities[j]}
+            for j in range(start, end)
+        ]
+        customer_orders.append({"order_id": order_id, "name": name, "address": address, "items": items})
     return customer_orders
 
+
+def orders_from_frame(df: pd.DataFrame) -> List[Dict]:
+    """Build the order/item structure with column operations instead of per-row iteration."""
+    return orders_from_columns(order_columns(df))
+
+
+def extract_all_customer_orders(csv_path=CSV_ORDERS_PATH, use_cache=True) -> List[Dict]:
+    """
+    Extract all customer orders from a CSV file with SKU-based product lines.
+    Returns a list of dictionaries with customer details and item list.
+    The parsed columns are cached on disk as numpy arrays and reused while the CSV's mtime and size are unchanged.
+    """
+    key = _cache_key(csv_path) if use_cache else None
+    if use_cache:
+        cached = _load_cached(csv_path, key)
+        if cached is not None:
+            return cached
+
+    columns = order_columns(read_orders_frame(csv_path))
+
+    if use_cache:
+        _store_cached(csv_path, key, columns)
+    return orders_from_columns(columns)
+
 if __name__ == "__main__":
     import json
     orders = extract_all_customer_orders()
@@ -1,6 +1,6 @@
-import PyPDF2
 import sys
 import os
+from src.label_store import get_label_store
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for PyInstaller or dev."""
@@ -12,12 +12,6 @@ label_pdf = resource_path("data/shipping_labels.pdf")
 
 PURCHASE_RECORDS_PATH = resource_path("data/shipping_labels.pdf")
 
-def fetch_shipping_label(customer_name):
-    with open(PURCHASE_RECORDS_PATH, "rb") as file:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for  page_number, page in enumerate(pdf_reader.pages):
-            text = page.extract_text()
-            print(text)
-            if customer_name in text:
-                return page_number+1
\ No newline at end of file
+def fetch_shipping_label(customer_name, order_id=None):
+    """Return the 1-based label page for an order, looked up in the indexed label store."""
+    return get_label_store().find_page(customer_name=customer_name, order_id=order_id)
@@ -0,0 +1,158 @@
+import time
+import threading
+import cv2
+import numpy as np
+
+GATE_SIZE = (80, 60)
+LOCATE_WIDTH = 320
+
+
+class ChangeGate:
+    """
+    Skips decoding while the camera sees a static scene.
+    Consecutive frames are compared on a small blurred grayscale thumbnail;
+    after a change the gate stays open for `hold_seconds` so the frame where
+    the item has settled (and is sharp) still gets decoded. A static scene is
+    still decoded once every `refresh_seconds`, so a code that slid in too
+    slowly to register as a change (or was missed while moving) is not lost.
+    """
+
+    def __init__(self, threshold=4.0, hold_seconds=1.0, refresh_seconds=2.0, size=GATE_SIZE):
+        self.threshold = threshold
+        self.hold_seconds = hold_seconds
+        self.refresh_seconds = refresh_seconds
+        self.size = size
+        self.previous = None
+        self.last_change = 0.0
+        self.last_decode = 0.0
+        self.skipped = 0
+
+    def should_decode(self, frame, now=None):
+        now = time.monotonic() if now is None else now
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        thumb = cv2.GaussianBlur(cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA), (5, 5), 0)
+        previous, self.previous = self.previous, thumb
+        if previous is None or float(cv2.absdiff(thumb, previous).mean()) > self.threshold:
+            self.last_change = now
+        if now - self.last_change <= self.hold_seconds or now - self.last_decode >= self.refresh_seconds:
+            self.last_decode = now
+            return True
+        self.skipped += 1
+        return False
+
+
+def locate_qr_candidates(frame, locate_width=LOCATE_WIDTH, max_candidates=3, pad=0.25):
+    """
+    Find regions that look like a 2-D code on a downscaled frame.
+    QR modules produce strong gradients in both directions; closing the
+    gradient map yields square-ish blobs. Returns full-resolution (x, y, w, h)
+    boxes, padded and largest first.
+    """
+    height, width = frame.shape[:2]
+    scale = locate_width / float(width) if width > locate_width else 1.0
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+    grad_x = cv2.convertScaleAbs(cv2.Sobel(small, cv2.CV_16S, 1, 0, ksize=3))
+    grad_y = cv2.convertScaleAbs(cv2.Sobel(small, cv2.CV_16S, 0, 1, ksize=3))
+    gradient = cv2.min(grad_x, grad_y)
+    gradient = cv2.blur(gradient, (5, 5))
+    _, mask = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 9)))
+    mask = cv2.erode(mask, None, iterations=2)
+    mask = cv2.dilate(mask, None, iterations=2)
+
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    min_side = max(8, int(min(small.shape[:2]) * 0.05))
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if w < min_side or h < min_side:
+            continue
+        if max(w, h) / float(min(w, h)) > 2.5:
+            continue
+        boxes.append((w * h, x, y, w, h))
+    boxes.sort(reverse=True)
+
+    results = []
+    for _, x, y, w, h in boxes[:max_candidates]:
+        results.append(pad_box((x / scale, y / scale, w / scale, h / scale), pad, width, height))
+    return results
+
+
+def pad_box(box, pad, width, height):
+    x, y, w, h = box
+    dx, dy = w * pad, h * pad
+    x0, y0 = max(int(x - dx), 0), max(int(y - dy), 0)
+    x1, y1 = min(int(x + w + dx), width), min(int(y + h + dy), height)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+class RoiDecoder:
+    """
+    Two-stage QR decoding.
+    The last region that decoded is tried first, then candidate regions found on
+    a downscaled frame, each decoded as a full-resolution crop with the fast
+    backends only (a QRDecoder's detectAndDecodeFast). The full frame is only
+    decoded, with the whole cascade, every `full_frame_every` misses as a safety net.
+    Returns (texts, points) like detectAndDecode, with points in frame coordinates.
+    One instance can track a camera whose frames several threads decode: each
+    passes its own detector, and the remembered region is kept under a lock.
+    """
+
+    def __init__(self, detector=None, full_frame_every=5, max_candidates=3):
+        self.detector = detector
+        self.full_frame_every = full_frame_every
+        self.max_candidates = max_candidates
+        self.last_roi = None
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _decode_crop(self, detector, frame, box):
+        x, y, w, h = box
+        decode_crop = getattr(detector, "detectAndDecodeFast", detector.detectAndDecode)
+        texts, points = decode_crop(frame[y:y + h, x:x + w])
+        if not texts:
+            return None
+        offset = np.array([x, y], dtype=np.float32)
+        return list(texts), [np.asarray(p, dtype=np.float32) + offset for p in points]
+
+    def _roi_from_points(self, frame, points):
+        pts = np.asarray(points[0], dtype=np.float32).reshape(-1, 2)
+        x, y = pts.min(axis=0)
+        x1, y1 = pts.max(axis=0)
+        return pad_box((x, y, x1 - x, y1 - y), 0.5, frame.shape[1], frame.shape[0])
+
+    def _hit(self, frame, found):
+        roi = self._roi_from_points(frame, found[1])
+        with self._lock:
+            self.last_roi = roi
+            self.misses = 0
+        return found
+
+    def decode(self, frame, detector=None):
+        detector = detector or self.detector
+        with self._lock:
+            last_roi = self.last_roi
+        if last_roi is not None:
+            found = self._decode_crop(detector, frame, last_roi)
+            if found:
+                return self._hit(frame, found)
+            with self._lock:
+                # Another thread may have found the code somewhere else meanwhile
+                if self.last_roi == last_roi:
+                    self.last_roi = None
+
+        for box in locate_qr_candidates(frame, max_candidates=self.max_candidates):
+            found = self._decode_crop(detector, frame, box)
+            if found:
+                return self._hit(frame, found)
+
+        with self._lock:
+            self.misses += 1
+            full_frame = self.misses % self.full_frame_every == 0
+        if full_frame:
+            texts, points = detector.detectAndDecode(frame)
+            if texts:
+                return self._hit(frame, (list(texts), list(points)))
+        return [], []
@@ -1,13 +1,22 @@
 import tkinter as tk
-from tkinter import Label, Button
+from tkinter import Label, Button, messagebox
 from PIL import Image, ImageTk
 from utils.pdf_printing import extract_and_print_pdf_page
-from utils.qr_scanner import read_qr_code_wechat
-from src.extract_customer_info import extract_all_customer_orders
+from utils.print_spooler import get_print_spooler
+from utils.qr_decoder import get_qr_decoder
+from utils.metrics import get_metrics
+from src.extract_customer_info import extract_all_customer_orders, CSV_ORDERS_PATH
 from src.fetch_shipping_label import fetch_shipping_label
-import cv2
+from src.scan_pipeline import ScanPipeline, camera_sources
+from src.logo_recognition import recognize_logo_sku
+from src.order_manager import OrderManager, order_key
+from src.scan_journal import ScanJournal
+from src.order_list_view import OrderListView
+from src.orders_watcher import OrdersWatcher
+from src.scan_client import get_service_client
+from src.name_matcher import get_name_matcher, resolve_missing_skus
 import os
-import time
+import queue
 import sys
 
 class LogoRecognitionApp:
@@ -15,12 +24,13 @@ class LogoRecognitionApp:
         self.root = frame
         self.root.configure(bg="white")
         self.last_scanned_sku = None
-        self.last_scan_time = 0
 
         video_frame = tk.Frame(frame, bg="white")
         video_frame.pack(side=tk.TOP, padx=10, pady=10)
         self.video_label = Label(video_frame, text="Camera live preview", bg="gray")
         self.video_label.pack(padx=10, pady=5)
+        self.camera_label = Label(video_frame, text="", bg="white", font=("Arial", 9), fg="gray")
+        self.camera_label.pack()
 
         self.qr_code_label = Label(frame, text="", bg="white", font=("Arial", 12), fg="purple")
         self.qr_code_label.pack(pady=5)
@@ -28,23 +38,8 @@ class LogoRecognitionApp:
         self.product_label = Label(frame, text="", bg="white", font=("Arial", 14, "bold"), fg="green")
         self.product_label.pack(pady=10)
 
-        scroll_container = tk.Frame(frame)
-        scroll_container.pack(pady=10, fill=tk.BOTH, expand=True)
-
-        self.log_scroll_canvas = tk.Canvas(scroll_container, bg="white")
-        self.log_scrollbar = tk.Scrollbar(scroll_container, orient="vertical", command=self.log_scroll_canvas.yview)
-        self.log_scrollable_frame = tk.Frame(self.log_scroll_canvas, bg="white")
-
-        self.log_scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.log_scroll_canvas.configure(scrollregion=self.log_scroll_canvas.bbox("all"))
-        )
-
-        self.log_scroll_window = self.log_scroll_canvas.create_window((0, 0), window=self.log_scrollable_frame, anchor="nw")
-        self.log_scroll_canvas.configure(yscrollcommand=self.log_scrollbar.set)
-
-        self.log_scroll_canvas.pack(side="left", fill="both", expand=True)
-        self.log_scrollbar.pack(side="right", fill="y")
+        self.scroll_container = tk.Frame(frame)
+        self.scroll_container.pack(pady=10, fill=tk.BOTH, expand=True)
 
         self.summary_label = Label(frame, text="Total products: 0 Total labels: 0", bg="white", font=("Arial", 12, "bold"), fg="black", justify="right")
         self.summary_label.pack(pady=5, anchor="ne")
@@ -55,16 +50,68 @@ class LogoRecognitionApp:
         self.process_button = Button(frame, text="Start Webcam Scan", command=self.open_webcam_preview, bg="orange", fg="white", font=("Arial", 12))
         self.process_button.pack(pady=10)
 
+        # Logo recognition only suggests a SKU; it counts as a scan once accepted here
+        self.suggested_sku = None
+        self.accept_button = Button(frame, text="Accept Suggestion", command=self.accept_suggestion, state="disabled", bg="purple", fg="white", font=("Arial", 12))
+        self.accept_button.pack(pady=10)
+
         self.reset_button = Button(frame, text="Reset", command=self.reset_fields, bg="red", fg="white", font=("Arial", 12))
         self.reset_button.pack(pady=10)
 
-        self.orders = extract_all_customer_orders()
-        self.scan_counts = {}
-        self.completed_orders = set()
-        self.cap = None
-        self.detector = None
-
-        self.render_all_customers()
+        self.new_shift_button = Button(frame, text="New Shift", command=self.new_shift, bg="gray", fg="white", font=("Arial", 12))
+        self.new_shift_button.pack(pady=10)
+
+        # Per-stage latency overlay, only when STATION_METRICS is enabled
+        self.metrics = get_metrics()
+        self.metrics_label = None
+        if self.metrics.enabled:
+            self.metrics_label = Label(frame, text="", bg="white", font=("Consolas", 9), fg="gray", justify="left")
+            self.metrics_label.pack(pady=5, anchor="w")
+            self.metrics.start_exporters()
+
+        # With STATION_SERVICE_URL set the station is a thin client of the shared scan service,
+        # which owns the orders, journal and printing; otherwise it runs standalone.
+        self.service = get_service_client()
+        if self.service:
+            state = self.service.fetch_state()
+            self.orders = state["orders"]
+            self.manager = OrderManager(self.orders, broadcast=True)
+            self.manager.load_state(state["scan_state"])
+            self.journal = None
+            self.orders_watcher = None
+            restored = self.manager.scanned_labels
+        else:
+            self.orders_watcher = OrdersWatcher([CSV_ORDERS_PATH], drop_dir=self.resource_path("data/incoming"))
+            self.orders_watcher.prime(CSV_ORDERS_PATH)
+            self.orders = extract_all_customer_orders()
+            resolve_missing_skus(self.orders, get_name_matcher())
+            # One scan counts against every open order with the SKU, as the station always has
+            self.manager = OrderManager(self.orders, broadcast=True)
+            # Exports already in the drop folder are merged before the replay, so scans journaled against them resolve
+            for orders, appended in self.orders_watcher.poll():
+                resolve_missing_skus(orders, get_name_matcher())
+                self.manager.merge_orders(orders, appended)
+            self.journal = ScanJournal(self.manager)
+            restored = self.journal.replay()
+            self.journal.start()
+        self.order_status = {}
+        self.printing = set()
+        self.pipeline = None
+        self.last_preview_seq = 0
+
+        self.order_view = OrderListView(self.scroll_container, self.manager, self.manual_print, self.order_status_line)
+        self.update_summary()
+        self.poll_metrics()
+        if self.service:
+            self.service.start()
+            self.poll_service_events()
+            self.shipping_label.config(text=f"📡 Connected to the scan service ({restored} scans so far)", fg="blue")
+            return
+        self.poll_print_events()
+        self.orders_watcher.start()
+        self.poll_order_updates()
+        if restored or self.manager.scanned_labels:
+            self.shipping_label.config(text=f"♻️ Restored {self.manager.scanned_labels} scans from the journal", fg="blue")
 
     def resource_path(self, relative_path):
         base_path = getattr(sys, '_MEIPASS', os.path.abspath("."))
@@ -74,137 +121,283 @@ class LogoRecognitionApp:
         prototxt = self.resource_path("models/wechat_qr/detect.prototxt")
         model = self.resource_path("models/wechat_qr/detect.caffemodel")
         if not os.path.exists(prototxt) or not os.path.exists(model):
-            self.qr_code_label.config(text="❌ QR model not found", fg="red")
+            self.qr_code_label.config(text="⚠️ WeChat QR model not found, using fast decoders only", fg="orange")
+
+        if self.pipeline and self.pipeline.is_running():
             return
 
-        self.detector = cv2.wechat_qrcode_WeChatQRCode(prototxt, model)
-        self.cap = cv2.VideoCapture(0)
+        self.pipeline = ScanPipeline(get_qr_decoder, sources=camera_sources(), fallback=recognize_logo_sku)
+        self.pipeline.start()
+        self.last_preview_seq = 0
         self.update_frame()
+        self.poll_camera_stats()
 
     def update_frame(self):
-        if self.cap and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            if ret:
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(rgb)
-                imgtk = ImageTk.PhotoImage(image=img.resize((480, 320)))
-                self.video_label.imgtk = imgtk
-                self.video_label.config(image=imgtk)
-
-                qr_codes, _ = self.detector.detectAndDecode(frame)
-                if qr_codes:
-                    sku = qr_codes[0].strip().lower()
-                    now = time.time()
-                    if sku != self.last_scanned_sku or (now - self.last_scan_time) > 2:
-                        self.last_scanned_sku = sku
-                        self.last_scan_time = now
-                        self.qr_code_label.config(text=f"QR Detected: {sku}", fg="green")
-                        self.process_order(sku)
-        self.root.after(50, self.update_frame)
+        """Paint the latest preview and handle decoded SKUs; capture and decoding run on worker threads."""
+        if not self.pipeline or not self.pipeline.is_running():
+            return
+        if self.pipeline.camera_failed():
+            self.qr_code_label.config(text="❌ No camera could be opened", fg="red")
+            self.pipeline.stop()
+            self.pipeline = None
+            return
+
+        seq, preview = self.pipeline.latest_preview()
+        if preview is not None and seq != self.last_preview_seq:
+            self.last_preview_seq = seq
+            imgtk = ImageTk.PhotoImage(image=Image.fromarray(preview))
+            self.video_label.imgtk = imgtk
+            self.video_label.config(image=imgtk)
+
+        # Already de-duplicated across cameras within the pipeline's debounce window
+        for code in self.pipeline.drain_results():
+            sku = code.strip().lower()
+            self.clear_suggestion()
+            self.qr_code_label.config(text=f"QR Detected: {sku}", fg="green")
+            self.process_order(sku)
+        suggestion = self.pipeline.drain_suggestions()
+        if suggestion and suggestion.strip().lower() != self.suggested_sku:
+            self.suggested_sku = suggestion.strip().lower()
+            self.qr_code_label.config(text=f"💡 Logo looks like {self.suggested_sku}. Accept to count it as a scan", fg="purple")
+            self.accept_button.config(state="normal")
+        self.root.after(30, self.update_frame)
+
+    def accept_suggestion(self):
+        if self.suggested_sku:
+            sku = self.suggested_sku
+            self.clear_suggestion()
+            self.qr_code_label.config(text=f"Logo accepted: {sku}", fg="green")
+            self.process_order(sku)
+
+    def clear_suggestion(self):
+        self.suggested_sku = None
+        self.accept_button.config(state="disabled")
+
+    def poll_camera_stats(self):
+        """Show capture FPS and decode rate per camera once a second while scanning."""
+        if not self.pipeline or not self.pipeline.is_running():
+            self.camera_label.config(text="")
+            return
+        parts = []
+        for stats in self.pipeline.camera_stats():
+            if stats["failed"]:
+                parts.append(f"📷 {stats['source']}: ❌ not opened")
+            else:
+                parts.append(f"📷 {stats['source']}: {stats['fps']:.0f} fps, {stats['decode_rate']:.1f} decodes/s")
+        self.camera_label.config(text="   ".join(parts))
+        self.root.after(1000, self.poll_camera_stats)
 
     def process_order(self, sku):
-        self.last_scanned_sku = sku.strip().lower()
-        self.product_label.config(text=f"Product/SKU: {sku}", fg="green")
-        for order in self.orders:
-            for item in order["items"]:
-                if item["sku"].strip().lower() == sku:
-                    key = (order["name"], item["sku"])
-                    scanned = self.scan_counts.get(key, 0)
-                    if scanned < item["quantity"]:
-                        self.scan_counts[key] = scanned + 1
-        self.render_all_customers()
-        self.log_scroll_canvas.update_idletasks()
-        if self.focus_target:
-            if self.focus_target:
-                self.log_scroll_canvas.update_idletasks()
-            self.log_scroll_canvas.yview_moveto(
-                self.focus_target.winfo_y() / self.log_scrollable_frame.winfo_height()
-            )
-
-    def manual_print(self, customer_name):
-        name_title = customer_name.strip().title()
-        page = fetch_shipping_label(name_title)
-        if page is not None:
-            extract_and_print_pdf_page(page_number=page, copies=1)
-            self.completed_orders.add(customer_name.strip().lower())
-            self.shipping_label.config(text=f"✅ Printed manually for {customer_name}", fg="blue")
+        if self.service:
+            # The service applies the scan; the result comes back as an event for every station
+            self.last_scanned_sku = sku.strip().lower()
+            self.product_label.config(text=f"Product/SKU: {sku}", fg="green")
+            self.service.scan(self.last_scanned_sku)
+            return
+        with self.metrics.span("process_order"):
+            self.last_scanned_sku = sku.strip().lower()
+            self.product_label.config(text=f"Product/SKU: {sku}", fg="green")
+            touched, newly_complete = self.manager.apply_scan(self.last_scanned_sku)
+            self.journal.record_scan(self.last_scanned_sku)
+            self.metrics.inc("scans")
+        for order_idx in newly_complete:
+            self.auto_print(order_idx)
+        with self.metrics.span("render_orders"):
+            self.order_view.refresh_rows(touched)
+            self.update_summary()
+        matching = touched or self.manager.orders_with_sku(self.last_scanned_sku)
+        if matching:
+            self.order_view.scroll_to(matching[-1])
+
+    def auto_print(self, order_idx):
+        customer_name = self.manager.orders[order_idx]["name"]
+        if self.manager.is_printed(order_idx) or order_idx in self.printing:
+            return
+        if self.queue_label(order_idx):
+            self.order_status[order_idx] = (f"🖨️ Printing label for {customer_name}", "blue")
+        else:
+            self.order_status[order_idx] = (f"⚠️ Could not fetch label for {customer_name}", "orange")
+
+    def manual_print(self, order_idx):
+        order = self.manager.orders[order_idx]
+        customer_name = order["name"]
+        if self.service:
+            # The PRINT button is an explicit request, so it also reprints a label already printed
+            self.service.print_label(order_key(order), force=True)
+            self.shipping_label.config(text=f"🖨️ Print requested for {customer_name}", fg="blue")
+            return
+        if order_idx in self.printing:
+            self.shipping_label.config(text=f"🖨️ Label for {customer_name} is already printing", fg="blue")
+        elif self.queue_label(order_idx):
+            self.shipping_label.config(text=f"🖨️ Printing label for {customer_name}", fg="blue")
         else:
             self.shipping_label.config(text=f"⚠️ Could not fetch label for {customer_name}", fg="red")
-        self.render_all_customers()
-
-    def render_all_customers(self):
-        self.focus_target = None
-        for widget in self.log_scrollable_frame.winfo_children():
-            widget.destroy()
-
-        for order in self.orders:
-            customer_name = order["name"]
-            normalized_name = customer_name.strip().lower()
-            frame = tk.Frame(self.log_scrollable_frame, bg="white")
-            frame.pack(anchor="w", fill=tk.X, padx=10, pady=5)
-            if any(item["sku"].strip().lower() == self.last_scanned_sku for item in order["items"]):
-                self.focus_target = frame
-
-            Label(frame, text=customer_name, font=("Arial", 10, "bold"), bg="white").pack(anchor="w")
-            all_scanned = True
-            for item in order["items"]:
-                key = (customer_name, item["sku"])
-                scanned = self.scan_counts.get(key, 0)
-                needed = item["quantity"]
-                status = "✔" if scanned >= needed else "✖"
-                line = f"    {status}  {item['product']} ({item['sku']}): {scanned}/{needed}"
-                Label(frame, text=line, anchor="w", justify="left", font=("Arial", 9), bg="white").pack(anchor="w")
-                if scanned < needed:
-                    all_scanned = False
-
-            if all_scanned:
-                if normalized_name not in self.completed_orders:
-                    page = fetch_shipping_label(customer_name.strip().title())
-                    if page is not None:
-                        extract_and_print_pdf_page(page_number=page, copies=1)
-                        self.completed_orders.add(normalized_name)
-                        Label(frame, text=f"✅ Auto-printed label for {customer_name}", fg="green", bg="white").pack(anchor="w")
-                    else:
-                        Label(frame, text=f"⚠️ Could not fetch label for {customer_name}", fg="orange", bg="white").pack(anchor="w")
-                else:
-                    Label(frame, text=f"✅ Already printed label for {customer_name}", fg="gray", bg="white").pack(anchor="w")
-
-            btn = Button(frame, text="PRINT", fg="red", bg="white", relief="groove",
-                         command=lambda name=customer_name: self.manual_print(name))
-            btn.pack(anchor="w", padx=5)
+        self.order_view.refresh_rows(list(self.order_view.active))
+        self.update_summary()
 
+    def queue_label(self, order_idx):
+        """
+        Fetch the order's label and queue it on the spooler; False if there is no label.
+        The order only counts as printed once the spooler reports success (poll_print_events).
+        """
+        order = self.manager.orders[order_idx]
+        with self.metrics.span("fetch_shipping_label"):
+            page = fetch_shipping_label(order["name"].strip().title(), order_id=order.get("order_id"))
+        if page is None:
+            return False
+        with self.metrics.span("print_submit"):
+            job_id = extract_and_print_pdf_page(page_number=page, copies=1, tag=order_idx)
+        if job_id is None:
+            return False
+        self.printing.add(order_idx)
+        return True
+
+    def poll_metrics(self):
+        if self.metrics_label is not None:
+            self.metrics_label.config(text=self.metrics.overlay_text())
+            self.root.after(1000, self.poll_metrics)
+
+    def poll_print_events(self):
+        """Mark orders printed (and journal them) as the background spooler reports their jobs done."""
+        touched = []
+        for job_id, order_idx, ok, message in get_print_spooler().drain_events():
+            if order_idx not in self.printing:
+                continue
+            self.printing.discard(order_idx)
+            customer_name = self.manager.orders[order_idx]["name"]
+            if ok:
+                self.manager.mark_printed(order_idx)
+                self.journal.record_print(order_idx)
+                self.order_status[order_idx] = (f"✅ Printed label for {customer_name}", "green")
+                self.shipping_label.config(text=f"🖨️ Label printed for {customer_name}", fg="blue")
+            else:
+                # Left unprinted, so the PRINT button can try again
+                self.order_status[order_idx] = (f"❌ Printing failed for {customer_name}", "red")
+                self.shipping_label.config(text=f"❌ Printing failed for {customer_name}: {message}", fg="red")
+            touched.append(order_idx)
+        if touched:
+            self.order_view.refresh_rows(touched)
+            self.update_summary()
+        self.root.after(200, self.poll_print_events)
+
+    def poll_order_updates(self):
+        """Merge orders the watcher parsed from new or appended export rows."""
+        try:
+            while True:
+                orders, appended = self.orders_watcher.updates.get_nowait()
+                resolve_missing_skus(orders, get_name_matcher())
+                changed, added = self.manager.merge_orders(orders, appended)
+                self.order_view.orders_changed(changed, added)
+                self.update_summary()
+                if added or changed:
+                    self.shipping_label.config(text=f"🔄 Orders updated: {len(added)} new, {len(changed)} changed", fg="blue")
+        except queue.Empty:
+            pass
+        self.root.after(1000, self.poll_order_updates)
+
+    def poll_service_events(self):
+        """Apply scan service events (from every station) to the local copy of the order state."""
+        touched = []
+        for event in self.service.drain_events():
+            kind = event["type"]
+            if kind == "scan":
+                for key, item_idx, scanned in event["lines"]:
+                    order_idx = self.manager.set_scanned(key, item_idx, scanned)
+                    if order_idx is not None and order_idx not in touched:
+                        touched.append(order_idx)
+                if touched and event["station"] == self.service.station:
+                    self.order_view.scroll_to(touched[-1])
+            elif kind == "label":
+                order_idx = self.manager.order_by_id.get(event["order"])
+                if order_idx is None:
+                    continue
+                if event["ok"]:
+                    self.manager.mark_printed(order_idx)
+                    self.order_status[order_idx] = (f"✅ Auto-printed label for {event['name']} ({event['station']})", "green")
+                else:
+                    self.order_status[order_idx] = (f"⚠️ {event['message']}", "orange")
+                touched.append(order_idx)
+            elif kind == "print_result":
+                if event["ok"]:
+                    self.shipping_label.config(text=f"🖨️ Label printed for {event['name']}", fg="blue")
+                    continue
+                self.shipping_label.config(text=f"❌ Printing failed for {event['name']}: {event['message']}", fg="red")
+                order_idx = self.manager.order_by_id.get(event["order"])
+                if order_idx is not None:
+                    if event.get("released"):
+                        # The service released its claim; the order can be printed again
+                        self.manager.mark_printed(order_idx, False)
+                    self.order_status[order_idx] = (f"❌ Printing failed for {event['name']}", "red")
+                    touched.append(order_idx)
+            elif kind == "orders":
+                changed, added = self.manager.merge_orders(event["orders"], event.get("appended", False))
+                self.order_view.orders_changed(changed, added)
+                self.shipping_label.config(text=f"🔄 Orders updated: {len(added)} new, {len(changed)} changed", fg="blue")
+            elif kind == "resync":
+                state = event["state"]
+                changed, added = self.manager.merge_orders(state["orders"])
+                self.manager.load_state(state["scan_state"])
+                self.order_view.orders_changed(changed, added)
+                self.order_view.refresh_rows(list(self.order_view.active))
+            elif kind in ("error", "disconnected"):
+                self.shipping_label.config(text=f"⚠️ Scan service: {event['message']}", fg="red")
+        if touched:
+            self.order_view.refresh_rows(touched)
         self.update_summary()
+        self.root.after(100, self.poll_service_events)
 
-    def update_summary(self):
-        scanned_products = 0
-        scanned_labels = 0
-        printed_customers = len(self.completed_orders)
-        total_products = sum(len(order["items"]) for order in self.orders)
-        total_labels = sum(item["quantity"] for order in self.orders for item in order["items"])
-
-        for order in self.orders:
-            for item in order["items"]:
-                key = (order["name"], item["sku"])
-                scanned = self.scan_counts.get(key, 0)
-                if scanned > 0:
-                    scanned_products += 1
-                    scanned_labels += scanned
+    def order_status_line(self, order_idx):
+        """Status shown under an order row, or None."""
+        if order_idx in self.order_status:
+            return self.order_status[order_idx]
+        customer_name = self.manager.orders[order_idx]["name"]
+        if self.manager.is_fully_scanned(order_idx) and self.manager.is_printed(order_idx):
+            return (f"✅ Already printed label for {customer_name}", "gray")
+        return None
 
+    def update_summary(self):
+        summary = self.manager.summary()
         self.summary_label.config(
-            text=f"Scanned: {scanned_products}/{total_products} products, {printed_customers}/{len(self.orders)} labels"
+            text=f"Scanned: {summary['scanned_products']}/{summary['total_products']} products, "
+                 f"{summary['printed_orders']}/{summary['total_orders']} labels"
         )
 
     def reset_fields(self):
+        self.clear_suggestion()
         self.product_label.config(text="")
         self.qr_code_label.config(text="")
         self.shipping_label.config(text="")
-        for widget in self.log_scrollable_frame.winfo_children():
-            widget.destroy()
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        if self.pipeline:
+            self.pipeline.stop()
+            self.pipeline = None
         self.video_label.config(image="")
-        self.render_all_customers()
+        self.order_view.relayout()
+        self.update_summary()
+
+    def new_shift(self):
+        """Forget every scan and printed label (the journal starts over), after asking."""
+        if self.service:
+            self.shipping_label.config(text="⚠️ Start the scan service with --new-shift to clear the shared journal", fg="red")
+            return
+        if not messagebox.askyesno("New Shift", "Forget all scans and printed labels and start a new shift?"):
+            return
+        self.journal.clear()
+        self.order_status = {}
+        # Jobs still in the spooler belong to the old shift; their outcomes are ignored
+        self.printing = set()
+        self.order_view.refresh_rows(list(self.order_view.active))
+        self.update_summary()
+        self.shipping_label.config(text="🆕 New shift started", fg="blue")
+
+    def close(self):
+        """Stop background work and flush the scan journal before the window closes."""
+        if self.pipeline:
+            self.pipeline.stop()
+        if self.service:
+            self.service.close()
+            return
+        self.orders_watcher.stop()
+        self.journal.close()
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -226,4 +419,10 @@ if __name__ == "__main__":
     frame.bind("<Configure>", on_frame_configure)
 
     app = LogoRecognitionApp(frame)
+
+    def on_close():
+        app.close()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", on_close)
     root.mainloop()
@@ -0,0 +1,247 @@
+import PyPDF2
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+
+def resource_path(relative_path):
+    """Get absolute path to resource, works for PyInstaller or dev."""
+    base_path = getattr(sys, '_MEIPASS', os.path.abspath("."))
+    return os.path.join(base_path, relative_path)
+
+LABELS_PDF_PATH = resource_path("data/shipping_labels.pdf")
+LABEL_CACHE_DIR = resource_path("data/.label_cache")
+INDEX_VERSION = 1
+
+ORDER_REF_RE = re.compile(r"Customer reference:\s*(\S+)")
+
+
+def normalize_text(text):
+    return " ".join(str(text).split()).lower()
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LabelStore:
+    """
+    Indexed shipping-label store.
+    Each label PDF is parsed once: page text is extracted, the recipient name
+    (first line) and customer reference (order ID) are indexed, and every page
+    is split into a ready-to-print single-page PDF under the cache directory.
+    The index is persisted and keyed by each PDF's size, mtime and SHA-1, so
+    later runs only reindex PDFs that actually changed. Pages are numbered
+    globally (1-based) across all indexed PDFs in the order they were added,
+    and a number once handed out never moves: when a PDF changes, its old
+    pages are retired (their split files deleted) and the new content is
+    appended under new numbers. A PDF whose content is already indexed under
+    another path is remembered as an alias of it, so it is hashed only once.
+    """
+
+    def __init__(self, pdf_path=LABELS_PDF_PATH, cache_dir=LABEL_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.lock = threading.RLock()
+        self.sources = []
+        self.pages = []
+        self.aliases = {}
+        self.by_name = {}
+        self.by_order_id = {}
+        self._load_index()
+        if pdf_path and os.path.exists(pdf_path):
+            self.add_pdf(pdf_path)
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        self.sources = data["sources"]
+        self.pages = data["pages"]
+        self.aliases = data.get("aliases", {})
+        self._rebuild_lookup()
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "sources": self.sources, "pages": self.pages,
+                       "aliases": self.aliases}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _rebuild_lookup(self):
+        self.by_name = {}
+        self.by_order_id = {}
+        for page_idx, page in enumerate(self.pages):
+            self._index_page(page_idx, page)
+
+    def _index_page(self, page_idx, page):
+        if page["name"]:
+            self.by_name.setdefault(page["name"], []).append(page_idx + 1)
+        if page["order_id"]:
+            self.by_order_id.setdefault(page["order_id"], []).append(page_idx + 1)
+
+    def _find_source(self, path):
+        path = os.path.abspath(path)
+        for source in self.sources:
+            if source["path"] == path and not source.get("retired"):
+                return source
+        return None
+
+    def add_pdf(self, pdf_path):
+        """
+        Index a label PDF. Unchanged PDFs are skipped, a new batch is appended
+        without touching existing pages, and a PDF whose content changed is
+        reindexed: its old pages are retired and the new ones appended.
+        """
+        with self.lock:
+            pdf_path = os.path.abspath(pdf_path)
+            stat = os.stat(pdf_path)
+            source = self._find_source(pdf_path)
+            known = source or self.aliases.get(pdf_path)
+            if known and known["size"] == stat.st_size and known["mtime"] == stat.st_mtime:
+                return False
+
+            sha1 = file_sha1(pdf_path)
+            if source and source["sha1"] == sha1:
+                source["mtime"] = stat.st_mtime
+                self._save_index()
+                return False
+            self.aliases.pop(pdf_path, None)
+            if source is None:
+                for other in self.sources:
+                    if other["sha1"] == sha1 and not other.get("retired"):
+                        # Same batch already indexed under another path: remember it so it is not hashed again
+                        self.aliases[pdf_path] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha1": sha1}
+                        self._save_index()
+                        return False
+
+            if source is not None:
+                self._drop_source(source)
+
+            split_dir = os.path.join(self.cache_dir, sha1[:16])
+            os.makedirs(split_dir, exist_ok=True)
+            first_page = len(self.pages) + 1
+            source_idx = len(self.sources)
+
+            with open(pdf_path, "rb") as file:
+                reader = PyPDF2.PdfReader(file)
+                for page_number, page in enumerate(reader.pages):
+                    text = page.extract_text() or ""
+                    split_path = os.path.join(split_dir, f"page_{page_number + 1:05d}.pdf")
+                    writer = PyPDF2.PdfWriter()
+                    writer.add_page(page)
+                    with open(split_path, "wb") as out:
+                        writer.write(out)
+                    entry = self._page_entry(source_idx, split_path, text)
+                    self.pages.append(entry)
+                    self._index_page(len(self.pages) - 1, entry)
+
+            self.sources.append({
+                "path": pdf_path,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "sha1": sha1,
+                "first_page": first_page,
+                "page_count": len(self.pages) - first_page + 1,
+            })
+            self._save_index()
+            print(f"✅ Indexed {len(self.pages) - first_page + 1} label page(s) from {pdf_path}")
+            return True
+
+    def _page_entry(self, source_idx, split_path, text):
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        match = ORDER_REF_RE.search(text)
+        return {
+            "source": source_idx,
+            "file": os.path.relpath(split_path, self.cache_dir),
+            "name": normalize_text(lines[0]) if lines else "",
+            "order_id": match.group(1).strip() if match else "",
+            "text": normalize_text(text),
+        }
+
+    def _drop_source(self, source):
+        """
+        Retire a changed PDF's pages. Their numbers are not reused and no other
+        page is renumbered, so a page number a caller already holds can never
+        print someone else's label; a retired page is no longer found or printable,
+        and its split file is deleted.
+        """
+        source_idx = self.sources.index(source)
+        source["retired"] = True
+        for page in self.pages:
+            if page["source"] == source_idx:
+                if page["file"]:
+                    try:
+                        os.remove(os.path.join(self.cache_dir, page["file"]))
+                    except OSError:
+                        pass
+                page.update(file=None, name="", order_id="", text="")
+        try:
+            os.rmdir(os.path.join(self.cache_dir, source["sha1"][:16]))
+        except OSError:
+            pass
+        self._rebuild_lookup()
+
+    def find_page(self, customer_name=None, order_id=None):
+        """Return the 1-based page for an order ID or customer name, or None."""
+        with self.lock:
+            if order_id:
+                pages = self.by_order_id.get(str(order_id).strip())
+                if pages:
+                    return pages[0]
+            if not customer_name:
+                return None
+            name = normalize_text(customer_name)
+            pages = self.by_name.get(name)
+            if pages:
+                return pages[0]
+            # Fall back to a substring search of the cached page text.
+            for page_idx, page in enumerate(self.pages):
+                if name in page["text"]:
+                    return page_idx + 1
+            return None
+
+    def page_count(self):
+        return len(self.pages)
+
+    def page_path(self, page_number):
+        """Path to the pre-split single-page PDF for a 1-based page number."""
+        with self.lock:
+            if page_number < 1 or page_number > len(self.pages) or not self.pages[page_number - 1]["file"]:
+                return None
+            return os.path.join(self.cache_dir, self.pages[page_number - 1]["file"])
+
+    def page_bytes(self, page_number):
+        path = self.page_path(page_number)
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_label_store():
+    """Shared LabelStore for the default shipping labels PDF, built on first use."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = LabelStore()
+        elif os.path.exists(LABELS_PDF_PATH):
+            _default_store.add_pdf(LABELS_PDF_PATH)
+        return _default_store
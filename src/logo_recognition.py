@@ -1,12 +1,34 @@
 import cv2
 import os
 import sys
+import json
+import threading
+import numpy as np
+from utils.qr_decoder import get_qr_decoder
+from src.match_product import get_product_catalog
 
 def resource_path(relative_path):
     if hasattr(sys, '_MEIPASS'):
         return os.path.join(sys._MEIPASS, relative_path)
     return os.path.abspath(relative_path)
 
+LOGO_DIR = resource_path("images/mug_logo_samples")
+LOGO_INDEX_DIR = resource_path("data/.logo_index")
+LOGO_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".webp"}
+
+# References are indexed at two sizes so logos small in the frame still match;
+# queries keep few keypoints, since matching cost grows with query x reference descriptors
+REFERENCE_SIDES = (512, 256)
+ORB_FEATURES = 500
+QUERY_SIDE = 800
+QUERY_FEATURES = 300
+RATIO = 0.85
+MAX_DISTANCE = 48
+MIN_INLIERS = 10
+RANSAC_PX = 4.0
+RANSAC_ITERS = 500
+INDEX_VERSION = 2
+
 def recognize_qr_code(image_path):
     """Scans the QR code in the image and returns its decoded data."""
     img = cv2.imread(image_path)
@@ -14,12 +36,209 @@ def recognize_qr_code(image_path):
         print("❌ Error reading image!")
         return None
 
-    detector = cv2.QRCodeDetector()
-    data, bbox, _ = detector.detectAndDecode(img)
+    qr_codes, _, backend = get_qr_decoder().decode(img)
 
-    if bbox is not None and data:
-        print(f"✅ QR Code detected: {data}")
+    if qr_codes:
+        data = qr_codes[0]
+        print(f"✅ QR Code detected ({backend}): {data}")
         return data
     else:
         print("❌ No QR code found.")
         return None
+
+
+def _to_gray(img):
+    """Grayscale copy of a BGR, BGRA or grayscale image, flattening any transparency onto white."""
+    if img.ndim == 3 and img.shape[2] == 4:
+        alpha = img[:, :, 3:4].astype(np.float32) / 255.0
+        img = (img[:, :, :3] * alpha + 255 * (1 - alpha)).astype(np.uint8)
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return img
+
+
+def _load_gray(path):
+    """Read a logo as grayscale, flattening any transparency onto white."""
+    img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    return None if img is None else _to_gray(img)
+
+
+def _limit_size(gray, max_side):
+    scale = max_side / float(max(gray.shape[:2]))
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return gray
+
+
+class LogoIndex:
+    """
+    Precomputed ORB descriptors for every reference logo, at each of REFERENCE_SIDES.
+    Descriptors, keypoint coordinates and per-descriptor logo labels are stored as
+    .npy files (opened memory-mapped) next to a small JSON manifest, and rebuilt
+    only when the reference folder changes. Queries are matched against all
+    references at once with a FLANN LSH index, votes are counted per logo and
+    the best candidates are verified with a RANSAC similarity transform.
+    """
+
+    def __init__(self, logo_dir=LOGO_DIR, index_dir=LOGO_INDEX_DIR):
+        self.logo_dir = logo_dir
+        self.index_dir = index_dir
+        self.orb = cv2.ORB_create(nfeatures=ORB_FEATURES)
+        self.query_orb = cv2.ORB_create(nfeatures=QUERY_FEATURES)
+        self._lock = threading.Lock()
+        if not self._load():
+            self.build()
+            self._load()
+        self._train()
+
+    def _reference_files(self):
+        files = []
+        for name in sorted(os.listdir(self.logo_dir)):
+            path = os.path.join(self.logo_dir, name)
+            if os.path.splitext(name)[1].lower() in LOGO_EXTENSIONS and os.path.isfile(path):
+                stat = os.stat(path)
+                files.append([name, stat.st_size, stat.st_mtime_ns])
+        return files
+
+    def _manifest_path(self):
+        return os.path.join(self.index_dir, "manifest.json")
+
+    def build(self):
+        """Extract descriptors for every reference logo and write the on-disk index."""
+        files = self._reference_files()
+        descriptors, points, labels, names = [], [], [], []
+        for name, _, _ in files:
+            gray = _load_gray(os.path.join(self.logo_dir, name))
+            if gray is None:
+                print(f"⚠️ Cannot read logo: {name}")
+                continue
+            label = len(names)
+            found = 0
+            for side in REFERENCE_SIDES:
+                scaled = _limit_size(gray, side)
+                keypoints, desc = self.orb.detectAndCompute(scaled, None)
+                if desc is None:
+                    continue
+                # Points in full-size reference coordinates, so every scale votes for one homography
+                scale = gray.shape[1] / float(scaled.shape[1])
+                descriptors.append(desc)
+                points.append(np.array([kp.pt for kp in keypoints], dtype=np.float32) * scale)
+                labels.append(np.full(len(desc), label, dtype=np.int32))
+                found += len(desc)
+            if not found:
+                print(f"⚠️ No features in logo: {name}")
+                continue
+            names.append(os.path.splitext(name)[0])
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        np.save(os.path.join(self.index_dir, "descriptors.npy"),
+                np.concatenate(descriptors) if descriptors else np.zeros((0, 32), np.uint8))
+        np.save(os.path.join(self.index_dir, "points.npy"),
+                np.concatenate(points) if points else np.zeros((0, 2), np.float32))
+        np.save(os.path.join(self.index_dir, "labels.npy"),
+                np.concatenate(labels) if labels else np.zeros(0, np.int32))
+        with open(self._manifest_path(), "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "files": files, "names": names}, f)
+        print(f"✅ Indexed {len(names)} reference logo(s)")
+
+    def _load(self):
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if manifest.get("version") != INDEX_VERSION or manifest["files"] != self._reference_files():
+            return False
+        self.names = manifest["names"]
+        self.descriptors = np.load(os.path.join(self.index_dir, "descriptors.npy"), mmap_mode="r")
+        self.points = np.load(os.path.join(self.index_dir, "points.npy"), mmap_mode="r")
+        self.labels = np.load(os.path.join(self.index_dir, "labels.npy"), mmap_mode="r")
+        return True
+
+    def _train(self):
+        index_params = dict(algorithm=6, table_number=6, key_size=12, multi_probe_level=2)  # FLANN_INDEX_LSH
+        self.matcher = cv2.FlannBasedMatcher(index_params, dict(checks=50))
+        if len(self.descriptors):
+            self.matcher.add([np.ascontiguousarray(self.descriptors)])
+            self.matcher.train()
+
+    def recognize(self, image):
+        """Return (logo name, score) for a BGR, BGRA or grayscale image, or (None, 0.0)."""
+        if not len(self.descriptors):
+            return None, 0.0
+        gray = _to_gray(image)
+        keypoints, desc = self.query_orb.detectAndCompute(_limit_size(gray, QUERY_SIDE), None)
+        if desc is None or len(desc) < 2:
+            return None, 0.0
+
+        with self._lock:
+            knn = self.matcher.knnMatch(desc, k=3)
+        good = []
+        for matches in knn:
+            if not matches:
+                continue
+            # Ratio test against the nearest match from another logo: repeated parts of one logo
+            # (stripes, lettering, its other scale) are near-identical and must not cancel each other out
+            label = self.labels[matches[0].trainIdx]
+            other = next((m for m in matches[1:] if self.labels[m.trainIdx] != label), None)
+            if other is not None:
+                if matches[0].distance < RATIO * other.distance:
+                    good.append(matches[0])
+            elif matches[0].distance <= MAX_DISTANCE:
+                good.append(matches[0])
+        if not good:
+            return None, 0.0
+
+        train_idx = np.array([m.trainIdx for m in good])
+        query_idx = np.array([m.queryIdx for m in good])
+        votes = np.bincount(self.labels[train_idx], minlength=len(self.names))
+
+        best_name, best_inliers = None, 0
+        for label in np.argsort(votes)[::-1][:3]:
+            if votes[label] < MIN_INLIERS:
+                break
+            mask = self.labels[train_idx] == label
+            src = np.asarray(self.points[train_idx[mask]], dtype=np.float32)
+            dst = np.float32([keypoints[i].pt for i in query_idx[mask]])
+            # A printed logo is seen roughly flat: a similarity transform (4 DOF) is enough and
+            # far cheaper and stricter to verify than a full homography
+            _, inlier_mask = cv2.estimateAffinePartial2D(src, dst, method=cv2.RANSAC, ransacReprojThreshold=RANSAC_PX,
+                                                         maxIters=RANSAC_ITERS)
+            inliers = int(inlier_mask.sum()) if inlier_mask is not None else 0
+            if inliers > best_inliers:
+                best_name, best_inliers = self.names[label], inliers
+
+        if best_inliers < MIN_INLIERS:
+            return None, 0.0
+        return best_name, best_inliers / float(len(desc))
+
+
+_default_index = None
+_default_lock = threading.Lock()
+
+
+def get_logo_index():
+    """Shared logo index, loaded (or built) on first use."""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = LogoIndex()
+        return _default_index
+
+
+def recognize_logo(image_or_path):
+    """Recognize a reference logo in an image path or array. Returns (logo name, score) or (None, 0.0)."""
+    img = _load_gray(image_or_path) if isinstance(image_or_path, str) else image_or_path
+    if img is None:
+        print("❌ Error reading image!")
+        return None, 0.0
+    return get_logo_index().recognize(img)
+
+
+def recognize_logo_sku(image):
+    """SKU code of the catalog product whose image matches the logo in the frame, or None."""
+    name, _ = get_logo_index().recognize(image)
+    if name is None:
+        return None
+    record = get_product_catalog().by_image_name(name)
+    return record["sku"] if record and record["sku"] else None
@@ -1,7 +1,10 @@
 import pandas as pd
+import numpy as np
 import os
 import sys
-import re
+import zipfile
+import threading
+from bisect import bisect_left
 
 def resource_path(relative_path):
     """
@@ -12,14 +15,209 @@ def resource_path(relative_path):
     return os.path.abspath(relative_path)
 
 PRODUCT_DB_PATH = resource_path("data/product_database.csv")
+CATALOG_CACHE_DIR = resource_path("data/.catalog_cache")
+CATALOG_VERSION = 2
+
+# Both catalog exports are supported; the first column present wins.
+NAME_COLUMNS = ["product_name", "listing name"]
+IMAGE_COLUMNS = ["product_image", "image location"]
+SKU_COLUMNS = ["SKU code", "sku", "Lineitem SKU"]
+
+
+def _first_column(df, candidates):
+    for column in candidates:
+        if column in df.columns:
+            return column
+    return None
+
+
+def _image_key(image):
+    base = image.replace("\\", "/").rsplit("/", 1)[-1]
+    return os.path.splitext(base)[0].strip().lower()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _records(skus, names, images):
+    return [
+        {"sku": sku, "name": name, "image": image, "image_key": _image_key(image)}
+        for sku, name, image in zip(skus, names, images)
+    ]
+
+
+class ProductCatalog:
+    """
+    Product database loaded once and indexed in memory.
+    Exact lookups by SKU code and image name are dict hits; substring lookups
+    use a trigram index over image paths and listing names, and prefix lookups
+    bisect a sorted key list. The parsed columns are snapshotted to disk as numpy
+    arrays and reused while the CSV's mtime and size are unchanged.
+    """
+
+    def __init__(self, csv_path=PRODUCT_DB_PATH, use_cache=True):
+        self.csv_path = csv_path
+        self.records = self._load(use_cache)
+        self._build_indexes()
+
+    # === Loading ===
+
+    def _cache_path(self):
+        return os.path.join(CATALOG_CACHE_DIR, os.path.basename(self.csv_path) + ".npz")
+
+    def _load(self, use_cache):
+        stat = os.stat(self.csv_path)
+        self.stat_key = (stat.st_mtime_ns, stat.st_size)
+        key = np.array([CATALOG_VERSION, os.path.abspath(self.csv_path), stat.st_mtime_ns, stat.st_size], dtype=str)
+        if use_cache:
+            try:
+                with np.load(self._cache_path(), allow_pickle=False) as cached:
+                    if np.array_equal(cached["key"], key):
+                        return _records(cached["skus"].tolist(), cached["names"].tolist(), cached["images"].tolist())
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+                pass
+
+        skus, names, images = self._read_csv()
+        if use_cache:
+            try:
+                os.makedirs(CATALOG_CACHE_DIR, exist_ok=True)
+                tmp_path = self._cache_path() + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    np.savez_compressed(f, key=key, skus=np.array(skus, dtype=str), names=np.array(names, dtype=str),
+                                        images=np.array(images, dtype=str))
+                os.replace(tmp_path, self._cache_path())
+            except OSError as e:
+                print(f"⚠️ Could not write catalog cache: {e}")
+        return _records(skus, names, images)
+
+    def _read_csv(self):
+        """SKU, listing name and image columns of the catalog, as lists of stripped strings."""
+        df = pd.read_csv(self.csv_path, dtype=str, keep_default_na=False)
+        df.columns = [str(c).strip() for c in df.columns]
+        name_col = _first_column(df, NAME_COLUMNS)
+        image_col = _first_column(df, IMAGE_COLUMNS)
+        sku_col = _first_column(df, SKU_COLUMNS)
+        size = len(df)
+        names = df[name_col].str.strip().tolist() if name_col else [""] * size
+        images = df[image_col].str.strip().tolist() if image_col else [""] * size
+        skus = df[sku_col].str.strip().tolist() if sku_col else [""] * size
+        return skus, names, images
+
+    # === Indexes ===
+
+    def _build_indexes(self):
+        self.by_sku = {}
+        self.by_image = {}
+        self.image_grams = {}
+        self.name_grams = {}
+        for idx, record in enumerate(self.records):
+            if record["sku"]:
+                self.by_sku.setdefault(record["sku"].lower(), idx)
+            if record["image_key"]:
+                self.by_image.setdefault(record["image_key"], idx)
+            for gram in _trigrams(record["image"]):
+                self.image_grams.setdefault(gram, []).append(idx)
+            for gram in _trigrams(record["name"].lower()):
+                self.name_grams.setdefault(gram, []).append(idx)
+        self.sorted_image_keys = sorted(self.by_image)
+        self.sorted_names = sorted((record["name"].lower(), idx) for idx, record in enumerate(self.records))
+
+    def _substring(self, query, grams_index, field, lower):
+        if lower:
+            query = query.lower()
+        if len(query) < 3:
+            candidates = range(len(self.records))
+        else:
+            postings = [grams_index.get(gram) for gram in _trigrams(query)]
+            if not all(postings):
+                return []
+            postings.sort(key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            candidates = sorted(candidates)
+        matches = []
+        for idx in candidates:
+            text = self.records[idx][field]
+            if query in (text.lower() if lower else text):
+                matches.append(idx)
+        return matches
+
+    # === Lookups ===
+
+    def by_sku_code(self, sku):
+        idx = self.by_sku.get(str(sku).strip().lower())
+        return self.records[idx] if idx is not None else None
+
+    def by_image_name(self, image_name):
+        idx = self.by_image.get(_image_key(image_name))
+        return self.records[idx] if idx is not None else None
+
+    def search_image(self, fragment):
+        """Records whose image path contains the fragment (case-sensitive), in file order."""
+        return [self.records[i] for i in self._substring(fragment, self.image_grams, "image", lower=False)]
+
+    def search_name(self, fragment):
+        """Records whose listing name contains the fragment (case-insensitive), in file order."""
+        return [self.records[i] for i in self._substring(fragment, self.name_grams, "name", lower=True)]
+
+    def prefix_image(self, prefix):
+        prefix = prefix.lower()
+        start = bisect_left(self.sorted_image_keys, prefix)
+        results = []
+        for key in self.sorted_image_keys[start:]:
+            if not key.startswith(prefix):
+                break
+            results.append(self.records[self.by_image[key]])
+        return results
+
+    def prefix_name(self, prefix):
+        prefix = prefix.lower()
+        start = bisect_left(self.sorted_names, (prefix, -1))
+        results = []
+        for name, idx in self.sorted_names[start:]:
+            if not name.startswith(prefix):
+                break
+            results.append(self.records[idx])
+        return results
+
+    def match(self, logo_name):
+        """Record for a recognized logo: exact image name first, then image path substring."""
+        record = self.by_image_name(logo_name)
+        if record is not None:
+            return record
+        matches = self.search_image(logo_name)
+        return matches[0] if matches else None
+
+    def match_many(self, logo_names):
+        """Resolve a whole batch of logo names or SKU codes at once; returns {name: record or None}."""
+        results = {}
+        for logo_name in logo_names:
+            if logo_name in results:
+                continue
+            record = self.by_sku_code(logo_name) or self.match(logo_name)
+            results[logo_name] = record
+        return results
+
+
+_catalogs = {}
+_catalog_lock = threading.Lock()
+
+
+def get_product_catalog(csv_path=PRODUCT_DB_PATH):
+    """Catalog for csv_path, loaded once per process and reloaded if the CSV changes."""
+    with _catalog_lock:
+        catalog = _catalogs.get(csv_path)
+        stat = os.stat(csv_path)
+        if catalog is None or catalog.stat_key != (stat.st_mtime_ns, stat.st_size):
+            catalog = ProductCatalog(csv_path)
+            _catalogs[csv_path] = catalog
+        return catalog
+
 
 def match_product(logo_name):
     """Matches the recognized logo with the product in the database."""
-    df = pd.read_csv(PRODUCT_DB_PATH)
-    print(df)
-    product_row = df[df['product_image'].str.contains(re.escape(logo_name), na=False)]
-    print("Product_row",product_row)
-    return product_row.iloc[0]['product_name'] if not product_row.empty else None
+    record = get_product_catalog().match(logo_name)
+    return record["name"] if record else None
 
 if __name__ == "__main__":
     print(match_product("crown"))
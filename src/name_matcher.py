@@ -0,0 +1,159 @@
+import math
+import re
+import threading
+import numpy as np
+from src.match_product import get_product_catalog
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+MISSING_SKUS = {"", "nan", "none"}
+# Words naming what the product is. A match must share one with the listing, so a
+# name that only shares a country or club word ("Norway bumbag") is not resolved.
+PRODUCT_TYPES = {
+    "sock", "socks", "hat", "hats", "beanie", "beanies", "cap", "caps", "scarf", "scarves",
+    "mug", "mugs", "trunks", "underwear", "boxers", "shirt", "tshirt", "hoodie", "bag", "bumbag",
+    "belt", "keyring", "glove", "gloves",
+}
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text).lower())
+
+
+class NameMatcher:
+    """
+    Batch matcher from order line-item names to catalog SKUs.
+    Catalog listing names are stored as L2-normalized TF-IDF vectors in CSR
+    arrays. Candidates for a query come from a blocking index of the rarer
+    tokens only (tokens shared by most listings, like "socks" or "pack", never
+    generate candidates), and candidates are scored with a vectorized cosine.
+    Words of the name that the catalog has never seen still count in the query's
+    norm, so sharing one rare word with a listing is not enough for a high score,
+    and a candidate must also share a product-type word (PRODUCT_TYPES) with the name.
+    Resolved names are cached, so repeated names in an export cost a dict hit.
+    """
+
+    def __init__(self, records, threshold=0.5, max_block_fraction=0.2):
+        self.records = [r for r in records if r.get("sku") and r.get("name")]
+        self.threshold = threshold
+        self.cache = {}
+        self._lock = threading.Lock()
+
+        docs = [tokenize(r["name"]) for r in self.records]
+        vocab = {}
+        doc_freq = []
+        for tokens in docs:
+            for token in set(tokens):
+                token_id = vocab.setdefault(token, len(vocab))
+                if token_id == len(doc_freq):
+                    doc_freq.append(0)
+                doc_freq[token_id] += 1
+        self.vocab = vocab
+        n_docs = max(len(docs), 1)
+        self.idf = np.array([math.log((n_docs + 1) / (df + 1)) + 1 for df in doc_freq], dtype=np.float32)
+        # Weight of a word no listing contains: rarer than any catalog word
+        self.unknown_idf = math.log(n_docs + 1) + 1
+        self.types = [set(tokens) & PRODUCT_TYPES for tokens in docs]
+
+        indptr = [0]
+        indices = []
+        data = []
+        for tokens in docs:
+            if tokens:
+                ids, counts = np.unique([vocab[t] for t in tokens], return_counts=True)
+                weights = counts.astype(np.float32) * self.idf[ids]
+                weights /= np.linalg.norm(weights)
+                indices.extend(ids.tolist())
+                data.extend(weights.tolist())
+            indptr.append(len(indices))
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.data = np.asarray(data, dtype=np.float32)
+
+        # Blocking index: token id -> catalog rows, for tokens rare enough to be discriminative.
+        max_df = max(1, int(max_block_fraction * n_docs))
+        self.blocks = {}
+        for row in range(len(docs)):
+            for token_id in self.indices[self.indptr[row]:self.indptr[row + 1]]:
+                if doc_freq[token_id] <= max_df:
+                    self.blocks.setdefault(int(token_id), []).append(row)
+        self.blocks = {k: np.asarray(v, dtype=np.int64) for k, v in self.blocks.items()}
+        self._query = np.zeros(len(vocab), dtype=np.float32)
+
+    def _score(self, name):
+        tokens = tokenize(name)
+        token_ids = [self.vocab[t] for t in tokens if t in self.vocab]
+        name_types = set(tokens) & PRODUCT_TYPES
+        blocked = [self.blocks[t] for t in set(token_ids) if t in self.blocks]
+        if not blocked or not name_types:
+            return None, 0.0
+        candidates = np.unique(np.concatenate(blocked))
+        candidates = candidates[[bool(self.types[row] & name_types) for row in candidates.tolist()]]
+        if not len(candidates):
+            return None, 0.0
+
+        ids, counts = np.unique(token_ids, return_counts=True)
+        weights = counts.astype(np.float32) * self.idf[ids]
+        unknown = [t for t in tokens if t not in self.vocab]
+        _, unknown_counts = np.unique(unknown, return_counts=True) if unknown else (None, np.zeros(0))
+        unknown_norm = float(np.dot(unknown_counts, unknown_counts)) * self.unknown_idf ** 2
+        weights /= math.sqrt(float(np.dot(weights, weights)) + unknown_norm)
+        query = self._query
+        query[ids] = weights
+
+        starts = self.indptr[candidates]
+        lengths = self.indptr[candidates + 1] - starts
+        # Gather every candidate's non-zeros in one pass and reduce per candidate.
+        offsets = np.repeat(starts - np.cumsum(np.r_[0, lengths[:-1]]), lengths) + np.arange(lengths.sum())
+        products = self.data[offsets] * query[self.indices[offsets]]
+        scores = np.add.reduceat(products, np.r_[0, np.cumsum(lengths)[:-1]])
+        query[ids] = 0.0
+
+        best = int(np.argmax(scores))
+        return self.records[int(candidates[best])], float(scores[best])
+
+    def match(self, name):
+        """Return (record, score) for the best catalog listing, or (None, score) below threshold."""
+        key = " ".join(tokenize(name))
+        with self._lock:
+            if key not in self.cache:
+                self.cache[key] = self._score(key)
+            record, score = self.cache[key]
+        return (record, score) if record is not None and score >= self.threshold else (None, score)
+
+    def match_many(self, names):
+        """Resolve many names at once; duplicates are scored once. Returns {name: (record, score)}."""
+        return {name: self.match(name) for name in dict.fromkeys(names)}
+
+
+def resolve_missing_skus(orders, matcher):
+    """
+    Fill order lines that have no SKU with the best catalog match for their product name.
+    Matched lines are marked with sku_source="matched" and their match_score. Returns the count.
+    """
+    missing = [item for order in orders for item in order["items"]
+               if str(item["sku"]).strip().lower() in MISSING_SKUS]
+    if not missing:
+        return 0
+    matches = matcher.match_many(item["product"] for item in missing)
+    resolved = 0
+    for item in missing:
+        record, score = matches[item["product"]]
+        if record is not None:
+            item["sku"] = record["sku"]
+            item["sku_source"] = "matched"
+            item["match_score"] = round(score, 3)
+            resolved += 1
+    return resolved
+
+
+_default_matcher = None
+_default_lock = threading.Lock()
+
+
+def get_name_matcher():
+    """Matcher over the default product catalog, built on first use."""
+    global _default_matcher
+    with _default_lock:
+        if _default_matcher is None:
+            _default_matcher = NameMatcher(get_product_catalog().records)
+        return _default_matcher
@@ -0,0 +1,220 @@
+import tkinter as tk
+from tkinter import Label, Button
+from bisect import bisect_right
+
+HEADER_FONT = ("Arial", 10, "bold")
+ITEM_FONT = ("Arial", 9)
+ROW_PADDING = 10
+OVERSCAN_PX = 300
+
+
+class _OrderRow:
+    """A pooled row widget; it is re-bound to whichever order scrolls into its slot."""
+
+    def __init__(self, view):
+        self.view = view
+        self.frame = tk.Frame(view.canvas, bg="white")
+        self.frame.pack_propagate(False)
+        self.header = Label(self.frame, font=HEADER_FONT, bg="white")
+        self.header.pack(anchor="w")
+        self.item_labels = []
+        self.status = Label(self.frame, bg="white")
+        self.button = Button(self.frame, text="PRINT", fg="red", bg="white", relief="groove",
+                             command=self._on_print)
+        self.window = view.canvas.create_window(0, 0, window=self.frame, anchor="nw", state="hidden")
+        self.order_idx = None
+        self.rendered = None
+
+    def _on_print(self):
+        if self.order_idx is not None:
+            self.view.on_print(self.order_idx)
+
+    def bind(self, order_idx, y, width, height):
+        self.order_idx = order_idx
+        self.view.canvas.coords(self.window, ROW_PADDING, y)
+        self.view.canvas.itemconfigure(self.window, state="normal", width=width, height=height)
+        self.update()
+
+    def release(self):
+        self.order_idx = None
+        self.rendered = None
+        self.view.canvas.itemconfigure(self.window, state="hidden")
+
+    def update(self):
+        content = self.view.row_content(self.order_idx)
+        if content == self.rendered:
+            return
+        name, lines, status = content
+
+        self.header.config(text=name)
+        while len(self.item_labels) < len(lines):
+            self.item_labels.append(Label(self.frame, anchor="w", justify="left", font=ITEM_FONT, bg="white"))
+        self.status.pack_forget()
+        self.button.pack_forget()
+        for label in self.item_labels:
+            label.pack_forget()
+        for label, line in zip(self.item_labels, lines):
+            label.config(text=line)
+            label.pack(anchor="w")
+        if status:
+            text, color = status
+            self.status.config(text=text, fg=color)
+            self.status.pack(anchor="w")
+        self.button.pack(anchor="w", padx=5)
+        self.rendered = content
+
+
+class OrderListView:
+    """
+    Virtualized customer order list.
+    Row heights are computed from the item count so the scroll region is known
+    without creating widgets; only rows in or near the viewport are materialized,
+    using a small pool of row widgets, and a scan refreshes only the rows it changed.
+    """
+
+    def __init__(self, parent, manager, on_print, status_provider):
+        self.manager = manager
+        self.on_print = on_print
+        self.status_provider = status_provider
+
+        self.canvas = tk.Canvas(parent, bg="white")
+        self.scrollbar = tk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
+        self.canvas.configure(yscrollcommand=self._on_canvas_scroll)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<Enter>", self._bind_wheel)
+        self.canvas.bind("<Leave>", self._unbind_wheel)
+
+        self._measure_heights()
+        self.active = {}
+        self.pool = []
+        self.offsets = [0]
+        self.relayout()
+
+    def _measure_heights(self):
+        probes = {
+            "header": Label(self.canvas, text="Ag", font=HEADER_FONT),
+            "item": Label(self.canvas, text="Ag", font=ITEM_FONT),
+            "status": Label(self.canvas, text="Ag"),
+            "button": Button(self.canvas, text="PRINT", relief="groove"),
+        }
+        self.heights = {name: widget.winfo_reqheight() for name, widget in probes.items()}
+        for widget in probes.values():
+            widget.destroy()
+
+    def row_height(self, order_idx):
+        items = len(self.manager.orders[order_idx]["items"])
+        h = self.heights["header"] + items * self.heights["item"] + self.heights["button"]
+        return h + self.heights["status"] + ROW_PADDING
+
+    def row_content(self, order_idx):
+        order = self.manager.orders[order_idx]
+        lines = []
+        for item_idx, item in enumerate(order["items"]):
+            scanned = self.manager.scanned(order_idx, item_idx)
+            needed = item["quantity"]
+            status = "✔" if scanned >= needed else "✖"
+            lines.append(f"    {status}  {item['product']} ({item['sku']}): {scanned}/{needed}")
+        return order["name"], tuple(lines), self.status_provider(order_idx)
+
+    def relayout(self):
+        """Recompute row offsets; call after orders are added or change size."""
+        offsets = [0]
+        for order_idx in range(len(self.manager.orders)):
+            offsets.append(offsets[-1] + self.row_height(order_idx))
+        self.offsets = offsets
+        self.canvas.configure(scrollregion=(0, 0, 0, offsets[-1]))
+        for row in self.active.values():
+            row.release()
+            self.pool.append(row)
+        self.active = {}
+        self.refresh_viewport()
+
+    def orders_changed(self, changed, added):
+        """Re-lay out from the first changed or added order onward and refresh those rows."""
+        touched = list(changed) + list(added)
+        if not touched:
+            return
+        start = min(touched)
+        offsets = self.offsets[:start + 1]
+        for order_idx in range(start, len(self.manager.orders)):
+            offsets.append(offsets[-1] + self.row_height(order_idx))
+        self.offsets = offsets
+        self.canvas.configure(scrollregion=(0, 0, 0, offsets[-1]))
+        for order_idx in [i for i in self.active if i >= start]:
+            row = self.active.pop(order_idx)
+            row.release()
+            self.pool.append(row)
+        self.refresh_viewport()
+
+    def _visible_range(self):
+        total = self.offsets[-1]
+        if total == 0:
+            return 0, 0
+        top = self.canvas.canvasy(0) - OVERSCAN_PX
+        bottom = self.canvas.canvasy(self.canvas.winfo_height()) + OVERSCAN_PX
+        first = max(bisect_right(self.offsets, top) - 1, 0)
+        last = min(bisect_right(self.offsets, bottom), len(self.manager.orders))
+        return first, last
+
+    def refresh_viewport(self):
+        first, last = self._visible_range()
+        for order_idx in [i for i in self.active if i < first or i >= last]:
+            row = self.active.pop(order_idx)
+            row.release()
+            self.pool.append(row)
+
+        width = self._row_width()
+        for order_idx in range(first, last):
+            if order_idx in self.active:
+                continue
+            row = self.pool.pop() if self.pool else _OrderRow(self)
+            row.bind(order_idx, self.offsets[order_idx], width, self.row_height(order_idx) - ROW_PADDING)
+            self.active[order_idx] = row
+
+    def _row_width(self):
+        return max(self.canvas.winfo_width() - 2 * ROW_PADDING, 1)
+
+    def _on_configure(self, event):
+        # Rows keep the width they were bound with, so follow the canvas when it is resized
+        width = self._row_width()
+        for row in self.active.values():
+            self.canvas.itemconfigure(row.window, width=width)
+        self.refresh_viewport()
+
+    def refresh_rows(self, order_idxs):
+        """Update only the given rows, and only if they are currently materialized."""
+        for order_idx in order_idxs:
+            row = self.active.get(order_idx)
+            if row is not None:
+                row.update()
+
+    def scroll_to(self, order_idx):
+        total = self.offsets[-1]
+        if total:
+            self.canvas.yview_moveto(self.offsets[order_idx] / total)
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+
+    def _on_canvas_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh_viewport()
+
+    # Windows and macOS send <MouseWheel> with a delta; X11 sends <Button-4>/<Button-5>
+
+    def _bind_wheel(self, event):
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.bind_all(sequence, self._on_mousewheel)
+
+    def _unbind_wheel(self, event):
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.unbind_all(sequence)
+
+    def _on_mousewheel(self, event):
+        if event.num in (4, 5):
+            step = -1 if event.num == 4 else 1
+        else:
+            step = int(-event.delta / 120) or (-1 if event.delta > 0 else 1)
+        self.canvas.yview_scroll(step, "units")
@@ -1,43 +1,364 @@
 import json
-from collections import defaultdict
+from array import array
+from collections import defaultdict, deque
+from typing import List, Dict
+
+
+def normalize_sku(sku):
+    return str(sku).strip().lower()
+
+
+def order_key(order):
+    return order.get("order_id") or order.get("name", "")
+
+
+def line_key(item):
+    return normalize_sku(item["sku"]), item.get("product", "")
+
+
+def _combine_items(items):
+    """The items with rows that repeat a line (same SKU and product) summed into one item."""
+    lines = {}
+    for item in items:
+        line = lines.get(line_key(item))
+        if line is None:
+            lines[line_key(item)] = dict(item)
+        else:
+            line["quantity"] += item["quantity"]
+    return list(lines.values())
+
+
+def _combine_lines(orders):
+    """The orders with rows that repeat a line (same order, SKU and product) summed into one item."""
+    combined = {}
+    for order in orders:
+        key = order_key(order)
+        if key not in combined:
+            combined[key] = dict(order, items=[])
+        combined[key]["items"].extend(order["items"])
+    for order in combined.values():
+        order["items"] = _combine_items(order["items"])
+    return list(combined.values())
+
 
 class OrderManager:
-    def __init__(self, order_json_path):
+    """
+    Scan engine for every open order at once (wave picking).
+    Order lines get integer ids; quantities and scan counts live in flat arrays
+    indexed by line id, and each SKU keeps a FIFO of its lines that still need
+    scans. A scan fills the oldest open line for that SKU, so applying it is
+    amortized O(1) however many orders are open. With broadcast=True a scan is
+    instead counted against every open line with the SKU (the station's original
+    behaviour, for one-order-at-a-time packing).
+    """
+
+    def __init__(self, orders: List[Dict], broadcast=False):
+        self.orders = orders
+        self.broadcast = broadcast
+        self.sku_lines = defaultdict(list)
+        self.open_queue = defaultdict(deque)
+        self.line_qty = array("l")
+        self.line_scanned = array("l")
+        self.line_order = array("l")
+        self.line_item = array("l")
+        self.order_lines = []
+        self.open_lines = array("l")
+        self.order_by_id = {}
+        self.line_keys = []
+        self.completed_orders = set()
+        self.last_scan_lines = []
+
+        self.total_products = 0
+        self.total_labels = 0
+        self.scanned_products = 0
+        self.scanned_labels = 0
+        self.fully_scanned_orders = 0
+
+        for order_idx in range(len(orders)):
+            self._index_order(order_idx)
+
+    @classmethod
+    def from_json(cls, order_json_path, **kwargs):
+        """Manager for the order (or list of orders) in a JSON file."""
         with open(order_json_path, 'r') as f:
-            self.order_data = json.load(f)
+            data = json.load(f)
+        return cls(data if isinstance(data, list) else [data], **kwargs)
+
+    @classmethod
+    def from_csv(cls, csv_path=None, resolve_skus=True, **kwargs):
+        """Manager for every order in an orders export, loaded with the orders loader."""
+        from src.extract_customer_info import extract_all_customer_orders, CSV_ORDERS_PATH
+        orders = extract_all_customer_orders(csv_path or CSV_ORDERS_PATH)
+        if resolve_skus:
+            from src.name_matcher import get_name_matcher, resolve_missing_skus
+            resolve_missing_skus(orders, get_name_matcher())
+        return cls(orders, **kwargs)
+
+    # === Indexing ===
+
+    def _index_order(self, order_idx):
+        order = self.orders[order_idx]
+        if len({line_key(item) for item in order["items"]}) < len(order["items"]):
+            # Each line key maps to one item, so rows repeating a line become one line
+            order["items"] = _combine_items(order["items"])
+        self.open_lines.append(0)
+        self.order_lines.append([])
+        self.line_keys.append({})
+        self.order_by_id[order_key(order)] = order_idx
+        for item_idx, item in enumerate(order["items"]):
+            self._index_line(order_idx, item_idx, item)
+        if self.open_lines[order_idx] == 0:
+            self.fully_scanned_orders += 1
+
+    def _index_line(self, order_idx, item_idx, item):
+        line = len(self.line_qty)
+        sku = normalize_sku(item["sku"])
+        self.line_qty.append(item["quantity"])
+        self.line_scanned.append(0)
+        self.line_order.append(order_idx)
+        self.line_item.append(item_idx)
+        self.order_lines[order_idx].append(line)
+        self.sku_lines[sku].append(line)
+        self.line_keys[order_idx][line_key(item)] = item_idx
+        self.total_products += 1
+        self.total_labels += item["quantity"]
+        if item["quantity"] > 0:
+            self.open_lines[order_idx] += 1
+            self.open_queue[sku].append(line)
+
+    # === Queries ===
+
+    def scanned(self, order_idx, item_idx):
+        return self.line_scanned[self.order_lines[order_idx][item_idx]]
+
+    def is_fully_scanned(self, order_idx):
+        return self.open_lines[order_idx] == 0
+
+    def orders_with_sku(self, sku):
+        """Order indexes that contain the SKU, in order list order."""
+        return sorted({self.line_order[line] for line in self.sku_lines.get(normalize_sku(sku), ())})
+
+    def pending(self, order_idx=None):
+        """{sku: scans still needed}, for one order or across all orders."""
+        lines = self.order_lines[order_idx] if order_idx is not None else range(len(self.line_qty))
+        pending = defaultdict(int)
+        for line in lines:
+            missing = self.line_qty[line] - self.line_scanned[line]
+            if missing > 0:
+                pending[self._item(line)["sku"]] += missing
+        return dict(pending)
 
-        self.required = defaultdict(int)
-        self.scanned = defaultdict(int)
-        for item in self.order_data['items']:
-            sku = item['sku']
-            qty = item['quantity']
-            self.required[sku] += qty
+    def remaining(self, sku):
+        """Scans of the SKU still needed across all orders."""
+        return sum(max(self.line_qty[line] - self.line_scanned[line], 0)
+                   for line in self.sku_lines.get(normalize_sku(sku), ()))
 
-        self.current_sku = None
+    def _item(self, line):
+        return self.orders[self.line_order[line]]["items"][self.line_item[line]]
+
+    # === Scanning ===
+
+    def apply_scan(self, sku):
+        """
+        Count one scan of the SKU. Returns (touched order indexes, order indexes
+        that just became fully scanned); both are empty if no open line needs the SKU.
+        """
+        sku = normalize_sku(sku)
+        if self.broadcast:
+            lines = [line for line in self.sku_lines.get(sku, ()) if self.line_scanned[line] < self.line_qty[line]]
+        else:
+            queue = self.open_queue.get(sku)
+            # Lines are dropped lazily: a queued line may have been filled or shrunk since
+            while queue and self.line_scanned[queue[0]] >= self.line_qty[queue[0]]:
+                queue.popleft()
+            lines = [queue[0]] if queue else []
+
+        self.last_scan_lines = [(self.line_order[line], self.line_item[line]) for line in lines]
+        touched = []
+        newly_complete = []
+        for line in lines:
+            order_idx = self.line_order[line]
+            if self._add_scans(line, 1):
+                newly_complete.append(order_idx)
+            if order_idx not in touched:
+                touched.append(order_idx)
+        return touched, newly_complete
+
+    # === Saved state (see ScanJournal) ===
+
+    def line_ref(self, order_idx, item_idx):
+        """Stable reference to an order line that survives reloads: (order key, item index)."""
+        return order_key(self.orders[order_idx]), item_idx
+
+    def restore_scans(self, key, item_idx, count=1):
+        """Re-apply recorded scans to one line, never past its quantity. False if the line is unknown."""
+        order_idx = self.order_by_id.get(key)
+        if order_idx is None or not 0 <= item_idx < len(self.order_lines[order_idx]):
+            return False
+        line = self.order_lines[order_idx][item_idx]
+        self._add_scans(line, min(count, self.line_qty[line] - self.line_scanned[line]))
+        return True
+
+    def set_scanned(self, key, item_idx, scanned):
+        """Raise a line's scan count to `scanned` (as reported by the scan service). Returns the order index or None."""
+        order_idx = self.order_by_id.get(key)
+        if order_idx is None or not 0 <= item_idx < len(self.order_lines[order_idx]):
+            return None
+        self.restore_scans(key, item_idx, scanned - self.scanned(order_idx, item_idx))
+        return order_idx
+
+    def scan_state(self):
+        """Compact snapshot of scan progress: scanned lines as [order key, item index, count] and printed order keys."""
+        lines = [[order_key(self.orders[self.line_order[line]]), self.line_item[line], self.line_scanned[line]]
+                 for line in range(len(self.line_scanned)) if self.line_scanned[line]]
+        return {"lines": lines, "printed": sorted(self.completed_orders)}
+
+    def load_state(self, state):
+        """Replace scan progress with a scan_state() snapshot."""
+        self.reset()
+        for key, item_idx, count in state.get("lines", ()):
+            self.restore_scans(key, item_idx, count)
+        for key in state.get("printed", ()):
+            self.restore_printed(key)
+
+    def _add_scans(self, line, count):
+        """Count scans on a line; True if that completed its order."""
+        if count <= 0:
+            return False
+        order_idx = self.line_order[line]
+        scanned = self.line_scanned[line]
+        self.line_scanned[line] = scanned + count
+        self.scanned_labels += count
+        if scanned == 0:
+            self.scanned_products += 1
+        if scanned + count == self.line_qty[line]:
+            self.open_lines[order_idx] -= 1
+            if self.open_lines[order_idx] == 0:
+                self.fully_scanned_orders += 1
+                return True
+        return False
 
     def scan_product(self, sku):
-        if sku not in self.required:
+        """Apply a scan and describe it. Returns (message, whether an order became complete)."""
+        touched, newly_complete = self.apply_scan(sku)
+        if not touched:
+            if normalize_sku(sku) in self.sku_lines:
+                return f"⚠️ Extra {sku} scanned. Already complete.", False
             return "Invalid SKU", False
+        if newly_complete:
+            names = ", ".join(self.orders[idx].get("name", str(idx)) for idx in newly_complete)
+            return f"✅ {names} complete. Ready to print label.", True
+        remaining = self.remaining(sku)
+        return f"🛒 {sku} scanned. {remaining} more to go.", False
 
-        self.scanned[sku] += 1
+    def is_order_complete(self, order_idx=None):
+        """Whether one order (or, with no argument, every order) is fully scanned."""
+        if order_idx is None:
+            return self.fully_scanned_orders == len(self.orders)
+        return self.is_fully_scanned(order_idx)
 
-        if self.scanned[sku] == self.required[sku]:
-            return f"✅ {sku} complete. Ready to print label.", True
-        elif self.scanned[sku] < self.required[sku]:
-            remaining = self.required[sku] - self.scanned[sku]
-            return f"🛒 {sku} scanned. {remaining} more to go.", False
-        else:
-            return f"⚠️ Extra {sku} scanned. Already complete.", False
+    def get_pending_items(self, order_idx=None):
+        return self.pending(order_idx)
 
-    def is_order_complete(self):
-        return all(self.scanned[sku] >= self.required[sku] for sku in self.required)
+    def reset(self):
+        """Forget all scans and printed labels; orders stay loaded."""
+        for line in range(len(self.line_scanned)):
+            self.line_scanned[line] = 0
+        self.open_queue = defaultdict(deque)
+        for sku, lines in self.sku_lines.items():
+            self.open_queue[sku].extend(line for line in lines if self.line_qty[line] > 0)
+        self.open_lines = array("l", [sum(1 for line in lines if self.line_qty[line] > 0)
+                                      for lines in self.order_lines])
+        self.completed_orders = set()
+        self.scanned_products = 0
+        self.scanned_labels = 0
+        self.fully_scanned_orders = sum(1 for count in self.open_lines if count == 0)
 
-    def get_pending_items(self):
+    # === Reloads ===
+
+    def merge_orders(self, orders, appended=False):
+        """
+        Upsert orders parsed from a new or appended export without touching scan progress.
+        Lines are matched on (SKU, product) within an order, after rows repeating a
+        line are summed. From a full export known lines take the new quantity; rows
+        `appended` to an export add to it. Unknown lines and unknown orders are appended.
+        Returns (changed order indexes, added order indexes).
+        """
+        orders = _combine_lines(orders)
+        changed = []
+        added = []
+        for order in orders:
+            order_idx = self.order_by_id.get(order_key(order))
+            if order_idx is None:
+                self.orders.append(order)
+                self._index_order(len(self.orders) - 1)
+                added.append(len(self.orders) - 1)
+                continue
+
+            was_full = self.is_fully_scanned(order_idx)
+            modified = False
+            for item in order["items"]:
+                item_idx = self.line_keys[order_idx].get(line_key(item))
+                if item_idx is None:
+                    items = self.orders[order_idx]["items"]
+                    items.append(dict(item))
+                    self._index_line(order_idx, len(items) - 1, items[-1])
+                    modified = True
+                else:
+                    quantity = item["quantity"]
+                    if appended:
+                        quantity += self.orders[order_idx]["items"][item_idx]["quantity"]
+                    if self._set_quantity(order_idx, item_idx, quantity):
+                        modified = True
+            if modified:
+                now_full = self.is_fully_scanned(order_idx)
+                self.fully_scanned_orders += int(now_full) - int(was_full)
+                changed.append(order_idx)
+        return changed, added
+
+    def _set_quantity(self, order_idx, item_idx, quantity):
+        item = self.orders[order_idx]["items"][item_idx]
+        if item["quantity"] == quantity:
+            return False
+        line = self.order_lines[order_idx][item_idx]
+        scanned = self.line_scanned[line]
+        was_open = scanned < item["quantity"]
+        self.total_labels += quantity - item["quantity"]
+        item["quantity"] = quantity
+        self.line_qty[line] = quantity
+        now_open = scanned < quantity
+        self.open_lines[order_idx] += int(now_open) - int(was_open)
+        if now_open and not was_open:
+            self.open_queue[normalize_sku(item["sku"])].append(line)
+        return True
+
+    # === Labels ===
+
+    # Printed labels are kept per order key, like scans: a returning customer's new order is not printed yet
+
+    def mark_printed(self, order_idx, printed=True):
+        self.restore_printed(order_key(self.orders[order_idx]), printed)
+
+    def is_printed(self, order_idx):
+        return order_key(self.orders[order_idx]) in self.completed_orders
+
+    def restore_printed(self, key, printed=True):
+        """Re-apply a recorded print (or failed print). False if the order is unknown (e.g. from an earlier export)."""
+        if key not in self.order_by_id:
+            return False
+        if printed:
+            self.completed_orders.add(key)
+        else:
+            self.completed_orders.discard(key)
+        return True
+
+    def summary(self):
         return {
-            sku: self.required[sku] - self.scanned.get(sku, 0)
-            for sku in self.required
-            if self.scanned.get(sku, 0) < self.required[sku]
+            "scanned_products": self.scanned_products,
+            "total_products": self.total_products,
+            "scanned_labels": self.scanned_labels,
+            "total_labels": self.total_labels,
+            "printed_orders": len(self.completed_orders),
+            "total_orders": len(self.orders),
+            "fully_scanned_orders": self.fully_scanned_orders,
         }
-
-    def reset(self):
-        self.scanned = defaultdict(int)
\ No newline at end of file
@@ -0,0 +1,153 @@
+import io
+import os
+import csv
+import glob
+import queue
+import threading
+from src.extract_customer_info import read_orders_frame, orders_from_frame
+
+PREFIX_CHECK_BYTES = 4096
+
+
+class _FileState:
+    def __init__(self, size, mtime, offset, header, tail):
+        self.size = size
+        self.mtime = mtime
+        self.offset = offset
+        self.header = header
+        self.tail = tail
+
+
+class OrdersWatcher:
+    """
+    Watches the orders CSV (and optionally a drop folder of new exports) and
+    parses only what changed. When a file grows and its previously read bytes
+    are unchanged, only the appended complete records are parsed (a quoted
+    field may span lines, so a record half-written by the exporter waits for
+    the next poll); a rewritten file or a new export is parsed in full. Parsed
+    orders are posted to `updates` as (orders, appended) for the Tk thread to
+    merge into its OrderManager: appended rows add to the lines they repeat.
+    """
+
+    def __init__(self, csv_paths, drop_dir=None, interval=2.0):
+        self.csv_paths = [os.path.abspath(p) for p in csv_paths]
+        self.drop_dir = drop_dir
+        self.interval = interval
+        self.updates = queue.Queue()
+        self.files = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def prime(self, path):
+        """
+        Record a file as already loaded, so only later changes are reported. The
+        loader read it to the end, so a last record without a line break counts too.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with open(path, "rb") as f:
+            data = f.read()
+        end = _complete_end(data, at_eof=True)
+        self.files[path] = _FileState(stat.st_size, stat.st_mtime_ns, end, _header(data),
+                                      data[max(end - PREFIX_CHECK_BYTES, 0):end])
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="orders-watcher")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                batches = self.poll()
+            except Exception as e:
+                print(f"⚠️ Orders reload failed: {e}")
+                continue
+            for batch in batches:
+                self.updates.put(batch)
+
+    def _watched_paths(self):
+        paths = [p for p in self.csv_paths if os.path.exists(p)]
+        if self.drop_dir and os.path.isdir(self.drop_dir):
+            paths += sorted(os.path.abspath(p) for p in glob.glob(os.path.join(self.drop_dir, "*.csv")))
+        return paths
+
+    def poll(self):
+        """Return (orders, appended) for each file with new or appended rows since the last poll."""
+        batches = []
+        for path in self._watched_paths():
+            stat = os.stat(path)
+            state = self.files.get(path)
+            if state and state.size == stat.st_size and state.mtime == stat.st_mtime_ns:
+                continue
+            orders, appended = self._read_changes(path, stat, state)
+            if orders:
+                batches.append((orders, appended))
+        return batches
+
+    def _read_changes(self, path, stat, state):
+        with open(path, "rb") as f:
+            if state and stat.st_size >= state.size:
+                # Appended? The bytes we already consumed must be unchanged.
+                f.seek(state.offset - len(state.tail))
+                if f.read(len(state.tail)) == state.tail:
+                    new_data = f.read()
+                    end = _complete_end(new_data)
+                    chunk = new_data[:end]
+                    self.files[path] = _FileState(stat.st_size, stat.st_mtime_ns, state.offset + end, state.header,
+                                                  (state.tail + chunk)[-PREFIX_CHECK_BYTES:])
+                    if not chunk.strip():
+                        return [], True
+                    return _parse(state.header + chunk), True
+            f.seek(0)
+            data = f.read()
+
+        # New or rewritten file: parse it all and let the merge upsert.
+        end = _complete_end(data)
+        self.files[path] = _FileState(stat.st_size, stat.st_mtime_ns, end, _header(data),
+                                      data[max(end - PREFIX_CHECK_BYTES, 0):end])
+        return _parse(data[:end]), False
+
+
+def _complete_end(data, records=None, at_eof=False):
+    """
+    Byte offset just past the last complete CSV record in `data` (or past the
+    first `records` records). Quoted fields may contain line breaks, so the csv
+    module decides where records end rather than the last newline. With `at_eof`
+    a last record that only lacks its line break (no quoted field left open) is
+    complete as well.
+    """
+    text = data.decode("utf-8", errors="surrogateescape")
+    consumed = 0
+    exhausted = False
+
+    def lines():
+        nonlocal consumed, exhausted
+        for line in io.StringIO(text, newline=""):
+            consumed += len(line)
+            yield line
+        exhausted = True
+
+    end = 0
+    for count, _ in enumerate(csv.reader(lines()), 1):
+        if exhausted or text[consumed - 1] not in "\r\n":
+            # The input ran out inside this record, or before its line break: it is still being written
+            break
+        end = consumed
+        if records and count >= records:
+            break
+    if at_eof and text[end:].strip() and text[end:].count('"') % 2 == 0:
+        end = len(text)
+    return len(text[:end].encode("utf-8", errors="surrogateescape"))
+
+
+def _header(data):
+    return data[:_complete_end(data, records=1)]
+
+
+def _parse(data):
+    text = data.decode("utf-8-sig", errors="replace")
+    return orders_from_frame(read_orders_frame(io.StringIO(text)))
@@ -0,0 +1,144 @@
+import os
+import json
+import queue
+import socket
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+SERVICE_URL_ENV = "STATION_SERVICE_URL"
+RECONNECT_SECONDS = 2.0
+
+
+class ScanServiceClient:
+    """
+    Station side of the scan service (src.scan_service).
+    Scans and print requests are posted in order by one sender thread, so the Tk
+    thread never waits on the network; a listener thread follows the service's
+    event stream and posts events to `events` for the GUI to drain. After a
+    dropped connection the listener resumes from the last version it saw, and
+    when the service answers with a resync it fetches the full state again and
+    posts it as a {"type": "resync", "state": ...} event.
+    """
+
+    def __init__(self, url, station=None, timeout=5.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.station = station or socket.gethostname()
+        self.timeout = timeout
+        self.version = 0
+        self.events = queue.Queue()
+        self._outbox = queue.Queue()
+        self._stop = threading.Event()
+        self._threads = []
+
+    # === Requests ===
+
+    def _request(self, method, path, payload=None):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            body = json.dumps(payload).encode("utf-8") if payload is not None else None
+            conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            data = json.loads(response.read() or b"{}")
+            if response.status != 200:
+                raise RuntimeError(data.get("error", f"HTTP {response.status}"))
+            return data
+        finally:
+            conn.close()
+
+    def fetch_state(self):
+        """Orders, scan_state and version from the service; raises ConnectionError if it is unreachable."""
+        try:
+            state = self._request("GET", "/state")
+        except OSError as e:
+            raise ConnectionError(f"❌ Scan service at {self.host}:{self.port} is unreachable: {e}") from e
+        self.version = state["version"]
+        return state
+
+    def scan(self, sku):
+        self._outbox.put(("/scan", {"sku": sku, "station": self.station}))
+
+    def print_label(self, key, force=False):
+        self._outbox.put(("/print", {"order": key, "station": self.station, "force": force}))
+
+    def _send_loop(self):
+        while not self._stop.is_set():
+            path, payload = self._outbox.get()
+            if path is None:
+                return
+            try:
+                result = self._request("POST", path, payload)
+            except (OSError, RuntimeError, ValueError) as e:
+                self.events.put({"type": "error", "message": f"{path[1:]} failed: {e}"})
+                continue
+            if path == "/print" and not result.get("ok"):
+                self.events.put({"type": "error", "message": result.get("message", "print refused")})
+
+    # === Event stream ===
+
+    def start(self):
+        """Start the sender and the event listener; call after fetch_state()."""
+        self._stop.clear()
+        for target, name in ((self._send_loop, "scan-client-send"), (self._listen_loop, "scan-client-events")):
+            thread = threading.Thread(target=target, daemon=True, name=name)
+            thread.start()
+            self._threads.append(thread)
+
+    def _listen_loop(self):
+        while not self._stop.is_set():
+            try:
+                if self._listen():
+                    continue
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                if self._stop.is_set():
+                    return
+                self.events.put({"type": "disconnected", "message": str(e)})
+            self._stop.wait(RECONNECT_SECONDS)
+
+    def _listen(self):
+        """Follow the stream until it ends; True if it ended with a resync and should reconnect at once."""
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        try:
+            conn.request("GET", f"/events?since={self.version}")
+            response = conn.getresponse()
+            if response.status != 200:
+                raise http.client.HTTPException(f"HTTP {response.status}")
+            data_lines = []
+            while not self._stop.is_set():
+                line = response.fp.readline()
+                if not line:
+                    return False
+                line = line.rstrip(b"\r\n")
+                if line.startswith(b"data:"):
+                    data_lines.append(line[5:].strip())
+                elif not line and data_lines:
+                    event = json.loads(b"\n".join(data_lines))
+                    data_lines = []
+                    if event["type"] == "resync":
+                        self.events.put({"type": "resync", "state": self.fetch_state()})
+                        return True
+                    self.version = event["version"]
+                    self.events.put(event)
+            return False
+        finally:
+            conn.close()
+
+    def drain_events(self):
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def close(self):
+        self._stop.set()
+        self._outbox.put((None, None))
+
+
+def get_service_client():
+    """Client for STATION_SERVICE_URL, or None when the station runs standalone."""
+    url = os.environ.get(SERVICE_URL_ENV, "").strip()
+    return ScanServiceClient(url) if url else None
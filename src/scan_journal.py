@@ -0,0 +1,226 @@
+import os
+import sys
+import csv
+import json
+import time
+import glob
+import threading
+from datetime import datetime
+
+from src.order_manager import order_key
+
+
+def resource_path(relative_path):
+    if hasattr(sys, '_MEIPASS'):
+        return os.path.join(sys._MEIPASS, relative_path)
+    return os.path.abspath(relative_path)
+
+
+JOURNAL_DIR = resource_path("data/scan_journal")
+SCAN_LOG_PATH = resource_path("scan_log.csv")
+
+
+class ScanJournal:
+    """
+    Append-only journal of scans and printed labels, so a crash or restart does
+    not lose progress or print a label twice.
+
+    Records are JSON lines queued by the Tk thread and written by one background
+    thread that group-commits: everything queued within `commit_interval` is
+    written and fsynced together, so logging never blocks scanning. Every
+    `snapshot_every` records the manager's compact scan state is written as a
+    snapshot and the journal rolls over to a new generation file; startup
+    replays the snapshot plus the tail written after it. Each scanned line is
+    also appended to scan_log.csv for people to read.
+    """
+
+    def __init__(self, manager, journal_dir=JOURNAL_DIR, scan_log_path=SCAN_LOG_PATH,
+                 commit_interval=0.05, snapshot_every=2000):
+        self.manager = manager
+        self.journal_dir = journal_dir
+        self.scan_log_path = scan_log_path
+        self.commit_interval = commit_interval
+        self.snapshot_every = snapshot_every
+        self.generation = 0
+        self.since_snapshot = 0
+        self._good_end = None
+        self._pending = []
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+        self._file = None
+        os.makedirs(journal_dir, exist_ok=True)
+
+    # === Paths ===
+
+    def _snapshot_path(self):
+        return os.path.join(self.journal_dir, "snapshot.json")
+
+    def _journal_path(self, generation):
+        return os.path.join(self.journal_dir, f"journal.{generation:06d}.jsonl")
+
+    # === Startup ===
+
+    def replay(self):
+        """Restore the manager's scan state from the snapshot and journal tail. Returns records replayed."""
+        state = {}
+        try:
+            with open(self._snapshot_path(), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            pass
+        self.generation = state.get("generation", 0)
+        if state:
+            self.manager.load_state(state)
+
+        replayed = 0
+        self._good_end = None
+        try:
+            with open(self._journal_path(self.generation), "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn last write from a crash: everything before it is intact; cut it off on start()
+                        self._good_end = f.tell() - len(line)
+                        break
+                    self._apply(record)
+                    replayed += 1
+        except OSError:
+            pass
+        self.since_snapshot = replayed
+
+        # Generations older than the snapshot are already folded into it
+        for path in glob.glob(os.path.join(self.journal_dir, "journal.*.jsonl")):
+            if path != self._journal_path(self.generation):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return replayed
+
+    def _apply(self, record):
+        kind = record.get("e")
+        if kind == "scan":
+            for key, item_idx in record["lines"]:
+                self.manager.restore_scans(key, item_idx)
+        elif kind == "print":
+            self.manager.restore_printed(record["order"], record["printed"])
+
+    def start(self):
+        if self._good_end is not None:
+            os.truncate(self._journal_path(self.generation), self._good_end)
+        self._file = open(self._journal_path(self.generation), "a", encoding="utf-8")
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, daemon=True, name="scan-journal")
+        self._thread.start()
+
+    # === Recording (Tk thread) ===
+
+    def record_scan(self, sku):
+        """Journal the scan the manager just applied (its last_scan_lines)."""
+        lines = [self.manager.line_ref(order_idx, item_idx) for order_idx, item_idx in self.manager.last_scan_lines]
+        if lines:
+            self._queue({"e": "scan", "t": time.time(), "sku": sku, "lines": lines},
+                        [self._log_row(order_idx, item_idx) for order_idx, item_idx in self.manager.last_scan_lines])
+
+    def record_print(self, order_idx, printed=True):
+        """Journal that the order's label was printed, or with printed=False that it needs printing again."""
+        self._queue({"e": "print", "t": time.time(), "order": order_key(self.manager.orders[order_idx]),
+                     "printed": printed})
+
+    def clear(self):
+        """
+        Start over for a new shift: forget every scan and printed label and roll
+        the journal over to an empty snapshot, so nothing from this session is replayed.
+        """
+        self.manager.reset()
+        self.since_snapshot = 0
+        with self._cond:
+            self._pending.append((None, self.manager.scan_state()))
+            self._cond.notify()
+
+    def _log_row(self, order_idx, item_idx):
+        order = self.manager.orders[order_idx]
+        item = order["items"][item_idx]
+        return [datetime.now().strftime("%Y-%m-%d %H:%M:%S"), order["name"], order.get("address", ""),
+                item["product"], 1]
+
+    def _queue(self, record, log_rows=()):
+        snapshot = None
+        self.since_snapshot += 1
+        if self.since_snapshot >= self.snapshot_every:
+            # Taken here, on the thread that owns the manager, in order with the records before it
+            snapshot = self.manager.scan_state()
+            self.since_snapshot = 0
+        with self._cond:
+            self._pending.append((json.dumps(record), list(log_rows)))
+            if snapshot is not None:
+                self._pending.append((None, snapshot))
+            self._cond.notify()
+
+    # === Writer thread ===
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stop:
+                    self._cond.wait()
+                if not self._pending and self._stop:
+                    return
+            # Group commit: let more records arrive, then write and fsync them together
+            time.sleep(self.commit_interval)
+            with self._cond:
+                batch, self._pending = self._pending, []
+            try:
+                self._write(batch)
+            except OSError as e:
+                print(f"⚠️ Scan journal write failed: {e}")
+
+    def _write(self, batch):
+        log_rows = []
+        for line, payload in batch:
+            if line is None:
+                self._commit(log_rows)
+                log_rows = []
+                self._write_snapshot(payload)
+                continue
+            self._file.write(line + "\n")
+            log_rows.extend(payload)
+        self._commit(log_rows)
+
+    def _commit(self, log_rows):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if log_rows:
+            with open(self.scan_log_path, "a", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerows(log_rows)
+
+    def _write_snapshot(self, state):
+        """Write a snapshot that covers everything so far, then start the next journal generation."""
+        state = dict(state, generation=self.generation + 1, written=time.time())
+        tmp_path = self._snapshot_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._snapshot_path())
+        old_path = self._journal_path(self.generation)
+        self._file.close()
+        self.generation += 1
+        self._file = open(self._journal_path(self.generation), "a", encoding="utf-8")
+        try:
+            os.remove(old_path)
+        except OSError:
+            pass
+
+    def close(self):
+        """Write everything still queued and stop the writer thread."""
+        if not self._thread:
+            return
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        self._thread.join()
+        self._thread = None
+        self._file.close()
@@ -0,0 +1,376 @@
+import os
+import math
+import threading
+import queue
+import time
+import cv2
+import numpy as np
+from src.frame_gate import ChangeGate, RoiDecoder
+from utils.metrics import get_metrics
+
+PREVIEW_SIZE = (480, 320)
+SCAN_DEBOUNCE = 2.0
+CAMERAS_ENV = "STATION_CAMERAS"
+
+
+def camera_sources(value=None):
+    """
+    Capture sources from STATION_CAMERAS (comma-separated device indexes or
+    stream URLs, e.g. "0,1"); the first webcam when unset.
+    """
+    value = value if value is not None else os.environ.get(CAMERAS_ENV, "")
+    sources = [s.strip() for s in value.split(",") if s.strip()]
+    return [int(s) if s.isdigit() else s for s in sources] or [0]
+
+
+class LatestFrame:
+    """Single-slot frame buffer: the producer overwrites, consumers only ever see the newest frame."""
+
+    def __init__(self, cond=None):
+        self._cond = cond or threading.Condition()
+        self._frame = None
+        self._preview = None
+        self._seq = 0
+        self._taken_seq = 0
+        self.dropped = 0
+
+    def put(self, frame, preview=None):
+        with self._cond:
+            # The previous frame was never picked up by a decoder: it is dropped, not queued.
+            if self._seq > self._taken_seq:
+                self.dropped += 1
+                get_metrics().inc("dropped_frames")
+            self._frame = frame
+            self._preview = preview
+            self._seq += 1
+            self._cond.notify()
+
+    def ready(self):
+        """Whether a frame no decoder has seen yet is waiting (caller holds the condition)."""
+        return self._seq > self._taken_seq
+
+    def claim(self):
+        """Mark the newest frame as taken and return (seq, frame) (caller holds the condition)."""
+        self._taken_seq = self._seq
+        return self._seq, self._frame
+
+    def take(self, timeout=0.5):
+        """Block until a frame no decoder has seen yet is available. Returns (seq, frame) or (None, None)."""
+        with self._cond:
+            if not self._cond.wait_for(self.ready, timeout=timeout):
+                return None, None
+            return self.claim()
+
+    def peek_preview(self):
+        """Return (seq, preview) without consuming the frame; used by the UI to paint."""
+        with self._cond:
+            return self._seq, self._preview
+
+
+class Camera:
+    """One capture source: its latest-frame slot, change gate, QR region tracker and counters."""
+
+    def __init__(self, index, source, cond, gating=True, roi=True):
+        self.index = index
+        self.source = source
+        self.slot = LatestFrame(cond)
+        self.gate = ChangeGate() if gating else None
+        # Shared by every worker that decodes this camera's frames, so the last QR region carries over between them
+        self.roi = RoiDecoder() if roi else None
+        self.lock = threading.Lock()
+        self.decodes = 0
+        self.last_fallback = 0.0
+        self.capture = None
+
+    def should_decode(self, frame):
+        # Frames of one camera can be on several workers at once; the gate compares consecutive frames
+        if self.gate is None:
+            return True
+        with self.lock:
+            return self.gate.should_decode(frame)
+
+    def count_decode(self):
+        with self.lock:
+            self.decodes += 1
+
+    def fallback_due(self, interval):
+        """Claim the camera's next logo fallback if `interval` seconds passed since the last one, whichever worker ran it."""
+        with self.lock:
+            now = time.monotonic()
+            if now - self.last_fallback < interval:
+                return False
+            self.last_fallback = now
+            return True
+
+
+class FrameBoard:
+    """
+    The latest frame of every camera behind one condition, so a shared pool of
+    decode workers can wait on all cameras at once. Workers take cameras with an
+    unseen frame round-robin, so a fast camera cannot starve a slow one; each
+    camera holds at most one pending frame, which bounds the pool's input.
+    """
+
+    def __init__(self, sources, gating=True, roi=True):
+        self._cond = threading.Condition()
+        self.cameras = [Camera(i, source, self._cond, gating, roi) for i, source in enumerate(sources)]
+        self._next = 0
+
+    def _any_ready(self):
+        return any(camera.slot.ready() for camera in self.cameras)
+
+    def take(self, timeout=0.5):
+        """(camera, frame) for the next camera with an unseen frame, or (None, None) on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(self._any_ready, timeout=timeout):
+                return None, None
+            count = len(self.cameras)
+            for i in range(count):
+                camera = self.cameras[(self._next + i) % count]
+                if camera.slot.ready():
+                    self._next = camera.index + 1
+                    _, frame = camera.slot.claim()
+                    return camera, frame
+            return None, None
+
+
+class CaptureThread(threading.Thread):
+    """Reads frames from a camera as fast as it delivers them and keeps only the latest one."""
+
+    def __init__(self, source, slot, stop_event, preview_size=PREVIEW_SIZE):
+        super().__init__(daemon=True, name=f"capture-{source}")
+        self.source = source
+        self.slot = slot
+        self.stop_event = stop_event
+        self.preview_size = preview_size
+        self.frames = 0
+        self.opened = threading.Event()
+        self.failed = False
+
+    def run(self):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            self.failed = True
+            self.opened.set()
+            return
+        self.opened.set()
+        metrics = get_metrics()
+        try:
+            while not self.stop_event.is_set():
+                with metrics.span("capture_read"):
+                    ret, frame = cap.read()
+                if not ret:
+                    time.sleep(0.01)
+                    continue
+                # Prepare the preview here so the Tk thread only has to paint it.
+                preview = cv2.cvtColor(cv2.resize(frame, self.preview_size), cv2.COLOR_BGR2RGB)
+                self.slot.put(frame, preview)
+                self.frames += 1
+                metrics.inc("frames")
+        finally:
+            cap.release()
+
+
+class DecodeWorker(threading.Thread):
+    """
+    One worker of the shared decode pool: takes the newest unseen frame of any
+    camera, decodes it and posts (time, camera index, QR text) to the results queue.
+    SKUs guessed by the logo fallback go to the separate suggestions queue in the
+    same form: they are shown for confirmation, never counted as scans.
+    """
+
+    def __init__(self, board, results, stop_event, detector_factory, index=0,
+                 fallback=None, fallback_interval=0.5, suggestions=None):
+        super().__init__(daemon=True, name=f"decode-{index}")
+        self.board = board
+        self.results = results
+        self.suggestions = suggestions
+        self.stop_event = stop_event
+        self.detector_factory = detector_factory
+        self.fallback = fallback
+        self.fallback_interval = fallback_interval
+        self.decodes = 0
+
+    def run(self):
+        # Either a thread-safe QRDecoder or a detector this worker owns exclusively.
+        detector = self.detector_factory()
+        metrics = get_metrics()
+        while not self.stop_event.is_set():
+            camera, frame = self.board.take()
+            if frame is None:
+                continue
+            if not camera.should_decode(frame):
+                continue
+            with metrics.span("decode"):
+                if camera.roi is not None:
+                    qr_codes, _ = camera.roi.decode(frame, detector)
+                else:
+                    qr_codes, _ = detector.detectAndDecode(frame)
+            self.decodes += 1
+            camera.count_decode()
+            metrics.inc("decodes")
+            if qr_codes:
+                self.results.put((time.monotonic(), camera.index, qr_codes[0]))
+            elif self.fallback is not None and camera.fallback_due(self.fallback_interval):
+                # No QR sticker: try recognizing the product artwork itself, at a throttled rate per camera
+                with metrics.span("logo_fallback"):
+                    code = self.fallback(frame)
+                if code and self.suggestions is not None:
+                    self.suggestions.put((time.monotonic(), camera.index, code))
+
+
+class ScanPipeline:
+    """
+    Producer/consumer webcam scan loop for one or more cameras.
+    Each camera has a capture thread that keeps only its latest frame; a shared
+    pool of decode workers (one per CPU by default) consumes the newest frame of
+    whichever camera has one, and decoded QR text is handed to the Tk thread
+    through a thread-safe queue. Under load frames are dropped rather than
+    queued. Unchanged frames are skipped by a per-camera change gate and
+    decoding is restricted to likely QR regions. The same code seen by any
+    camera within `debounce` seconds is reported once. SKUs guessed by the
+    logo `fallback` are kept apart and read with drain_suggestions().
+    """
+
+    def __init__(self, detector_factory, sources=(0,), decode_workers=None, gating=True, roi=True,
+                 fallback=None, debounce=SCAN_DEBOUNCE):
+        self.detector_factory = detector_factory
+        self.sources = list(sources)
+        self.decode_workers = decode_workers or os.cpu_count() or 1
+        self.gating = gating
+        self.roi = roi
+        self.fallback = fallback
+        self.debounce = debounce
+        self.board = FrameBoard(self.sources, gating, roi)
+        self.results = queue.Queue()
+        self.suggestions = queue.Queue()
+        self.stop_event = threading.Event()
+        self.workers = []
+        self.running = False
+        self.duplicates = 0
+        self._last_accepted = {}
+        self._rate_mark = None
+        self._mosaic = None
+        self._mosaic_seqs = None
+
+        cols = math.ceil(math.sqrt(len(self.sources)))
+        self.grid = (cols, math.ceil(len(self.sources) / cols))
+        self.tile_size = (PREVIEW_SIZE[0] // cols, PREVIEW_SIZE[1] // cols)
+
+    @property
+    def cameras(self):
+        return self.board.cameras
+
+    def start(self):
+        self.stop_event.clear()
+        for camera in self.cameras:
+            camera.capture = CaptureThread(camera.source, camera.slot, self.stop_event, self.tile_size)
+            camera.capture.start()
+        self.workers = [
+            DecodeWorker(self.board, self.results, self.stop_event, self.detector_factory, index=i,
+                         fallback=self.fallback, suggestions=self.suggestions)
+            for i in range(self.decode_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+        self.running = True
+
+    def stop(self):
+        self.stop_event.set()
+        for thread in [camera.capture for camera in self.cameras] + self.workers:
+            if thread is not None:
+                thread.join(timeout=1)
+        for camera in self.cameras:
+            camera.capture = None
+        self.workers = []
+        self.running = False
+
+    def is_running(self):
+        return self.running and not self.stop_event.is_set()
+
+    def camera_failed(self):
+        """True when no camera could be opened."""
+        captures = [camera.capture for camera in self.cameras]
+        return all(c is not None and c.failed for c in captures)
+
+    def latest_preview(self):
+        """
+        (seq, RGB preview); with several cameras their previews are tiled into one grid,
+        which is only recomposed when some camera has a new frame.
+        """
+        if len(self.cameras) == 1:
+            return self.cameras[0].slot.peek_preview()
+        previews = [camera.slot.peek_preview() for camera in self.cameras]
+        seqs = tuple(seq for seq, _ in previews)
+        if seqs != self._mosaic_seqs:
+            tile_w, tile_h = self.tile_size
+            mosaic = np.zeros((self.grid[1] * tile_h, self.grid[0] * tile_w, 3), dtype=np.uint8)
+            for camera, (_, preview) in zip(self.cameras, previews):
+                if preview is not None:
+                    row, col = divmod(camera.index, self.grid[0])
+                    mosaic[row * tile_h:(row + 1) * tile_h, col * tile_w:(col + 1) * tile_w] = preview
+            self._mosaic, self._mosaic_seqs = mosaic, seqs
+        return sum(seqs), self._mosaic
+
+    def drain_results(self):
+        """
+        Return every decoded QR text posted since the last call, without blocking.
+        A code already reported within the debounce window (by any camera) is dropped.
+        """
+        codes = []
+        while True:
+            try:
+                seen_at, camera_index, code = self.results.get_nowait()
+            except queue.Empty:
+                break
+            key = code.strip().lower()
+            last = self._last_accepted.get(key)
+            if last is not None and seen_at - last <= self.debounce:
+                self.duplicates += 1
+                continue
+            self._last_accepted[key] = seen_at
+            codes.append(code)
+        if len(self._last_accepted) > 1000:
+            now = time.monotonic()
+            self._last_accepted = {k: t for k, t in self._last_accepted.items() if now - t <= self.debounce}
+        return codes
+
+    def drain_suggestions(self):
+        """The newest SKU suggested by the logo fallback since the last call, or None."""
+        code = None
+        while True:
+            try:
+                _, _, code = self.suggestions.get_nowait()
+            except queue.Empty:
+                return code
+
+    def camera_stats(self):
+        """Per camera: source, capture FPS and decode rate since the previous call, dropped and skipped frames."""
+        now = time.monotonic()
+        counts = [(camera.capture.frames if camera.capture else 0, camera.decodes) for camera in self.cameras]
+        mark, self._rate_mark = self._rate_mark, (now, counts)
+        stats = []
+        for camera, (frames, decodes) in zip(self.cameras, counts):
+            fps = decode_rate = 0.0
+            if mark is not None and now > mark[0]:
+                last_frames, last_decodes = mark[1][camera.index]
+                fps = (frames - last_frames) / (now - mark[0])
+                decode_rate = (decodes - last_decodes) / (now - mark[0])
+            stats.append({
+                "source": camera.source,
+                "failed": bool(camera.capture and camera.capture.failed),
+                "fps": fps,
+                "decode_rate": decode_rate,
+                "dropped": camera.slot.dropped,
+                "skipped": camera.gate.skipped if camera.gate is not None else 0,
+            })
+        return stats
+
+    def stats(self):
+        return {
+            "frames": sum(camera.capture.frames for camera in self.cameras if camera.capture),
+            "decodes": sum(w.decodes for w in self.workers),
+            "dropped": sum(camera.slot.dropped for camera in self.cameras),
+            "skipped": sum(camera.gate.skipped for camera in self.cameras if camera.gate is not None),
+            "duplicates": self.duplicates,
+        }
@@ -0,0 +1,359 @@
+"""
+Headless scan service: one authoritative order state shared by every packing station.
+
+    python -m src.scan_service --port 8765
+
+Stations post scans over HTTP and follow the state with Server-Sent Events;
+the GUI becomes a thin client when STATION_SERVICE_URL is set (see scan_client).
+
+    GET  /state                 orders, scan progress and the current event version
+    POST /scan   {"sku", "station"}
+    POST /print  {"order", "station", "force"}
+    GET  /events?since=VERSION  event stream: scan, label, print_result, orders, resync
+
+Malformed requests are answered with 400 and requests that fail with 500.
+"""
+import copy
+import json
+import asyncio
+import argparse
+import functools
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+
+from src.order_manager import OrderManager, order_key
+from src.scan_journal import ScanJournal
+from src.orders_watcher import OrdersWatcher
+from src.extract_customer_info import CSV_ORDERS_PATH
+from src.fetch_shipping_label import fetch_shipping_label
+from src.label_store import get_label_store
+from src.name_matcher import get_name_matcher, resolve_missing_skus
+from utils.pdf_printing import extract_and_print_pdf_page
+from utils.print_spooler import get_print_spooler
+from utils.metrics import get_metrics
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+HISTORY = 10000
+SUBSCRIBER_QUEUE = 1000
+HEARTBEAT_SECONDS = 15
+POLL_SECONDS = 0.2
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               500: "Internal Server Error"}
+
+
+class ScanService:
+    """
+    Owns the OrderManager and ScanJournal and is the only thing that changes them.
+    Every request runs on the asyncio loop thread, so scans from any number of
+    stations are applied one at a time in arrival order without locks; only
+    label lookups run on a worker thread. Each change is published as a
+    numbered event; subscribers get the events after the version they last
+    saw, or a resync when they fell too far behind.
+    A label is claimed (marked printed and journaled) before it is fetched, so
+    an order completed by two stations' scans is still printed exactly once;
+    the claim is released if the label cannot be fetched or the print fails.
+    A forced reprint of an order that was already printed takes no claim, so
+    its failure leaves the order printed.
+    """
+
+    def __init__(self, manager, journal=None, watcher=None, history=HISTORY):
+        self.manager = manager
+        self.journal = journal
+        self.watcher = watcher
+        self.version = 0
+        self.history = deque(maxlen=history)
+        self.subscribers = set()
+        self.claimed_jobs = set()
+        self.metrics = get_metrics()
+        self._server = None
+
+    # === State changes ===
+
+    def state(self):
+        return {"version": self.version, "orders": self.manager.orders,
+                "scan_state": self.manager.scan_state(), "summary": self.manager.summary()}
+
+    async def scan(self, sku, station=""):
+        with self.metrics.span("service_scan"):
+            sku = str(sku).strip().lower()
+            touched, newly_complete = self.manager.apply_scan(sku)
+            if self.journal:
+                self.journal.record_scan(sku)
+            lines = [list(self.manager.line_ref(order_idx, item_idx)) + [self.manager.scanned(order_idx, item_idx)]
+                     for order_idx, item_idx in self.manager.last_scan_lines]
+            if lines:
+                self._publish({"type": "scan", "sku": sku, "station": station, "lines": lines,
+                               "summary": self.manager.summary()})
+        for order_idx in newly_complete:
+            await self._print(order_idx, station)
+        return {"version": self.version, "touched": [order_key(self.manager.orders[i]) for i in touched],
+                "complete": [order_key(self.manager.orders[i]) for i in newly_complete],
+                "known": sku in self.manager.sku_lines}
+
+    async def print_label(self, key, station="", force=False):
+        """Manual print of an order (by order key) from a station; refused if already printed unless `force`."""
+        order_idx = self.manager.order_by_id.get(key)
+        if order_idx is None:
+            return {"ok": False, "message": f"Unknown order {key}"}
+        if self.manager.is_printed(order_idx) and not force:
+            return {"ok": False, "message": f"Label for {self.manager.orders[order_idx]['name']} was already printed"}
+        return await self._print(order_idx, station, manual=True)
+
+    async def _print(self, order_idx, station, manual=False):
+        order = self.manager.orders[order_idx]
+        customer_name = order["name"]
+        was_printed = self.manager.is_printed(order_idx)
+        if was_printed and not manual:
+            return {"ok": False, "message": f"Label for {customer_name} was already printed"}
+        if not was_printed:
+            # Claimed before the lookup yields the loop: a second completion or a racing station sees it printed
+            self._set_printed(order_idx, True)
+        with self.metrics.span("fetch_shipping_label"):
+            page = await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(fetch_shipping_label, customer_name.strip().title(),
+                                        order_id=order.get("order_id")))
+        event = {"type": "label", "order": order_key(order), "name": customer_name, "station": station,
+                 "manual": manual, "page": page, "ok": page is not None}
+        job_id = None if page is None else extract_and_print_pdf_page(page_number=page, copies=1, tag=order_key(order))
+        if job_id is not None and not was_printed:
+            # Only this job's failure may release the claim
+            self.claimed_jobs.add(job_id)
+        if job_id is None:
+            if not was_printed:
+                self._set_printed(order_idx, False)
+            event["ok"] = False
+            event["message"] = f"Could not fetch label for {customer_name}"
+        self._publish(event)
+        return {"ok": event["ok"], "page": page, "message": event.get("message", "queued")}
+
+    def _set_printed(self, order_idx, printed):
+        self.manager.mark_printed(order_idx, printed)
+        if self.journal:
+            self.journal.record_print(order_idx, printed)
+
+    def merge_orders(self, orders, appended=False):
+        resolve_missing_skus(orders, get_name_matcher())
+        # The manager keeps (and later updates) the dicts it merges; publish them as they are now
+        published = copy.deepcopy(orders)
+        changed, added = self.manager.merge_orders(orders, appended)
+        if changed or added:
+            # Clients merge the same list the same way and end up with the same indexes
+            self._publish({"type": "orders", "orders": published, "appended": appended, "changed": len(changed),
+                           "added": len(added), "summary": self.manager.summary()})
+
+    # === Events ===
+
+    def _publish(self, event):
+        self.version += 1
+        event["version"] = self.version
+        self.history.append(event)
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too slow to keep up: drop its backlog and tell it to resync from /state
+                self.subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def events_since(self, since):
+        """Events after `since`, or None if some of them are no longer in the history."""
+        if since >= self.version:
+            return []
+        if not self.history or self.history[0]["version"] > since + 1:
+            return None
+        return [event for event in self.history if event["version"] > since]
+
+    async def _poll_background(self):
+        """Fold print outcomes from the spooler and order reloads from the watcher into the event stream."""
+        spooler = get_print_spooler()
+        while True:
+            for job_id, key, ok, message in spooler.drain_events():
+                claimed = job_id in self.claimed_jobs
+                self.claimed_jobs.discard(job_id)
+                order_idx = self.manager.order_by_id.get(key)
+                if order_idx is None:
+                    continue
+                released = claimed and not ok
+                if released:
+                    # Release the claim so the order can be printed again
+                    self._set_printed(order_idx, False)
+                self._publish({"type": "print_result", "job": job_id, "order": key, "released": released,
+                               "name": self.manager.orders[order_idx]["name"], "ok": ok, "message": message})
+            if self.watcher:
+                while not self.watcher.updates.empty():
+                    self.merge_orders(*self.watcher.updates.get_nowait())
+            await asyncio.sleep(POLL_SECONDS)
+
+    # === HTTP ===
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError as e:
+                    _write_response(writer, 400, {"error": f"malformed request: {e}"})
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                url = urlsplit(target)
+                if url.path == "/events" and method == "GET":
+                    query = parse_qs(url.query)
+                    since = query.get("since", [headers.get("last-event-id", "")])[0]
+                    await self._stream(writer, int(since) if since.isdigit() else self.version)
+                    break
+                try:
+                    status, payload = await self._route(method, url.path, body)
+                except Exception as e:
+                    print(f"❌ {method} {url.path} failed: {e}")
+                    status, payload = 500, {"error": str(e)}
+                _write_response(writer, status, payload)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"error": "body is not JSON"}
+        if path == "/state":
+            return (200, self.state()) if method == "GET" else (405, {"error": "use GET"})
+        if path == "/scan":
+            if method != "POST" or not data.get("sku"):
+                return 400, {"error": "POST {\"sku\": ...}"}
+            return 200, await self.scan(data["sku"], data.get("station", ""))
+        if path == "/print":
+            if method != "POST" or not data.get("order"):
+                return 400, {"error": "POST {\"order\": ...}"}
+            return 200, await self.print_label(data["order"], data.get("station", ""), bool(data.get("force")))
+        return 404, {"error": f"no route {path}"}
+
+    async def _stream(self, writer, since):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                     b"Connection: keep-alive\r\n\r\n")
+        backlog = self.events_since(since)
+        if backlog is None or len(backlog) >= SUBSCRIBER_QUEUE:
+            writer.write(_sse({"type": "resync", "version": self.version}))
+            await writer.drain()
+            return
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE)
+        for event in backlog:
+            queue.put_nowait(event)
+        self.subscribers.add(queue)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    writer.write(b": ping\n\n")
+                    await writer.drain()
+                    continue
+                if event is None:
+                    writer.write(_sse({"type": "resync", "version": self.version}))
+                    await writer.drain()
+                    return
+                writer.write(_sse(event))
+                await writer.drain()
+        finally:
+            self.subscribers.discard(queue)
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        # Build the label index before accepting scans, so the first completed order does not stall the loop
+        await asyncio.get_running_loop().run_in_executor(None, get_label_store)
+        if self.watcher:
+            self.watcher.start()
+        if self.journal:
+            self.journal.start()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        print(f"📡 Scan service on http://{host}:{port} ({len(self.manager.orders)} orders)")
+        async with self._server:
+            await asyncio.gather(self._server.serve_forever(), self._poll_background())
+
+    def close(self):
+        if self.watcher:
+            self.watcher.stop()
+        if self.journal:
+            self.journal.close()
+
+
+async def _read_request(reader):
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def _write_response(writer, status, payload):
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                 % (status, STATUS_TEXT.get(status, "").encode(), len(body)) + body)
+
+
+def _sse(event):
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event["version"], event["type"].encode(),
+                                                  json.dumps(event).encode("utf-8"))
+
+
+def build_service(csv_path=CSV_ORDERS_PATH, watch=True, new_shift=False):
+    """
+    Service for the orders export, with its scan journal replayed and the export
+    watched for new rows. With `new_shift` the journal is cleared instead.
+    """
+    manager = OrderManager.from_csv(csv_path)
+    journal = ScanJournal(manager)
+    restored = journal.replay()
+    if new_shift:
+        journal.clear()
+        print("🆕 Scan journal cleared for a new shift")
+    elif restored or manager.scanned_labels:
+        print(f"♻️ Restored {manager.scanned_labels} scans from the journal")
+    watcher = None
+    if watch:
+        watcher = OrdersWatcher([csv_path])
+        watcher.prime(csv_path)
+    return ScanService(manager, journal, watcher)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared scan and label service for packing stations.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT})")
+    parser.add_argument("--orders", default=CSV_ORDERS_PATH, help="orders export CSV (default: data/orders.csv)")
+    parser.add_argument("--no-watch", action="store_true", help="do not reload the export when it changes")
+    parser.add_argument("--new-shift", action="store_true",
+                        help="forget journaled scans and printed labels before starting")
+    args = parser.parse_args(argv)
+
+    service = build_service(args.orders, watch=not args.no_watch, new_shift=args.new_shift)
+    service.metrics.start_exporters()
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import pytest
+
+import utils.qr_decoder as qr_decoder
+from utils.batch_qr_scan import batch_scan, load_done_paths, FIELDS
+
+
+def test_resume_refuses_csv_with_another_header(tmp_path):
+    output = tmp_path / "results.csv"
+    old = "path,codes,boxes,ms,error\nimages/a.png,IF_A,[],1.0,\n"
+    output.write_text(old, encoding="utf-8")
+    with pytest.raises(RuntimeError, match="cannot resume"):
+        batch_scan([str(tmp_path)], str(output), resume=True, cascade=["opencv"])
+    assert output.read_text(encoding="utf-8") == old
+
+
+def test_resume_reads_done_paths_under_current_header(tmp_path):
+    output = tmp_path / "results.csv"
+    output.write_text(",".join(FIELDS) + "\nimages/a.png,IF_A,[],opencv,1.0,\n", encoding="utf-8")
+    assert load_done_paths(str(output), "csv") == {"images/a.png"}
+
+
+def test_wechat_needs_both_model_files(monkeypatch, tmp_path):
+    monkeypatch.setattr(qr_decoder, "WECHAT_PROTOTXT", str(tmp_path / "missing.prototxt"))
+    assert not qr_decoder.backend_available("wechat")
@@ -0,0 +1,38 @@
+import os
+
+import src.extract_customer_info as extract_customer_info
+from src.extract_customer_info import extract_all_customer_orders, _cache_path
+
+CSV = ('"Order ID","First name","Last name","Lineitem name","Lineitem SKU","Lineitem quantity","Shipping address city"\n'
+       '"2-2","Nick","Cansfield","Scarf","IF_B","1","Leeds"\n'
+       '"1-1","Jenna","Saines","Socks","IF_A","2",""\n'
+       '"2-2","Nick","Cansfield","Hat","IF_C","3","Leeds"\n')
+
+
+def test_cached_columns_load_back_as_the_same_orders(monkeypatch, tmp_path):
+    monkeypatch.setattr(extract_customer_info, "ORDERS_CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "orders.csv"
+    path.write_text(CSV, encoding="utf-8")
+
+    parsed = extract_all_customer_orders(str(path))
+    assert _cache_path(str(path)).endswith(".npz") and os.path.exists(_cache_path(str(path)))
+    assert extract_all_customer_orders(str(path)) == parsed == extract_all_customer_orders(str(path), use_cache=False)
+    assert parsed == [
+        {"order_id": "1-1", "name": "Jenna Saines", "address": "nan",
+         "items": [{"product": "Socks", "sku": "IF_A", "quantity": 2}]},
+        {"order_id": "2-2", "name": "Nick Cansfield", "address": "Leeds",
+         "items": [{"product": "Scarf", "sku": "IF_B", "quantity": 1}, {"product": "Hat", "sku": "IF_C", "quantity": 3}]},
+    ]
+
+
+def test_changed_export_is_parsed_again(monkeypatch, tmp_path):
+    monkeypatch.setattr(extract_customer_info, "ORDERS_CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "orders.csv"
+    path.write_text(CSV, encoding="utf-8")
+    extract_all_customer_orders(str(path))
+
+    path.write_text(CSV.replace('"IF_A","2"', '"IF_A","5"'), encoding="utf-8")
+    # Same size, so make sure the mtime moves even within one tick
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    orders = extract_all_customer_orders(str(path))
+    assert orders[0]["items"][0]["quantity"] == 5
@@ -0,0 +1,63 @@
+import numpy as np
+
+import src.frame_gate as frame_gate
+from src.frame_gate import ChangeGate, RoiDecoder
+
+
+def test_static_scene_is_still_decoded_every_refresh_interval():
+    gate = ChangeGate(hold_seconds=1.0, refresh_seconds=2.0)
+    frame = np.full((60, 80, 3), 128, np.uint8)
+    decoded = [t for t in np.arange(0.0, 10.0, 0.1).round(1) if gate.should_decode(frame, now=t)]
+
+    # Open for the first second after the first frame, then one forced decode every two seconds
+    assert [t for t in decoded if t > 1.0] == [3.0, 5.0, 7.0, 9.0]
+    assert gate.skipped == 100 - len(decoded)
+
+
+def test_change_reopens_the_gate():
+    gate = ChangeGate(hold_seconds=1.0, refresh_seconds=60.0)
+    dark, light = np.zeros((60, 80), np.uint8), np.full((60, 80), 255, np.uint8)
+    gate.should_decode(dark, now=0.0)
+    assert not gate.should_decode(dark, now=5.0)
+    assert gate.should_decode(light, now=5.1)
+
+
+class _CascadeDetector:
+    def __init__(self):
+        self.calls = []
+
+    def detectAndDecode(self, img):
+        self.calls.append(("full", img.shape[:2]))
+        return [], []
+
+    def detectAndDecodeFast(self, img):
+        self.calls.append(("fast", img.shape[:2]))
+        return [], []
+
+
+def test_crops_use_fast_backends_and_full_frame_the_whole_cascade(monkeypatch):
+    monkeypatch.setattr(frame_gate, "locate_qr_candidates", lambda frame, max_candidates: [(0, 0, 40, 40)] * 3)
+    detector = _CascadeDetector()
+    decoder = RoiDecoder(detector, full_frame_every=2)
+    frame = np.zeros((480, 640, 3), np.uint8)
+    decoder.decode(frame)
+    decoder.decode(frame)
+    assert detector.calls == [("fast", (40, 40))] * 6 + [("full", (480, 640))]
+
+
+class _FoundDetector(_CascadeDetector):
+    def detectAndDecode(self, img):
+        super().detectAndDecode(img)
+        return ["IF_A"], [np.array([[100, 100], [140, 100], [140, 140], [100, 140]], np.float32)]
+
+
+def test_region_found_by_one_worker_is_tried_first_by_the_next(monkeypatch):
+    monkeypatch.setattr(frame_gate, "locate_qr_candidates", lambda frame, max_candidates: [])
+    decoder = RoiDecoder(full_frame_every=1)
+    frame = np.zeros((480, 640, 3), np.uint8)
+    assert decoder.decode(frame, _FoundDetector())[0] == ["IF_A"]
+
+    other = _CascadeDetector()
+    decoder.decode(frame, other)
+    assert other.calls[0] == ("fast", (80, 80))
+    assert decoder.last_roi is None
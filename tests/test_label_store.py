@@ -0,0 +1,75 @@
+import os
+
+import src.label_store as label_store
+from benchmarks.synthetic import write_label_pdf
+from src.label_store import LabelStore, file_sha1 as real_sha1
+
+ORDERS = [("1-1", "Jenna", "Saines", ["1 Baker Street", "London"]),
+          ("2-2", "Nick", "Cansfield", ["2 Mill Lane", "Leeds"])]
+LATE = [("3-3", "Adelle", "French", ["3 High Street", "Bristol"])]
+
+
+def test_changed_pdf_keeps_other_page_numbers(tmp_path):
+    first, second = str(tmp_path / "first.pdf"), str(tmp_path / "second.pdf")
+    write_label_pdf(first, ORDERS)
+    write_label_pdf(second, LATE)
+    store = LabelStore(pdf_path=None, cache_dir=str(tmp_path / "cache"))
+    store.add_pdf(first)
+    store.add_pdf(second)
+    held = store.find_page(order_id="3-3")
+    old_jenna = store.find_page(order_id="1-1")
+
+    # The first batch is re-exported with one more label
+    write_label_pdf(first, ORDERS + [("4-4", "Rachel", "Faulkner", ["4 Park Avenue", "Hull"])])
+    os.utime(first, (0, os.stat(first).st_mtime + 1))
+    assert store.add_pdf(first)
+
+    assert store.find_page(order_id="3-3") == held
+    assert "page_00001" in store.page_path(held)
+    assert store.page_path(old_jenna) is None
+    new_jenna = store.find_page(customer_name="Jenna Saines")
+    assert new_jenna > held and store.page_path(new_jenna)
+    assert store.find_page(order_id="4-4") == new_jenna + 2
+
+    reloaded = LabelStore(pdf_path=None, cache_dir=str(tmp_path / "cache"))
+    assert reloaded.find_page(order_id="3-3") == held
+    assert reloaded.find_page(order_id="1-1") == new_jenna
+
+
+def test_retired_pages_are_deleted(tmp_path):
+    first = str(tmp_path / "first.pdf")
+    write_label_pdf(first, ORDERS)
+    store = LabelStore(pdf_path=None, cache_dir=str(tmp_path / "cache"))
+    store.add_pdf(first)
+    old_paths = [store.page_path(page) for page in (1, 2)]
+    old_dir = os.path.dirname(old_paths[0])
+
+    write_label_pdf(first, ORDERS + LATE)
+    os.utime(first, (0, os.stat(first).st_mtime + 1))
+    assert store.add_pdf(first)
+    assert not any(os.path.exists(path) for path in old_paths)
+    assert not os.path.exists(old_dir)
+    assert os.path.exists(store.page_path(store.find_page(order_id="1-1")))
+
+
+def test_same_batch_under_another_path_is_hashed_once(tmp_path, monkeypatch):
+    first, copy = str(tmp_path / "first.pdf"), str(tmp_path / "copy.pdf")
+    write_label_pdf(first, ORDERS)
+    with open(first, "rb") as src, open(copy, "wb") as dst:
+        dst.write(src.read())
+    store = LabelStore(pdf_path=None, cache_dir=str(tmp_path / "cache"))
+    store.add_pdf(first)
+
+    hashed = []
+    monkeypatch.setattr(label_store, "file_sha1", lambda path: hashed.append(path) or real_sha1(path))
+    assert not store.add_pdf(copy)
+    assert not store.add_pdf(copy)
+    assert not LabelStore(pdf_path=None, cache_dir=str(tmp_path / "cache")).add_pdf(copy)
+    assert hashed == [copy]
+    assert store.page_count() == 2
+
+    # New content at the alias path is indexed as its own batch
+    write_label_pdf(copy, LATE)
+    os.utime(copy, (0, os.stat(copy).st_mtime + 1))
+    assert store.add_pdf(copy)
+    assert store.find_page(order_id="3-3") == 3
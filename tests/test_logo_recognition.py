@@ -0,0 +1,111 @@
+import os
+import time
+import queue
+import random
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from src.logo_recognition import LogoIndex, LOGO_DIR, _load_gray
+from src.scan_pipeline import DecodeWorker
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    return LogoIndex(index_dir=str(tmp_path_factory.mktemp("logo_index")))
+
+
+def _camera_frame(name, seed, size=(640, 480), fraction=0.6):
+    """The logo on a gray background, scaled, rotated and slightly blurred and noisy like a webcam frame."""
+    rng = random.Random(seed)
+    logo = cv2.cvtColor(_load_gray(os.path.join(LOGO_DIR, f"{name}.png")), cv2.COLOR_GRAY2BGR)
+    width, height = size
+    scale = fraction * height / max(logo.shape[:2])
+    logo = cv2.resize(logo, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    h, w = logo.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), rng.uniform(-15, 15), 1.0)
+    logo = cv2.warpAffine(logo, matrix, (w, h), borderValue=(255, 255, 255))
+    frame = np.full((height, width, 3), rng.randint(80, 180), np.uint8)
+    y, x = rng.randint(0, height - h), rng.randint(0, width - w)
+    frame[y:y + h, x:x + w] = logo
+    frame = cv2.GaussianBlur(frame, (0, 0), 0.8)
+    noise = np.random.default_rng(seed).normal(0, 5, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize("name", ["greece", "hungary", "cat", "spain"])
+def test_recognizes_logo_in_camera_frame(index, name):
+    assert index.recognize(_camera_frame(name, seed=1))[0] == name
+
+
+def test_transparent_query_is_flattened_like_references(index):
+    greece = cv2.imread(os.path.join(LOGO_DIR, "greece.png"), cv2.IMREAD_UNCHANGED)
+    assert greece.shape[2] == 4
+    assert index.recognize(greece)[0] == "greece"
+
+
+def test_blank_frame_is_not_recognized(index):
+    frame = np.full((480, 640, 3), 128, np.uint8)
+    cv2.putText(frame, "BOX 12345", (50, 200), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 4)
+    assert index.recognize(frame) == (None, 0.0)
+
+
+class _Camera:
+    index = 0
+    roi = None
+
+    def should_decode(self, frame):
+        return True
+
+    def count_decode(self):
+        pass
+
+    def fallback_due(self, interval):
+        return True
+
+
+class _Board:
+    def take(self, timeout=0.5):
+        time.sleep(0.01)
+        return _Camera(), np.zeros((48, 64, 3), np.uint8)
+
+
+class _NoQr:
+    def detectAndDecode(self, frame):
+        return [], None
+
+
+def test_logo_fallback_posts_suggestions_not_scans():
+    results, suggestions, stop = queue.Queue(), queue.Queue(), threading.Event()
+    worker = DecodeWorker(_Board(), results, stop, _NoQr, fallback=lambda frame: "IF_LOGO",
+                          fallback_interval=0, suggestions=suggestions)
+    worker.start()
+    time.sleep(0.1)
+    stop.set()
+    worker.join(timeout=1)
+    assert results.empty()
+    assert suggestions.get_nowait()[2] == "IF_LOGO"
+
+
+def test_logo_fallback_is_throttled_per_camera_across_workers():
+    from src.scan_pipeline import FrameBoard
+
+    board = FrameBoard([0], gating=False, roi=False)
+    camera = board.cameras[0]
+    results, suggestions, stop = queue.Queue(), queue.Queue(), threading.Event()
+    calls = []
+    workers = [DecodeWorker(board, results, stop, _NoQr, index=i, fallback_interval=10,
+                            fallback=lambda frame: calls.append(frame) and None, suggestions=suggestions)
+               for i in range(4)]
+    for worker in workers:
+        worker.start()
+    for _ in range(20):
+        camera.slot.put(np.zeros((48, 64, 3), np.uint8))
+        time.sleep(0.01)
+    stop.set()
+    for worker in workers:
+        worker.join(timeout=1)
+    assert sum(worker.decodes for worker in workers) > 1
+    assert len(calls) == 1
@@ -0,0 +1,47 @@
+import os
+
+import src.match_product as match_product
+from src.match_product import ProductCatalog, get_product_catalog
+
+CSV = ("listing name,image location ,,SKU code\n"
+       "monaco socks pack of 3 black adult,products\\images\\Monaco.png,,PO3S45698\n"
+       "Netherlands Socks Pack Of 3,products\\images\\netherlands.png,,PO3S45699\n"
+       "north macedonia socks pack of 3 black adult,products\\images\\North Macedonia.png,,PO3S45700\n")
+
+
+def _catalog(monkeypatch, tmp_path, text=CSV):
+    monkeypatch.setattr(match_product, "CATALOG_CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "products.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_exact_substring_and_prefix_lookups(monkeypatch, tmp_path):
+    catalog = ProductCatalog(_catalog(monkeypatch, tmp_path))
+    assert catalog.by_sku_code(" po3s45699 ")["name"] == "Netherlands Socks Pack Of 3"
+    assert catalog.by_image_name("north macedonia")["sku"] == "PO3S45700"
+    assert [r["sku"] for r in catalog.search_image("Mace")] == ["PO3S45700"]
+    assert catalog.search_image("mace") == []
+    assert [r["sku"] for r in catalog.search_name("PACK OF 3 BLACK")] == ["PO3S45698", "PO3S45700"]
+    assert [r["sku"] for r in catalog.search_name("ma")] == ["PO3S45700"]
+    assert [r["sku"] for r in catalog.prefix_image("n")] == ["PO3S45699", "PO3S45700"]
+    assert [r["sku"] for r in catalog.prefix_name("north")] == ["PO3S45700"]
+
+
+def test_match_many_resolves_logos_and_sku_codes(monkeypatch, tmp_path):
+    catalog = ProductCatalog(_catalog(monkeypatch, tmp_path))
+    results = catalog.match_many(["Monaco", "PO3S45699", "Macedonia", "crown", "Monaco"])
+    assert {name: record and record["sku"] for name, record in results.items()} == {
+        "Monaco": "PO3S45698", "PO3S45699": "PO3S45699", "Macedonia": "PO3S45700", "crown": None}
+
+
+def test_cache_is_columns_and_follows_catalog_changes(monkeypatch, tmp_path):
+    path = _catalog(monkeypatch, tmp_path)
+    first = ProductCatalog(path)
+    assert first._cache_path().endswith(".npz") and os.path.exists(first._cache_path())
+    assert ProductCatalog(path).records == first.records == ProductCatalog(path, use_cache=False).records
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("spain socks,products\\images\\spain.png,,PO3S45701\n")
+    assert ProductCatalog(path).by_sku_code("PO3S45701")["image_key"] == "spain"
+    assert get_product_catalog(path).by_image_name("spain")["sku"] == "PO3S45701"
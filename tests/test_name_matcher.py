@@ -0,0 +1,56 @@
+import pytest
+
+from src.name_matcher import NameMatcher, resolve_missing_skus
+
+COUNTRIES = ["monaco", "netherlands", "norway", "albania", "greece", "spain", "united kingdom",
+             "north macedonia", "bosnia and herzegovina", "sweden", "serbia", "austria"]
+CATALOG = [{"sku": f"PO3S{45700 + i}", "name": f"{country} socks pack of 3 black adult"}
+           for i, country in enumerate(COUNTRIES)]
+SKU = {record["name"].split(" socks")[0]: record["sku"] for record in CATALOG}
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return NameMatcher(CATALOG)
+
+
+@pytest.mark.parametrize("name", [
+    "Norway Bumbag Money Belt",
+    "Netherlands Football Scarf",
+    "Monaco Grand Prix Beanie Hat",
+    "Colchester United Beanie Hat Football",
+])
+def test_shared_rare_word_alone_does_not_match(matcher, name):
+    record, _ = matcher.match(name)
+    assert record is None
+
+
+@pytest.mark.parametrize("name, country", [
+    ("Albania pack of 3 socks black new", "albania"),
+    ("Norway socks", "norway"),
+    ("United Kingdom Socks", "united kingdom"),
+    ("Greece Football Socks Pack Of 3 Black Gift", "greece"),
+])
+def test_same_product_matches(matcher, name, country):
+    record, score = matcher.match(name)
+    assert record is not None and record["sku"] == SKU[country]
+    assert score >= matcher.threshold
+
+
+def test_unknown_words_lower_the_score(matcher):
+    _, short = matcher.match("Norway socks")
+    _, padded = matcher.match("Norway socks zzkq wqpv xxrt")
+    assert padded < short
+
+
+def test_resolve_missing_skus_leaves_unmatched_lines_alone(matcher):
+    orders = [{"name": "A B", "items": [
+        {"product": "Norway Bumbag Money Belt", "sku": "nan", "quantity": 1},
+        {"product": "Sweden socks pack of 3", "sku": "", "quantity": 1},
+        {"product": "Spain socks", "sku": "IF_1234", "quantity": 1},
+    ]}]
+    assert resolve_missing_skus(orders, matcher) == 1
+    items = orders[0]["items"]
+    assert items[0]["sku"] == "nan" and "sku_source" not in items[0]
+    assert items[1]["sku"] == SKU["sweden"] and items[1]["sku_source"] == "matched"
+    assert items[2]["sku"] == "IF_1234"
@@ -0,0 +1,111 @@
+from src.order_manager import OrderManager
+
+
+def _orders():
+    return [
+        {"order_id": "1-1", "name": "Jenna Saines", "items": [{"sku": "IF_A", "product": "Socks", "quantity": 2}]},
+        {"order_id": "2-2", "name": "Nick Cansfield", "items": [{"sku": "IF_A", "product": "Socks", "quantity": 1},
+                                                                {"sku": "IF_B", "product": "Scarf", "quantity": 1}]},
+    ]
+
+
+def test_scan_fills_the_oldest_open_line_first():
+    manager = OrderManager(_orders())
+    assert manager.apply_scan("if_a") == ([0], [])
+    assert manager.apply_scan(" IF_A ") == ([0], [0])
+    assert manager.apply_scan("IF_A") == ([1], [])
+    assert manager.apply_scan("IF_A") == ([], [])
+    assert manager.remaining("IF_A") == 0
+    assert manager.pending() == {"IF_B": 1}
+
+
+def test_broadcast_scan_counts_against_every_open_order():
+    manager = OrderManager(_orders(), broadcast=True)
+    assert manager.apply_scan("IF_A") == ([0, 1], [])
+    assert manager.last_scan_lines == [(0, 0), (1, 0)]
+    assert manager.apply_scan("IF_A") == ([0], [0])
+    assert manager.apply_scan("IF_B") == ([1], [1])
+    assert manager.is_order_complete()
+
+
+def test_summary_counts_products_labels_and_orders():
+    manager = OrderManager(_orders())
+    manager.apply_scan("IF_A")
+    manager.apply_scan("IF_A")
+    manager.mark_printed(0)
+    assert manager.summary() == {"scanned_products": 1, "total_products": 3, "scanned_labels": 2, "total_labels": 4,
+                                 "printed_orders": 1, "total_orders": 2, "fully_scanned_orders": 1}
+
+
+def test_set_scanned_only_raises_the_count_up_to_the_quantity():
+    manager = OrderManager(_orders())
+    assert manager.set_scanned("1-1", 0, 5) == 0
+    assert manager.scanned(0, 0) == 2 and manager.is_fully_scanned(0)
+    assert manager.set_scanned("1-1", 0, 1) == 0
+    assert manager.scanned(0, 0) == 2
+    assert manager.set_scanned("9-9", 0, 1) is None
+    assert manager.set_scanned("1-1", 3, 1) is None
+
+
+def test_reset_forgets_scans_and_prints_and_reopens_lines():
+    manager = OrderManager(_orders())
+    for sku in ("IF_A", "IF_A", "IF_A", "IF_B"):
+        manager.apply_scan(sku)
+    manager.mark_printed(1)
+    manager.reset()
+    assert manager.summary()["scanned_labels"] == 0 and manager.summary()["fully_scanned_orders"] == 0
+    assert not manager.is_printed(1)
+    assert manager.apply_scan("IF_A") == ([0], [])
+
+
+def test_scan_state_round_trips_through_load_state():
+    manager = OrderManager(_orders())
+    for sku in ("IF_A", "IF_A", "IF_B"):
+        manager.apply_scan(sku)
+    manager.mark_printed(0)
+    state = manager.scan_state()
+    assert state == {"lines": [["1-1", 0, 2], ["2-2", 1, 1]], "printed": ["1-1"]}
+
+    restored = OrderManager(_orders())
+    restored.load_state(state)
+    assert restored.scan_state() == state
+    assert restored.summary() == manager.summary()
+    # The FIFO skips the lines the snapshot already filled
+    assert restored.apply_scan("IF_A") == ([1], [1])
+
+
+def test_printed_is_tracked_per_order_key():
+    manager = OrderManager(_orders())
+    manager.mark_printed(1)
+    assert manager.is_printed(1) and not manager.is_printed(0)
+    manager.mark_printed(1, False)
+    assert not manager.is_printed(1)
+    assert manager.restore_printed("2-2")
+    assert manager.is_printed(1)
+    assert not manager.restore_printed("9-9")
+    assert manager.summary()["printed_orders"] == 1
+
+
+def test_rows_repeating_a_line_are_one_line():
+    orders = [{"order_id": "1-1", "name": "Jenna Saines", "items": [
+        {"sku": "IF_A", "product": "Socks", "quantity": 1},
+        {"sku": "IF_B", "product": "Scarf", "quantity": 1},
+        {"sku": "IF_A", "product": "Socks", "quantity": 2},
+    ]}]
+    manager = OrderManager(orders)
+    assert manager.orders[0]["items"] == [{"sku": "IF_A", "product": "Socks", "quantity": 3},
+                                          {"sku": "IF_B", "product": "Scarf", "quantity": 1}]
+    assert manager.summary()["total_products"] == 2 and manager.summary()["total_labels"] == 4
+
+    appended = [{"order_id": "1-1", "name": "Jenna Saines", "items": [{"sku": "IF_A", "product": "Socks", "quantity": 1}]}]
+    assert manager.merge_orders(appended, appended=True) == ([0], [])
+    assert manager.orders[0]["items"][0]["quantity"] == 4
+
+    # A full export with the repeated rows again sets the summed quantity
+    rewritten = [{"order_id": "1-1", "name": "Jenna Saines", "items": [
+        {"sku": "IF_A", "product": "Socks", "quantity": 1},
+        {"sku": "IF_A", "product": "Socks", "quantity": 1},
+    ]}]
+    manager.merge_orders(rewritten)
+    assert manager.orders[0]["items"][0]["quantity"] == 2
+    assert manager.summary()["total_labels"] == 3
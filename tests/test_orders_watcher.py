@@ -0,0 +1,88 @@
+import os
+import csv
+import io
+
+from src.order_manager import OrderManager
+from src.orders_watcher import OrdersWatcher
+
+HEADER = ["Order ID", "First name", "Last name", "Lineitem name", "Lineitem SKU", "Lineitem quantity"]
+
+
+def _rows(*rows):
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _watch(tmp_path, *rows):
+    path = tmp_path / "orders.csv"
+    path.write_bytes(_rows(HEADER, *rows))
+    watcher = OrdersWatcher([str(path)])
+    watcher.prime(str(path))
+    return path, watcher
+
+
+def _append(path, data):
+    with open(path, "ab") as f:
+        f.write(data)
+    # Make sure the change is seen even within one mtime tick
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+
+
+def test_appended_rows_add_to_the_line_they_repeat(tmp_path):
+    path, watcher = _watch(tmp_path, ["1-1", "Jenna", "Saines", "Socks", "IF_A", "1"])
+    manager = OrderManager([{"order_id": "1-1", "name": "Jenna Saines",
+                             "items": [{"sku": "IF_A", "product": "Socks", "quantity": 1}]}])
+    _append(path, _rows(["1-1", "Jenna", "Saines", "Socks", "IF_A", "1"],
+                        ["1-1", "Jenna", "Saines", "Socks", "IF_A", "2"]))
+
+    [(orders, appended)] = watcher.poll()
+    assert appended
+    changed, added = manager.merge_orders(orders, appended)
+    assert (changed, added) == ([0], [])
+    assert manager.orders[0]["items"] == [{"sku": "IF_A", "product": "Socks", "quantity": 4}]
+    assert manager.summary()["total_labels"] == 4
+
+
+def test_record_with_quoted_line_break_waits_until_complete(tmp_path):
+    path, watcher = _watch(tmp_path, ["1-1", "Jenna", "Saines", "Socks", "IF_A", "1"])
+    row = _rows(["2-2", "Nick", "Cansfield", "Scarf\nBlue", "IF_B", "1"])
+    cut = row.index(b"\n") + 1
+
+    _append(path, row[:cut])
+    assert watcher.poll() == []
+
+    _append(path, row[cut:])
+    [(orders, appended)] = watcher.poll()
+    assert appended
+    assert [(order["order_id"], order["items"][0]["product"]) for order in orders] == [("2-2", "Scarf\nBlue")]
+
+
+def test_rewritten_export_replaces_quantities(tmp_path):
+    path, watcher = _watch(tmp_path, ["1-1", "Jenna", "Saines", "Socks", "IF_A", "1"])
+    manager = OrderManager([{"order_id": "1-1", "name": "Jenna Saines",
+                             "items": [{"sku": "IF_A", "product": "Socks", "quantity": 1}]}])
+    path.write_bytes(_rows(HEADER, ["1-1", "Jenna", "Saines", "Socks", "IF_A", "3"]))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+
+    [(orders, appended)] = watcher.poll()
+    assert not appended
+    manager.merge_orders(orders, appended)
+    assert manager.orders[0]["items"][0]["quantity"] == 3
+
+
+def test_last_record_without_line_break_is_primed_once(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_bytes(_rows(HEADER, ["1-1", "Jenna", "Saines", "Socks", "IF_A", "2"]).rstrip(b"\n"))
+    watcher = OrdersWatcher([str(path)])
+    watcher.prime(str(path))
+    manager = OrderManager([{"order_id": "1-1", "name": "Jenna Saines",
+                             "items": [{"sku": "IF_A", "product": "Socks", "quantity": 2}]}])
+    assert watcher.files[str(path)].offset == os.path.getsize(path)
+
+    _append(path, b"\n" + _rows(["2-2", "Nick", "Cansfield", "Scarf", "IF_B", "1"]))
+    [(orders, appended)] = watcher.poll()
+    assert appended and [order["order_id"] for order in orders] == ["2-2"]
+    manager.merge_orders(orders, appended)
+    assert manager.orders[0]["items"][0]["quantity"] == 2
+    assert manager.summary()["total_labels"] == 3
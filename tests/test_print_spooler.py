@@ -0,0 +1,80 @@
+import os
+import time
+
+from PyPDF2 import PdfReader, PdfWriter
+
+from utils.print_spooler import PrintSpooler, SpoolDirBackend, TempFileJanitor
+
+
+def _label(path):
+    writer = PdfWriter()
+    writer.add_blank_page(width=288, height=432)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+
+class RecordingBackend:
+    name = "recording"
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def print_file(self, filepath, printer_name=None, copies=1):
+        if self.fail:
+            raise OSError("printer offline")
+        self.calls.append((len(PdfReader(filepath).pages), printer_name, copies))
+
+
+def _wait_for_events(spooler, count, timeout=5.0):
+    events = []
+    deadline = time.monotonic() + timeout
+    while len(events) < count and time.monotonic() < deadline:
+        events += spooler.drain_events()
+        time.sleep(0.01)
+    return events
+
+
+def test_spool_dir_backend_writes_one_file_per_copy(tmp_path):
+    backend = SpoolDirBackend(str(tmp_path / "spool"))
+    backend.print_file(_label(tmp_path / "label.pdf"), "Zebra", copies=2)
+    files = sorted(os.listdir(tmp_path / "spool"))
+    assert len(files) == 2 and all(name.endswith("_Zebra.pdf") for name in files)
+
+
+def test_jobs_coalesce_per_destination_in_submission_order(tmp_path):
+    backend = RecordingBackend()
+    spooler = PrintSpooler(backend, coalesce_window=0.3, cleanup_delay=0, janitor=TempFileJanitor())
+    label = _label(tmp_path / "label.pdf")
+    ids = [spooler.submit([label], tag="a1"), spooler.submit([label], tag="a2"),
+           spooler.submit([label], printer_name="Side", tag="b"), spooler.submit([label], tag="a3")]
+
+    events = _wait_for_events(spooler, 4)
+    assert [event[0] for event in events] == ids
+    assert all(ok for _, _, ok, _ in events)
+    assert backend.calls == [(2, None, 1), (1, "Side", 1), (1, None, 1)]
+
+
+def test_failed_print_is_reported_for_every_job(tmp_path):
+    spooler = PrintSpooler(RecordingBackend(fail=True), coalesce_window=0.1, cleanup_delay=0, janitor=TempFileJanitor())
+    label = _label(tmp_path / "label.pdf")
+    spooler.submit([label], tag="1-1")
+    spooler.submit([label], tag="2-2")
+    events = _wait_for_events(spooler, 2)
+    assert [(tag, ok, message) for _, tag, ok, message in events] == [("1-1", False, "printer offline"),
+                                                                      ("2-2", False, "printer offline")]
+
+
+def test_janitor_deletes_files_when_due(tmp_path):
+    janitor = TempFileJanitor()
+    soon, later = tmp_path / "soon.pdf", tmp_path / "later.pdf"
+    soon.write_bytes(b"x")
+    later.write_bytes(b"x")
+    janitor.schedule(str(later), delay=60)
+    janitor.schedule(str(soon), delay=0.05)
+    deadline = time.monotonic() + 2
+    while soon.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not soon.exists() and later.exists()
+    assert janitor.pending() == 1
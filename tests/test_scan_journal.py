@@ -0,0 +1,48 @@
+from src.order_manager import OrderManager
+from src.scan_journal import ScanJournal
+
+
+def _orders(*order_ids):
+    return [{"order_id": order_id, "name": "Jenna Saines", "items": [{"sku": "IF_A", "product": "Socks", "quantity": 1}]}
+            for order_id in order_ids]
+
+
+def _journal(tmp_path, orders):
+    manager = OrderManager(orders)
+    journal = ScanJournal(manager, journal_dir=str(tmp_path / "journal"), scan_log_path=str(tmp_path / "log.csv"),
+                          commit_interval=0)
+    journal.replay()
+    journal.start()
+    return manager, journal
+
+
+def test_print_is_keyed_by_order_not_customer(tmp_path):
+    manager, journal = _journal(tmp_path, _orders("1-1"))
+    manager.apply_scan("IF_A")
+    journal.record_scan("IF_A")
+    manager.mark_printed(0)
+    journal.record_print(0)
+    journal.close()
+
+    # The same customer comes back with a new order in the next export
+    manager, journal = _journal(tmp_path, _orders("1-1", "2-2"))
+    journal.close()
+    assert manager.is_printed(0)
+    assert not manager.is_printed(1)
+    assert manager.summary()["printed_orders"] == 1
+
+
+def test_clear_starts_the_journal_over(tmp_path):
+    manager, journal = _journal(tmp_path, _orders("1-1"))
+    manager.apply_scan("IF_A")
+    journal.record_scan("IF_A")
+    manager.mark_printed(0)
+    journal.record_print(0)
+    journal.clear()
+    assert manager.scanned_labels == 0 and not manager.is_printed(0)
+    journal.close()
+
+    manager, journal = _journal(tmp_path, _orders("1-1"))
+    journal.close()
+    assert manager.scanned_labels == 0
+    assert not manager.is_printed(0)
@@ -0,0 +1,19 @@
+import numpy as np
+
+from src.scan_pipeline import ScanPipeline
+
+
+def test_mosaic_is_recomposed_only_for_new_frames():
+    pipeline = ScanPipeline(lambda: None, sources=[0, 1], decode_workers=1)
+    tile_w, tile_h = pipeline.tile_size
+    first, second = pipeline.cameras
+    first.slot.put(None, np.full((tile_h, tile_w, 3), 10, np.uint8))
+
+    seq, mosaic = pipeline.latest_preview()
+    assert seq == 1 and mosaic[0, 0, 0] == 10
+    assert pipeline.latest_preview()[1] is mosaic
+
+    second.slot.put(None, np.full((tile_h, tile_w, 3), 20, np.uint8))
+    seq, updated = pipeline.latest_preview()
+    assert seq == 2 and updated is not mosaic
+    assert updated[0, 0, 0] == 10 and updated[0, tile_w, 0] == 20
@@ -0,0 +1,107 @@
+import json
+import asyncio
+import threading
+
+import pytest
+
+import src.scan_service as scan_service
+from src.order_manager import OrderManager
+from src.scan_service import ScanService
+
+
+class FakeSpooler:
+    def __init__(self):
+        self.events = []
+
+    def drain_events(self):
+        events, self.events = self.events, []
+        return events
+
+
+def fake_fetch(name, order_id=None):
+    # Finds a label only off the loop thread, so a lookup that blocks the loop fails the test
+    return 7 if threading.current_thread() is not threading.main_thread() else None
+
+
+@pytest.fixture
+def service(monkeypatch):
+    spooler = FakeSpooler()
+    queued = []
+    monkeypatch.setattr(scan_service, "fetch_shipping_label", fake_fetch)
+    monkeypatch.setattr(scan_service, "extract_and_print_pdf_page",
+                        lambda page_number, copies=1, tag=None: queued.append(tag) or len(queued))
+    monkeypatch.setattr(scan_service, "get_print_spooler", lambda: spooler)
+    monkeypatch.setattr(scan_service, "POLL_SECONDS", 0.01)
+    orders = [{"order_id": "1-1", "name": "Jenna Saines", "items": [{"sku": "IF_A", "product": "Socks", "quantity": 1}]}]
+    service = ScanService(OrderManager(orders))
+    service.spooler, service.queued = spooler, queued
+    return service
+
+
+async def _exchange(port, raw):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    status = await reader.readline()
+    writer.close()
+    return int(status.split()[1])
+
+
+def _post(path, payload):
+    body = json.dumps(payload).encode()
+    return b"POST %s HTTP/1.1\r\nContent-Length: %d\r\nConnection: close\r\n\r\n%s" % (path.encode(), len(body), body)
+
+
+def test_bad_requests_get_an_error_status(service, monkeypatch):
+    async def run():
+        server = await asyncio.start_server(service._handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        malformed = await _exchange(port, b"GARBAGE\r\n\r\n")
+
+        async def broken_scan(sku, station=""):
+            raise RuntimeError("boom")
+        monkeypatch.setattr(service, "scan", broken_scan)
+        failed = await _exchange(port, _post("/scan", {"sku": "IF_A"}))
+        server.close()
+        return malformed, failed
+
+    assert asyncio.run(run()) == (400, 500)
+
+
+def test_failed_print_releases_the_claim_and_manual_print_reprints(service):
+    async def run():
+        result = await service.scan("IF_A")
+        assert result["complete"] == ["1-1"] and service.queued == ["1-1"]
+        assert service.manager.is_printed(0)
+        assert (await service.print_label("1-1"))["ok"] is False
+
+        service.spooler.events.append((1, "1-1", False, "jammed"))
+        poller = asyncio.ensure_future(service._poll_background())
+        await asyncio.sleep(0.05)
+        poller.cancel()
+        assert not service.manager.is_printed(0)
+        assert service.history[-1]["type"] == "print_result" and not service.history[-1]["ok"]
+
+        service.manager.mark_printed(0)
+        assert (await service.print_label("1-1", force=True))["ok"] is True
+        assert service.queued == ["1-1", "1-1"]
+
+    asyncio.run(run())
+
+
+def test_failed_forced_reprint_keeps_the_order_printed(service):
+    async def run():
+        await service.scan("IF_A")
+        assert (await service.print_label("1-1", force=True))["ok"] is True
+        assert service.queued == ["1-1", "1-1"]
+
+        # The first job printed; the forced reprint (job 2) jammed
+        service.spooler.events.extend([(1, "1-1", True, "printed"), (2, "1-1", False, "jammed")])
+        poller = asyncio.ensure_future(service._poll_background())
+        await asyncio.sleep(0.05)
+        poller.cancel()
+        assert service.manager.is_printed(0)
+        assert not service.history[-1]["ok"] and not service.history[-1]["released"]
+        assert not service.claimed_jobs
+
+    asyncio.run(run())
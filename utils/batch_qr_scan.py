@@ -0,0 +1,182 @@
+"""
+Batch QR decoding for folders of scanned photos.
+
+    python -m utils.batch_qr_scan images/scanned_products -o scan_results.csv
+    python -m utils.batch_qr_scan --list photos.txt -o results.jsonl --workers 8 --resume
+
+Images are decoded across a process pool; each worker builds its QR decoder
+cascade (and loads the WeChat model) once. Results are streamed to CSV or
+JSONL as they finish (path, codes, bounding boxes, backend, timing), so an
+interrupted run can be resumed with --resume.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+import cv2
+import numpy as np
+from utils.qr_decoder import QRDecoder, DEFAULT_CASCADE, backend_available
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp"}
+FIELDS = ["path", "codes", "boxes", "backend", "ms", "error"]
+
+_worker_decoder = None
+
+
+def _init_worker(cascade):
+    global _worker_decoder
+    cv2.setNumThreads(1)
+    _worker_decoder = QRDecoder(cascade)
+
+
+def points_to_box(points):
+    pts = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+    x, y = pts.min(axis=0)
+    x1, y1 = pts.max(axis=0)
+    return [int(x), int(y), int(x1 - x), int(y1 - y)]
+
+
+def _decode_path(path):
+    start = time.perf_counter()
+    result = {"path": path, "codes": [], "boxes": [], "backend": "", "ms": 0.0, "error": ""}
+    img = cv2.imread(path)
+    if img is None:
+        result["error"] = "cannot load image"
+    else:
+        qr_codes, points, backend = _worker_decoder.decode(img)
+        result["codes"] = list(qr_codes)
+        result["boxes"] = [points_to_box(p) for p in points]
+        result["backend"] = backend or ""
+    result["ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def iter_images(inputs, list_file=None):
+    """Yield image paths from files, directories (recursively) and an optional list file."""
+    paths = list(inputs)
+    if list_file:
+        with open(list_file, "r", encoding="utf-8") as f:
+            paths.extend(line.strip() for line in f if line.strip())
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def _truncate_partial_line(output_path):
+    """Drop a trailing line left half-written by an interrupted run."""
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def load_done_paths(output_path, fmt):
+    if not os.path.exists(output_path):
+        return set()
+    _truncate_partial_line(output_path)
+    done = set()
+    with open(output_path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            if reader.fieldnames is not None and reader.fieldnames != FIELDS:
+                # Appending rows under another header would misalign every column
+                raise RuntimeError(f"❌ {output_path} has columns {','.join(reader.fieldnames)}, expected "
+                                   f"{','.join(FIELDS)}; cannot resume into it, write to a new output file")
+            for row in reader:
+                done.add(row["path"])
+        else:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["path"])
+                except (ValueError, KeyError):
+                    continue
+    return done
+
+
+class ResultWriter:
+    def __init__(self, output_path, fmt, append):
+        self.fmt = fmt
+        exists = append and os.path.exists(output_path) and os.path.getsize(output_path) > 0
+        self.file = open(output_path, "a" if append else "w", encoding="utf-8", newline="")
+        if fmt == "csv":
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+            if not exists:
+                self.writer.writeheader()
+
+    def write(self, result):
+        if self.fmt == "csv":
+            row = dict(result)
+            row["codes"] = "|".join(result["codes"])
+            row["boxes"] = json.dumps(result["boxes"])
+            self.writer.writerow(row)
+        else:
+            self.file.write(json.dumps(result) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def batch_scan(inputs, output_path, list_file=None, workers=None, fmt=None, resume=False, chunksize=4,
+               cascade=DEFAULT_CASCADE):
+    """Decode every image and stream results to output_path. Returns (decoded, with_codes, errors)."""
+    fmt = fmt or ("jsonl" if output_path.endswith((".jsonl", ".json")) else "csv")
+    cascade = [name for name in cascade if backend_available(name)]
+    if not cascade:
+        raise RuntimeError("❌ No QR decoder backend available.")
+
+    done = load_done_paths(output_path, fmt) if resume else set()
+    todo = [p for p in iter_images(inputs, list_file) if p not in done]
+    if done:
+        print(f"↩️ Resuming: {len(done)} already decoded, {len(todo)} to go")
+
+    writer = ResultWriter(output_path, fmt, append=resume)
+    decoded = with_codes = errors = 0
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    try:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(cascade,)) as pool:
+            for result in pool.imap_unordered(_decode_path, todo, chunksize=chunksize):
+                writer.write(result)
+                decoded += 1
+                with_codes += bool(result["codes"])
+                errors += bool(result["error"])
+                if decoded % 500 == 0:
+                    rate = decoded / (time.perf_counter() - start)
+                    print(f"… {decoded}/{len(todo)} images ({rate:.1f}/s)")
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Decoded {decoded} image(s) in {elapsed:.1f}s: {with_codes} with QR codes, {errors} error(s)")
+    return decoded, with_codes, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-decode QR codes in images.")
+    parser.add_argument("inputs", nargs="*", help="Image files or directories (searched recursively)")
+    parser.add_argument("--list", dest="list_file", help="Text file with one image path per line")
+    parser.add_argument("-o", "--output", default="qr_results.csv", help="Output .csv or .jsonl file")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Output format (default: from extension)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--resume", action="store_true", help="Skip images already in the output file")
+    parser.add_argument("--cascade", default=",".join(DEFAULT_CASCADE),
+                        help="Comma-separated decoder backends, cheapest first (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if not args.inputs and not args.list_file:
+        parser.error("give at least one input path or --list")
+    batch_scan(args.inputs, args.output, list_file=args.list_file, workers=args.workers,
+               fmt=args.format, resume=args.resume, cascade=args.cascade.split(","))
+
+
+if __name__ == "__main__":
+    main()
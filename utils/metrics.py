@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import threading
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Enabled with STATION_METRICS=1. Optional exports:
+#   STATION_METRICS_FILE=path   JSON snapshot rewritten every STATION_METRICS_INTERVAL seconds (default 10)
+#   STATION_METRICS_PORT=9108   Prometheus text format on http://127.0.0.1:<port>/metrics
+ENV_ENABLED = "STATION_METRICS"
+ENV_FILE = "STATION_METRICS_FILE"
+ENV_PORT = "STATION_METRICS_PORT"
+ENV_INTERVAL = "STATION_METRICS_INTERVAL"
+
+WINDOW = 1024
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class RollingHistogram:
+    """The last `window` observations (seconds) in a ring buffer, plus lifetime count and sum."""
+
+    def __init__(self, window=WINDOW):
+        self.values = array("d", bytes(8 * window))
+        self.window = window
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.values[self.count % self.window] = seconds
+        self.count += 1
+        self.total += seconds
+
+    def quantiles(self, qs=QUANTILES):
+        recent = sorted(self.values[:min(self.count, self.window)])
+        if not recent:
+            return {q: 0.0 for q in qs}
+        return {q: recent[min(int(q * len(recent)), len(recent) - 1)] for q in qs}
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    Named latency spans with rolling p50/p95/p99 and monotonically increasing counters.
+    Safe to use from any thread; exporters run on their own daemon threads.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._exporters = []
+
+    def span(self, name):
+        """Context manager timing the enclosed block into the `name` histogram."""
+        return _Span(self, name)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = RollingHistogram()
+            histogram.observe(seconds)
+
+    def inc(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        """{"spans": {name: {count, sum, p50, p95, p99}}, "counters": {name: value}} with times in ms."""
+        with self._lock:
+            spans = {}
+            for name, histogram in self.histograms.items():
+                quantiles = histogram.quantiles()
+                spans[name] = {"count": histogram.count, "sum_ms": histogram.total * 1000}
+                spans[name].update({f"p{int(q * 100)}_ms": v * 1000 for q, v in quantiles.items()})
+            return {"time": time.time(), "spans": spans, "counters": dict(self.counters)}
+
+    def overlay_text(self):
+        """Short multi-line summary for an on-screen overlay."""
+        snap = self.snapshot()
+        lines = [f"{name}: p50 {s['p50_ms']:.1f} / p95 {s['p95_ms']:.1f} / p99 {s['p99_ms']:.1f} ms"
+                 for name, s in sorted(snap["spans"].items())]
+        if snap["counters"]:
+            lines.append("  ".join(f"{name} {value}" for name, value in sorted(snap["counters"].items())))
+        return "\n".join(lines)
+
+    def prometheus_text(self):
+        snap = self.snapshot()
+        out = []
+        for name, s in sorted(snap["spans"].items()):
+            metric = "station_" + _metric_name(name) + "_seconds"
+            out.append(f"# TYPE {metric} summary")
+            for key, q in (("p50_ms", "0.5"), ("p95_ms", "0.95"), ("p99_ms", "0.99")):
+                out.append(f'{metric}{{quantile="{q}"}} {s[key] / 1000:.6f}')
+            out.append(f"{metric}_sum {s['sum_ms'] / 1000:.6f}")
+            out.append(f"{metric}_count {s['count']}")
+        for name, value in sorted(snap["counters"].items()):
+            metric = "station_" + _metric_name(name) + "_total"
+            out.append(f"# TYPE {metric} counter")
+            out.append(f"{metric} {value}")
+        return "\n".join(out) + "\n"
+
+    def write_file(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=1)
+        os.replace(tmp_path, path)
+
+    # === Exporters ===
+
+    def start_exporters(self, file_path=None, port=None, interval=None):
+        """Start the file writer and/or Prometheus endpoint (defaults come from the environment)."""
+        if self._exporters:
+            return
+        file_path = file_path or os.environ.get(ENV_FILE)
+        port = port or os.environ.get(ENV_PORT)
+        interval = interval or float(os.environ.get(ENV_INTERVAL, "10"))
+        if file_path:
+            thread = threading.Thread(target=self._file_loop, args=(file_path, interval),
+                                      daemon=True, name="metrics-file")
+            thread.start()
+            self._exporters.append(thread)
+        if port:
+            server = ThreadingHTTPServer(("127.0.0.1", int(port)), _handler_for(self))
+            thread = threading.Thread(target=server.serve_forever, daemon=True, name="metrics-http")
+            thread.start()
+            self._exporters.append(thread)
+            print(f"📈 Metrics on http://127.0.0.1:{port}/metrics")
+
+    def _file_loop(self, path, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.write_file(path)
+            except OSError as e:
+                print(f"⚠️ Could not write metrics file: {e}")
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullMetrics:
+    """Stand-in used when metrics are disabled: every call is a no-op."""
+
+    enabled = False
+
+    def span(self, name):
+        return _NULL_SPAN
+
+    def observe(self, name, seconds):
+        pass
+
+    def inc(self, name, n=1):
+        pass
+
+    def snapshot(self):
+        return {"time": time.time(), "spans": {}, "counters": {}}
+
+    def overlay_text(self):
+        return ""
+
+    def prometheus_text(self):
+        return ""
+
+    def start_exporters(self, file_path=None, port=None, interval=None):
+        pass
+
+
+def _metric_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name.lower())
+
+
+def _handler_for(metrics):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+_metrics = None
+
+
+def get_metrics():
+    """Process-wide metrics: a real Metrics if STATION_METRICS is set, else NullMetrics."""
+    global _metrics
+    if _metrics is None:
+        enabled = os.environ.get(ENV_ENABLED, "").strip().lower() not in ("", "0", "false", "no")
+        _metrics = Metrics() if enabled else NullMetrics()
+    return _metrics
@@ -1,92 +1,51 @@
-from PyPDF2 import PdfReader, PdfWriter
 import os
-import tempfile
-import win32print
-import win32api
-import threading
-import time
 import sys
-import os
+from src.label_store import get_label_store
+from utils.print_spooler import get_backend, get_print_spooler
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for PyInstaller or dev."""
     base_path = getattr(sys, '_MEIPASS', os.path.abspath("."))
     return os.path.join(base_path, relative_path)
 
-def extract_and_print_pdf_page(page_number, copies=1, printer_name=None):
+def extract_and_print_pdf_page(page_number, copies=1, printer_name=None, tag=None):
     """
-    Extract a specific page from shipping_labels.pdf and send it to printer.
+    Queue a specific page of the indexed shipping labels for printing.
+    Printing happens on the spooler's background thread; the outcome is posted
+    to the spooler's events queue.
     :param page_number: 1-based page number to extract.
     :param copies: Number of copies to print.
     :param printer_name: Specific printer name or None to use default.
+    :param tag: Optional value echoed back with the job's completion event.
+    :return: Spooler job id, or None if the page does not exist.
     """
-    try:
-        # Load shipping labels PDF
-        pdf_path = resource_path("data/shipping_labels.pdf")
-        reader = PdfReader(pdf_path)
-        writer = PdfWriter()
-
-        if page_number < 1 or page_number > len(reader.pages):
-            print("❌ Invalid page number!")
-            return
-
-        # Extract specified page
-        writer.add_page(reader.pages[page_number - 1])
+    page_path = get_label_store().page_path(page_number)
+    if page_path is None or not os.path.exists(page_path):
+        print("❌ Invalid page number!")
+        return None
 
-        # Save temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            temp_pdf_path = temp_file.name
-            writer.write(temp_file)
-
-        print(f"✅ Extracted label page: {temp_pdf_path}")
-
-        # Print file using system's default or specified printer
-        for _ in range(copies):
-            print_file(temp_pdf_path, printer_name)
-
-        # Auto-delete temporary file
-        delete_after_delay(temp_pdf_path, delay=60)
-
-    except Exception as e:
-        print(f"❌ Error extracting or printing label: {e}")
+    job_id = get_print_spooler().submit([page_path], copies=copies, printer_name=printer_name, tag=tag)
+    print(f"✅ Queued label page {page_number} (job {job_id})")
+    return job_id
 
 
 def print_file(filepath, printer_name=None):
     """
-    Send a PDF file directly to printer using Windows native print.
+    Send a PDF file directly to the printer with the platform's backend.
     :param filepath: Path to the PDF file.
     :param printer_name: Optional printer name (None for default printer).
     """
     try:
-        if printer_name:
-            win32print.SetDefaultPrinter(printer_name)
-
-        # Use default PDF viewer's silent print mode
-        win32api.ShellExecute(
-            0,
-            "print",
-            filepath,
-            None,
-            ".",
-            0
-        )
-
+        get_backend().print_file(filepath, printer_name)
         print(f"✅ Sent to printer: {filepath}")
-
     except Exception as e:
         print(f"❌ Printing failed: {e}")
 
 
 def delete_after_delay(filepath, delay=60):
     """
-    Deletes a file after a delay.
+    Deletes a file after a delay, using the spooler's shared janitor thread.
     :param filepath: Path to file to delete.
     :param delay: Seconds to wait before deleting.
     """
-    def delayed_delete():
-        time.sleep(delay)
-        if os.path.exists(filepath):
-            os.remove(filepath)
-            print(f"🗑️ Deleted temporary file: {filepath}")
-
-    threading.Thread(target=delayed_delete, daemon=True).start()
+    get_print_spooler().janitor.schedule(filepath, delay)
@@ -0,0 +1,230 @@
+from PyPDF2 import PdfReader, PdfWriter
+import heapq
+import itertools
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from utils.metrics import get_metrics
+
+
+# === Printer backends ===
+
+class WindowsBackend:
+    """Prints through the default PDF viewer's silent print verb (pywin32)."""
+    name = "windows"
+
+    def print_file(self, filepath, printer_name=None, copies=1):
+        import win32api
+        import win32print
+        if printer_name:
+            win32print.SetDefaultPrinter(printer_name)
+        for _ in range(copies):
+            win32api.ShellExecute(0, "print", filepath, None, ".", 0)
+
+
+class CupsBackend:
+    """Prints through CUPS with `lpr`."""
+    name = "cups"
+
+    def __init__(self, lpr="lpr"):
+        self.lpr = lpr
+
+    def print_file(self, filepath, printer_name=None, copies=1):
+        cmd = [self.lpr, "-#", str(copies)]
+        if printer_name:
+            cmd += ["-P", printer_name]
+        cmd.append(filepath)
+        subprocess.run(cmd, check=True, capture_output=True, timeout=60)
+
+
+class SpoolDirBackend:
+    """Stand-in printer that copies each job into a local folder, for headless runs and tests."""
+    name = "spool"
+
+    def __init__(self, spool_dir=None):
+        self.spool_dir = spool_dir or os.path.join(tempfile.gettempdir(), "label_spool")
+        self._counter = itertools.count(1)
+
+    def print_file(self, filepath, printer_name=None, copies=1):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        for copy in range(copies):
+            target = os.path.join(self.spool_dir, f"{stamp}_{next(self._counter):05d}_{printer_name or 'default'}.pdf")
+            shutil.copyfile(filepath, target)
+
+
+BACKENDS = {
+    "windows": WindowsBackend,
+    "cups": CupsBackend,
+    "spool": SpoolDirBackend,
+}
+
+
+def get_backend(name=None):
+    """
+    Backend by name, or from the LABEL_PRINTER_BACKEND environment variable,
+    or the platform default (Windows print verb, otherwise CUPS when `lpr` exists,
+    otherwise the spool folder).
+    """
+    name = name or os.environ.get("LABEL_PRINTER_BACKEND")
+    if name:
+        return BACKENDS[name]()
+    if sys.platform.startswith("win"):
+        return WindowsBackend()
+    if shutil.which("lpr"):
+        return CupsBackend()
+    return SpoolDirBackend()
+
+
+# === Temp file janitor ===
+
+class TempFileJanitor:
+    """Deletes temporary files after a delay from one background thread."""
+
+    def __init__(self):
+        self._heap = []
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="print-janitor")
+        self._thread.start()
+
+    def schedule(self, filepath, delay=60):
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay, filepath))
+            self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                due, filepath = self._heap[0]
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(timeout=wait)
+                    continue
+                heapq.heappop(self._heap)
+            try:
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                    print(f"🗑️ Deleted temporary file: {filepath}")
+            except OSError as e:
+                print(f"❌ Could not delete temporary file {filepath}: {e}")
+
+
+# === Spooler ===
+
+class PrintJob:
+    def __init__(self, job_id, page_paths, copies=1, printer_name=None, tag=None):
+        self.job_id = job_id
+        self.page_paths = page_paths
+        self.copies = copies
+        self.printer_name = printer_name
+        self.tag = tag
+
+
+class PrintSpooler:
+    """
+    Background label print queue.
+    Jobs that arrive within `coalesce_window` seconds of each other for the same
+    printer and copy count are merged into one multi-page print job; a job for
+    another destination ends the batch and starts the next one, so labels print in
+    the order they were submitted. Each job's outcome is posted to `events` as (job_id, tag, ok, message) for the GUI to drain.
+    """
+
+    def __init__(self, backend=None, coalesce_window=0.5, cleanup_delay=60, janitor=None):
+        self.backend = backend or get_backend()
+        self.coalesce_window = coalesce_window
+        self.cleanup_delay = cleanup_delay
+        self.janitor = janitor or TempFileJanitor()
+        self.jobs = queue.Queue()
+        self.events = queue.Queue()
+        self._pending = None
+        self._ids = itertools.count(1)
+        self._thread = threading.Thread(target=self._run, daemon=True, name="print-spooler")
+        self._thread.start()
+
+    def submit(self, page_paths, copies=1, printer_name=None, tag=None):
+        """Queue single-page label PDFs for printing; returns the job id."""
+        job = PrintJob(next(self._ids), list(page_paths), copies, printer_name, tag)
+        self.jobs.put(job)
+        return job.job_id
+
+    def drain_events(self):
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _collect_batch(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.coalesce_window
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self.jobs.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job.printer_name == first.printer_name and job.copies == first.copies:
+                batch.append(job)
+            else:
+                # Different destination: print what we have, then start the next batch with it
+                self._pending = job
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            first, self._pending = self._pending or self.jobs.get(), None
+            batch = self._collect_batch(first)
+            metrics = get_metrics()
+            try:
+                with metrics.span("print_job"):
+                    merged_path = self._merge(batch)
+                    self.backend.print_file(merged_path, batch[0].printer_name, batch[0].copies)
+                metrics.inc("prints", len(batch))
+                self.janitor.schedule(merged_path, self.cleanup_delay)
+                pages = sum(len(job.page_paths) for job in batch)
+                print(f"✅ Sent {pages} label page(s) to printer ({self.backend.name})")
+                for job in batch:
+                    self.events.put((job.job_id, job.tag, True, "printed"))
+            except Exception as e:
+                metrics.inc("print_failures", len(batch))
+                print(f"❌ Printing failed: {e}")
+                for job in batch:
+                    self.events.put((job.job_id, job.tag, False, str(e)))
+
+    def _merge(self, batch):
+        writer = PdfWriter()
+        for job in batch:
+            for path in job.page_paths:
+                for page in PdfReader(path).pages:
+                    writer.add_page(page)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+            writer.write(temp_file)
+            return temp_file.name
+
+
+_default_spooler = None
+_default_lock = threading.Lock()
+
+
+def get_print_spooler():
+    """Shared spooler, started on first use."""
+    global _default_spooler
+    with _default_lock:
+        if _default_spooler is None:
+            _default_spooler = PrintSpooler()
+        return _default_spooler
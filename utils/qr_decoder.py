@@ -0,0 +1,196 @@
+import os
+import sys
+import threading
+import time
+import cv2
+import numpy as np
+
+try:
+    from pyzbar import pyzbar
+except Exception:  # pyzbar or the zbar shared library is not installed
+    pyzbar = None
+
+def resource_path(relative_path):
+    """Get absolute path to resource, works for dev and for PyInstaller .exe"""
+    base_path = getattr(sys, '_MEIPASS', os.path.abspath("."))
+    return os.path.join(base_path, relative_path)
+
+WECHAT_PROTOTXT = resource_path("models/wechat_qr/detect.prototxt")
+WECHAT_MODEL = resource_path("models/wechat_qr/detect.caffemodel")
+
+DEFAULT_CASCADE = ("zbar", "opencv", "wechat")
+FAST_BACKENDS = ("zbar", "opencv")
+
+
+class ModelRegistry:
+    """
+    Lazily created decoder instances.
+    OpenCV detectors are not safe to share between threads, so each thread gets
+    its own instance, created on first use and reused afterwards.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self, name):
+        instances = self._local.__dict__.setdefault("instances", {})
+        if name not in instances:
+            instances[name] = self._create(name)
+        return instances[name]
+
+    def _create(self, name):
+        if name == "wechat":
+            if not os.path.exists(WECHAT_PROTOTXT) or not os.path.exists(WECHAT_MODEL):
+                raise FileNotFoundError("❌ WeChat QR model files not found.")
+            return cv2.wechat_qrcode_WeChatQRCode(WECHAT_PROTOTXT, WECHAT_MODEL)
+        if name == "opencv":
+            return cv2.QRCodeDetector()
+        raise KeyError(name)
+
+
+_registry = ModelRegistry()
+
+
+def get_model_registry():
+    return _registry
+
+
+# === Backends: each returns (texts, points) like WeChat's detectAndDecode ===
+
+def _decode_zbar(img, registry):
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    symbols = pyzbar.decode(gray, symbols=[pyzbar.ZBarSymbol.QRCODE])
+    texts = [s.data.decode("utf-8", errors="replace") for s in symbols]
+    points = [np.array([(p.x, p.y) for p in s.polygon], dtype=np.float32) for s in symbols]
+    return texts, points
+
+
+def _decode_opencv(img, registry):
+    detector = registry.get("opencv")
+    ok, texts, points, _ = detector.detectAndDecodeMulti(img)
+    if not ok or points is None:
+        return [], []
+    found = [(t, p) for t, p in zip(texts, points) if t]
+    return [t for t, _ in found], [np.asarray(p, dtype=np.float32) for _, p in found]
+
+
+def _decode_wechat(img, registry):
+    texts, points = registry.get("wechat").detectAndDecode(img)
+    return list(texts), [np.asarray(p, dtype=np.float32) for p in points]
+
+
+BACKENDS = {
+    "zbar": _decode_zbar,
+    "opencv": _decode_opencv,
+    "wechat": _decode_wechat,
+}
+
+
+def backend_available(name):
+    if name == "zbar":
+        return pyzbar is not None
+    if name == "wechat":
+        return (hasattr(cv2, "wechat_qrcode_WeChatQRCode") and os.path.exists(WECHAT_PROTOTXT)
+                and os.path.exists(WECHAT_MODEL))
+    return name in BACKENDS
+
+
+class BackendStats:
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "hits": self.hits,
+            "errors": self.errors,
+            "hit_rate": self.hits / self.calls if self.calls else 0.0,
+            "mean_ms": self.total_seconds * 1000 / self.calls if self.calls else 0.0,
+        }
+
+
+class QRDecoder:
+    """
+    One QR decoding engine for the GUI, batch tools and recognizer.
+    Backends are tried in cascade order (cheapest first) and the first one that
+    decodes something wins, so the heavy WeChat CNN only runs when the fast
+    decoders fail. Safe to share between threads; per-backend call, hit and
+    latency counters are kept in `stats()`.
+    """
+
+    def __init__(self, cascade=DEFAULT_CASCADE, registry=None):
+        self.cascade = [name for name in cascade if backend_available(name)]
+        if not self.cascade:
+            raise RuntimeError(f"❌ None of the QR backends {list(cascade)} are available.")
+        self.registry = registry or get_model_registry()
+        self._stats = {name: BackendStats() for name in self.cascade}
+        self._lock = threading.Lock()
+        self.last_backend = None
+        # Without any fast backend the full cascade stands in for it
+        self.fast_cascade = [name for name in self.cascade if name in FAST_BACKENDS] or self.cascade
+
+    def decode(self, img, fast=False):
+        """
+        Return (texts, points, backend name); texts is empty when nothing decoded.
+        With `fast` only the cheap backends are tried (for small crops decoded several times per frame).
+        """
+        for name in (self.fast_cascade if fast else self.cascade):
+            start = time.perf_counter()
+            error = False
+            try:
+                texts, points = BACKENDS[name](img, self.registry)
+            except cv2.error:
+                texts, points, error = [], [], True
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self._stats[name]
+                stats.calls += 1
+                stats.total_seconds += elapsed
+                stats.errors += error
+                if texts:
+                    stats.hits += 1
+            if texts:
+                self.last_backend = name
+                return texts, points, name
+        return [], [], None
+
+    def detectAndDecode(self, img):
+        """Drop-in replacement for cv2.wechat_qrcode_WeChatQRCode.detectAndDecode."""
+        texts, points, _ = self.decode(img)
+        return texts, points
+
+    def detectAndDecodeFast(self, img):
+        """detectAndDecode with the fast backends only (no WeChat CNN)."""
+        texts, points, _ = self.decode(img, fast=True)
+        return texts, points
+
+    def decode_file(self, image_path):
+        img = cv2.imread(image_path)
+        if img is None:
+            print(f"❌ Cannot load image: {image_path}")
+            return [], [], None
+        return self.decode(img)
+
+    def stats(self):
+        with self._lock:
+            return {name: self._stats[name].as_dict() for name in self.cascade}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {name: BackendStats() for name in self.cascade}
+
+
+_default_decoder = None
+_default_lock = threading.Lock()
+
+
+def get_qr_decoder():
+    """Shared decoder with the default cascade."""
+    global _default_decoder
+    with _default_lock:
+        if _default_decoder is None:
+            _default_decoder = QRDecoder()
+        return _default_decoder
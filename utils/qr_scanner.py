@@ -1,6 +1,7 @@
 import cv2
 import sys
 import os
+from utils.qr_decoder import get_model_registry, get_qr_decoder
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller .exe"""
@@ -10,6 +11,10 @@ def resource_path(relative_path):
 detect_prototxt = resource_path("models/wechat_qr/detect.prototxt")
 detect_model = resource_path("models/wechat_qr/detect.caffemodel")
 
+def get_wechat_detector():
+    """WeChat detector from the shared model registry, loaded once per thread."""
+    return get_model_registry().get("wechat")
+
 
 def read_qr_code_wechat(image_path):
     """Reads QR codes using WeChat's advanced detector."""
@@ -20,7 +25,7 @@ def read_qr_code_wechat(image_path):
     if not os.path.exists(detect_model):
         print("❌ WeChat Qdetect_model files not found.")
         return None
-    detector = cv2.wechat_qrcode_WeChatQRCode(detect_prototxt, detect_model)
+    detector = get_wechat_detector()
     img = cv2.imread(image_path)
 
     if img is None:
@@ -35,3 +40,12 @@ def read_qr_code_wechat(image_path):
         print("❌ No QR code found using WeChat detector.")
         return None
 
+
+def read_qr_code(image_path):
+    """Reads a QR code with the cheapest decoder backend that succeeds."""
+    qr_codes, _, backend = get_qr_decoder().decode_file(image_path)
+    if qr_codes:
+        print(f"✅ QR Code Detected ({backend}): {qr_codes[0]}")
+        return qr_codes[0]
+    print("❌ No QR code found.")
+    return None